@@ -2,13 +2,105 @@
 Scraper para extrair dados de estatísticas da Serie A do FBref.com
 """
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+from bs4 import BeautifulSoup, Comment
 import time
+import csv
+import itertools
 import json
-from typing import Dict, List, Optional
+import os
+import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin
 
+# Reaproveita os módulos compartilhados de api/ (cache HTTP etc.) quando o scraper roda dentro do repositório
+_API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'api'))
+if os.path.isdir(_API_DIR) and _API_DIR not in sys.path:
+    sys.path.append(_API_DIR)
+
+try:
+    from _circuit_breaker import guarded_request
+    from _fbref_cache import get_default_cache
+    from _fbref_http import new_session
+    from _fbref_ratelimit import get_default_limiter, host_key
+except ImportError:
+    guarded_request = None
+    get_default_cache = None
+    get_default_limiter = None
+    new_session = requests.Session
+
+try:
+    from _table_format import format_table, parse_table_format
+except ImportError:
+    format_table = None
+    parse_table_format = None
+
+try:
+    from _snapshot_store import SnapshotStore, snapshot_key
+except ImportError:
+    SnapshotStore = None
+    snapshot_key = None
+
+
+# Heurística da extração em processos: páginas menores que isso ficam em série,
+# já que serializar os fragmentos e trocar dados entre processos custaria mais
+PARALLEL_MIN_TABLES = 8
+PARALLEL_MIN_BYTES = 256 * 1024
+
+# Scraper de cada processo do pool (criado por _init_table_worker)
+_worker_scraper = None
+
+
+def _init_table_worker():
+    global _worker_scraper
+    _worker_scraper = FBrefScraper()
+
+
+def _extract_table_fragment(fragment: str) -> List[Dict]:
+    """Linhas (sem colunas *_link) da tabela serializada em `fragment`, no processo do pool"""
+    table = BeautifulSoup(fragment, 'lxml').find('table')
+    if table is None:
+        return []
+    return list(_worker_scraper._without_links(_worker_scraper.iter_table_rows(table)))
+
+
+class TableIndex:
+    """
+    Índice das tabelas de uma página, montado numa única varredura do documento
+
+    Substitui as quatro buscas de scrape_any_page (classe stats_table, id com
+    'stats', classe genérica, todas as tabelas) e os soup.find por id feitos a
+    cada tabela do mapeamento.
+    """
+
+    def __init__(self, soup: BeautifulSoup):
+        self.by_id: Dict[str, object] = {}
+        self.by_class: Dict[str, List] = {}
+        # Mesma ordem das quatro buscas antigas: cada tabela entra no primeiro critério que atende
+        buckets = ([], [], [], [])
+        for table in soup.find_all('table'):
+            table_id = table.get('id')
+            classes = table.get('class') or []
+            if table_id:
+                self.by_id.setdefault(table_id, table)
+            for class_name in classes:
+                self.by_class.setdefault(class_name, []).append(table)
+            buckets[self._priority(table_id, classes)].append(table)
+        self.ordered = [table for bucket in buckets for table in bucket]
+
+    @staticmethod
+    def _priority(table_id: Optional[str], classes: List[str]) -> int:
+        if 'stats_table' in classes:
+            return 0
+        if table_id and 'stats' in table_id.lower():
+            return 1
+        class_text = ' '.join(classes).lower()
+        if 'table' in class_text or 'stats' in class_text:
+            return 2
+        return 3
+
 
 class FBrefScraper:
     """Classe para fazer scraping de dados do FBref.com"""
@@ -44,9 +136,24 @@ class FBrefScraper:
         ]
     }
     
-    def __init__(self, base_url: str = "https://fbref.com"):
+    def __init__(self, base_url: str = "https://fbref.com", table_workers: int = 0):
         self.base_url = base_url
-        self.session = requests.Session()
+        # Processos para extrair as tabelas de scrape_any_page(extract_all_tables=True) em paralelo (0/1 = em série)
+        self.table_workers = table_workers
+        self._table_pool: Optional[ProcessPoolExecutor] = None
+        # Cache HTTP em disco (TTL + revalidação condicional); FBREF_CACHE_DISABLED=1 desativa
+        self.cache = get_default_cache() if get_default_cache else None
+        # Token bucket por host no lugar dos delays fixos (quando api/ está disponível)
+        self.limiter = get_default_limiter() if get_default_limiter else None
+        # Conexões keep-alive compartilhadas entre instâncias (pool do processo, quando api/ está disponível)
+        self.session = new_session()
+        # Índice das tabelas do DOM (uma varredura por página)
+        self._index_soup = None
+        self._table_index: Optional[TableIndex] = None
+        # Índice (lazy) das tabelas que o FBref envia dentro de comentários HTML
+        self._comment_soup = None
+        self._comment_index: Dict[str, Comment] = {}
+        self._comment_parsed: Dict[int, BeautifulSoup] = {}
         # Headers mais completos para evitar bloqueio 403
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -78,18 +185,30 @@ class FBrefScraper:
         if not url.startswith('http'):
             url = urljoin(self.base_url, url)
         
+        throttled = False
         for attempt in range(retries):
             try:
                 # Adiciona delay antes da requisição para parecer mais humano
-                if attempt > 0:
+                if self.limiter:
+                    if attempt > 0:
+                        self.limiter.backoff(host_key(url), attempt, throttled=throttled)
+                    if not (self.cache and self.cache.has_usable_entry(url)):
+                        self.limiter.acquire(host_key(url))
+                    throttled = False
+                elif attempt > 0:
                     time.sleep(2 ** attempt)
-                else:
+                elif not (self.cache and self.cache.has_usable_entry(url)):
                     time.sleep(1)
                 
-                response = self.session.get(url, timeout=30, allow_redirects=True)
+                if self.cache:
+                    # Sem circuit breaker aqui; a revalidação em background só respeita o bucket do host
+                    response = self.cache.fetch(self.session, url, timeout=30, allow_redirects=True,
+                                                guard=guarded_request(None, self.limiter, host_key(url)))
+                else:
+                    response = self.session.get(url, timeout=30, allow_redirects=True)
                 
                 # Verifica status code
-                print(f"Status code: {response.status_code}")
+                print(f"Status code: {response.status_code} (cache: {getattr(response, 'cache_status', '-')})")
                 
                 # Verifica se foi bloqueado
                 if response.status_code == 403:
@@ -100,7 +219,9 @@ class FBrefScraper:
                     if attempt < retries - 1:
                         # Tenta com headers diferentes
                         self.session.headers['Referer'] = url
-                        time.sleep(2)
+                        throttled = True
+                        if not self.limiter:
+                            time.sleep(2)
                         continue
                     else:
                         return None
@@ -144,7 +265,8 @@ class FBrefScraper:
                 error_msg = f"Erro na tentativa {attempt + 1}/{retries}: {e}"
                 print(error_msg)
                 if attempt < retries - 1:
-                    time.sleep(2 ** attempt)  # Backoff exponencial
+                    if not self.limiter:
+                        time.sleep(2 ** attempt)  # Backoff exponencial
                 else:
                     return None
         
@@ -246,29 +368,94 @@ class FBrefScraper:
         
         return header
     
-    def extract_table_data(self, soup: BeautifulSoup, table_id: Optional[str] = None, table_name: Optional[str] = None) -> List[Dict]:
+    def _commented_tables(self, soup: BeautifulSoup) -> Dict[str, Comment]:
+        """
+        Mapeia id -> comentário HTML que contém a tabela
+        
+        O FBref envia várias tabelas de squad (standard, passing, gca...) dentro
+        de <!-- -->. O índice é montado uma vez por página, só com regex sobre os
+        comentários que contêm "<table"; o parse fica para _find_commented_table.
+        """
+        if self._comment_soup is not soup:
+            index = {}
+            for comment in soup.find_all(string=lambda text: isinstance(text, Comment) and '<table' in text):
+                for table_id in re.findall(r'<table[^>]*\sid="([^"]+)"', comment):
+                    index.setdefault(table_id, comment)
+            self._comment_soup = soup
+            self._comment_index = index
+            self._comment_parsed = {}
+        return self._comment_index
+    
+    def _find_commented_table(self, soup: BeautifulSoup, table_id: str):
+        """Procura a tabela dentro dos comentários HTML, fazendo parse só do comentário que a contém"""
+        comment = self._commented_tables(soup).get(table_id)
+        if comment is None:
+            return None
+        parsed = self._comment_parsed.get(id(comment))
+        if parsed is None:
+            parsed = BeautifulSoup(str(comment), 'lxml')
+            self._comment_parsed[id(comment)] = parsed
+        return parsed.find('table', {'id': table_id})
+    
+    def _tables(self, soup: BeautifulSoup) -> TableIndex:
+        """Índice das tabelas do DOM, montado uma vez por página"""
+        if self._index_soup is not soup:
+            self._table_index = TableIndex(soup)
+            self._index_soup = soup
+        return self._table_index
+    
+    def _find_table(self, soup: BeautifulSoup, table_id: str):
+        """Procura a tabela no DOM e, se não estiver lá, nas tabelas comentadas"""
+        table = self._tables(soup).by_id.get(table_id)
+        if table is None:
+            table = self._find_commented_table(soup, table_id)
+            if table is not None:
+                print(f"Tabela '{table_id}' encontrada dentro de comentário HTML")
+        return table
+    
+    def extract_table_data(self, soup: BeautifulSoup, table_id: Optional[str] = None, table_name: Optional[str] = None,
+                           table=None) -> List[Dict]:
         """
         Extrai dados de uma tabela HTML processando célula-por-célula para garantir todas as colunas
         
         Args:
             soup: BeautifulSoup object
             table_id: ID da tabela específica (opcional)
+            table_name: Nome lógico da tabela (ex.: standard_for), usado na combinação de cabeçalhos
+            table: Nó da tabela já localizado (pula a busca no documento)
             
         Returns:
             Lista de dicionários com os dados da tabela
         """
-        if table_id:
-            table = soup.find('table', {'id': table_id})
+        if table is not None:
+            pass
+        elif table_id:
+            table = self._tables(soup).by_id.get(table_id)
         else:
-            # Tenta encontrar tabela por múltiplos critérios
-            table = (soup.find('table', {'class': 'stats_table'}) or 
-                    soup.find('table', {'id': lambda x: x and 'stats' in str(x).lower()}) or
-                    soup.find('table'))
+            # Tenta encontrar tabela por múltiplos critérios (a primeira na ordem do índice)
+            ordered = self._tables(soup).ordered
+            table = ordered[0] if ordered else None
         
         if not table:
             print("Tabela não encontrada")
             return []
         
+        data = list(self.iter_table_rows(table, table_name=table_name))
+        print(f"DEBUG: {len(data)} linhas extraídas")
+        return data
+    
+    def iter_table_rows(self, table, table_name: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Gera as linhas da tabela à medida que são lidas, sem montar a lista
+        
+        Mesmas linhas de extract_table_data; usado por stream_any_page e pelos
+        save_to_* para que a memória não cresça com o tamanho da tabela
+        (tabelas de jogadores com milhares de linhas).
+        
+        Args:
+            table: Nó da tabela
+            table_name: Nome lógico da tabela (ex.: standard_for), usado na combinação de cabeçalhos
+        """
         # 1. Extrair cabeçalhos do thead
         headers = []
         thead = table.find('thead')
@@ -404,7 +591,6 @@ class FBrefScraper:
         print(f"DEBUG: Cabeçalhos: {headers}")  # Log todos os cabeçalhos para verificação
         
         # 2. Extrair dados do tbody
-        data = []
         tbody = table.find('tbody')
         rows = tbody.find_all('tr') if tbody else table.find_all('tr')
         
@@ -445,11 +631,125 @@ class FBrefScraper:
                     row_data[header] = ''
             
             if row_data:
-                data.append(row_data)
+                yield row_data
+    
+    @staticmethod
+    def _page_unavailable(url: str) -> Dict:
+        return {
+            "error": "Não foi possível acessar a página. Possíveis causas:\n"
+                    "- O site está bloqueando requisições automatizadas (erro 403)\n"
+                    "- A URL está incorreta ou a página não existe (erro 404)\n"
+                    "- Problemas de conexão ou timeout\n"
+                    "- O site requer autenticação ou cookies específicos\n\n"
+                    "💡 **Solução:** Tente usar o scraper com Selenium (marque 'Usar Selenium') que simula um navegador real.",
+            "url": url,
+            "tables": {}
+        }
+    
+    def _page_tables(self, soup: BeautifulSoup) -> List:
+        """Todas as tabelas da página, incluindo as enviadas dentro de comentários HTML"""
+        # Encontra todas as tabelas na página numa única varredura, priorizando
+        # classe stats_table (FBref), id com 'stats', classe genérica e as demais
+        # (para sites como soccerstats.com)
+        index = self._tables(soup)
+        all_tables = list(index.ordered)
         
-        print(f"DEBUG: {len(data)} linhas extraídas com {len(headers)} colunas")
+        # Tabelas enviadas dentro de comentários HTML (FBref) que não estão no DOM
+        live_ids = index.by_id.keys()
+        for commented_id in self._commented_tables(soup):
+            if commented_id not in live_ids:
+                table = self._find_commented_table(soup, commented_id)
+                if table is not None:
+                    all_tables.append(table)
+        return all_tables
+    
+    @staticmethod
+    def _without_links(rows: Iterable[Dict]) -> Iterator[Dict]:
+        """Remove todos os campos que terminam com _link"""
+        for row in rows:
+            keys_to_remove = [key for key in row.keys() if key.endswith('_link')]
+            for key in keys_to_remove:
+                row.pop(key, None)
+            yield row
+    
+    @staticmethod
+    def _non_empty(rows: Iterator[Dict]) -> Optional[Iterator[Dict]]:
+        """O próprio iterador (sem perder a primeira linha) ou None se a tabela não tem linhas"""
+        first_row = next(rows, None)
+        if first_row is None:
+            return None
+        return itertools.chain([first_row], rows)
+    
+    @staticmethod
+    def _table_name(table, idx: int) -> str:
+        table_id = table.get('id', f'table_{idx}')
+        return table_id if table_id and table_id != f'table_{idx}' else f'table_{idx}'
+    
+    def _extract_tables_parallel(self, all_tables: List) -> Optional[List[Tuple[str, List[Dict]]]]:
+        """
+        Extrai as tabelas num pool de processos, ou None se a página deve ficar em série
         
-        return data
+        Cada processo recebe só o HTML da tabela (str), refaz o parse do
+        fragmento e devolve as linhas; a ordem das tabelas é preservada. Fica em
+        série com menos de 2 processos úteis (table_workers limitado às CPUs),
+        menos de PARALLEL_MIN_TABLES tabelas ou menos de PARALLEL_MIN_BYTES de
+        HTML nas tabelas.
+        """
+        workers = min(self.table_workers, os.cpu_count() or 1)
+        if workers < 2 or len(all_tables) < PARALLEL_MIN_TABLES:
+            return None
+        fragments = [str(table) for table in all_tables]
+        if sum(len(fragment) for fragment in fragments) < PARALLEL_MIN_BYTES:
+            return None
+        
+        if self._table_pool is None:
+            self._table_pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_table_worker)
+        print(f"Extraindo {len(fragments)} tabelas em {workers} processos")
+        chunksize = max(1, len(fragments) // (workers * 4))
+        extracted = self._table_pool.map(_extract_table_fragment, fragments, chunksize=chunksize)
+        return [(self._table_name(table, idx), rows)
+                for idx, (table, rows) in enumerate(zip(all_tables, extracted)) if rows]
+    
+    def close(self):
+        """Encerra o pool de processos da extração paralela (se foi criado)"""
+        if self._table_pool is not None:
+            self._table_pool.shutdown()
+            self._table_pool = None
+    
+    def _iter_page_tables(self, soup: BeautifulSoup, extract_all_tables: bool = True,
+                          all_tables: Optional[List] = None) -> Iterator[Tuple[str, Iterator[Dict]]]:
+        """
+        Gera (nome da tabela, iterador de linhas) para cada tabela com dados
+        
+        Cada iterador deve ser consumido antes de avançar para a próxima tabela.
+        """
+        if extract_all_tables:
+            if all_tables is None:
+                all_tables = self._page_tables(soup)
+            for idx, table in enumerate(all_tables):
+                table_name = self._table_name(table, idx)
+                
+                print(f"Extraindo tabela: {table_name}")
+                rows = self._non_empty(self._without_links(self.iter_table_rows(table)))
+                if rows is not None:
+                    yield table_name, rows
+        else:
+            # Usa apenas as tabelas do mapeamento
+            for table_name, possible_ids in self.TABLE_MAPPING.items():
+                table_found = False
+                
+                for table_id in possible_ids:
+                    table = self._find_table(soup, table_id)
+                    if table:
+                        print(f"Extraindo tabela: {table_name} (ID: {table_id})")
+                        rows = self._non_empty(self.iter_table_rows(table, table_name=table_name))
+                        if rows is not None:
+                            yield table_name, rows
+                            table_found = True
+                            break
+                
+                if not table_found:
+                    print(f"Aviso: Tabela '{table_name}' não encontrada. IDs tentados: {possible_ids}")
     
     def scrape_any_page(self, url: str, extract_all_tables: bool = True) -> Dict:
         """
@@ -458,6 +758,7 @@ class FBrefScraper:
         Args:
             url: URL completa da página para fazer scraping
             extract_all_tables: Se True, extrai todas as tabelas encontradas. Se False, usa apenas as do mapeamento.
+                                Com table_workers >= 2, páginas grandes são extraídas em processos (_extract_tables_parallel).
             
         Returns:
             Dicionário com todas as tabelas encontradas na página
@@ -466,16 +767,7 @@ class FBrefScraper:
         soup = self.get_page(url)
         
         if not soup:
-            return {
-                "error": "Não foi possível acessar a página. Possíveis causas:\n"
-                        "- O site está bloqueando requisições automatizadas (erro 403)\n"
-                        "- A URL está incorreta ou a página não existe (erro 404)\n"
-                        "- Problemas de conexão ou timeout\n"
-                        "- O site requer autenticação ou cookies específicos\n\n"
-                        "💡 **Solução:** Tente usar o scraper com Selenium (marque 'Usar Selenium') que simula um navegador real.",
-                "url": url,
-                "tables": {}
-            }
+            return self._page_unavailable(url)
         
         results = {
             "url": url,
@@ -483,42 +775,7 @@ class FBrefScraper:
         }
         
         if extract_all_tables:
-            # Encontra todas as tabelas na página - busca por múltiplos critérios
-            all_tables = []
-            seen_tables = set()
-            
-            # Busca por classe stats_table (FBref)
-            tables_by_class = soup.find_all('table', {'class': 'stats_table'})
-            for table in tables_by_class:
-                table_id = id(table)
-                if table_id not in seen_tables:
-                    all_tables.append(table)
-                    seen_tables.add(table_id)
-            
-            # Busca por ID que contenha 'stats'
-            tables_by_id = soup.find_all('table', {'id': lambda x: x and 'stats' in str(x).lower()})
-            for table in tables_by_id:
-                table_id = id(table)
-                if table_id not in seen_tables:
-                    all_tables.append(table)
-                    seen_tables.add(table_id)
-            
-            # Busca por qualquer tabela com classe que contenha 'table' ou 'stats'
-            tables_by_class_generic = soup.find_all('table', class_=lambda x: x and ('table' in str(x).lower() or 'stats' in str(x).lower()))
-            for table in tables_by_class_generic:
-                table_id = id(table)
-                if table_id not in seen_tables:
-                    all_tables.append(table)
-                    seen_tables.add(table_id)
-            
-            # Busca todas as tabelas (para sites como soccerstats.com)
-            all_tables_found = soup.find_all('table')
-            for table in all_tables_found:
-                table_id = id(table)
-                if table_id not in seen_tables:
-                    all_tables.append(table)
-                    seen_tables.add(table_id)
-            
+            all_tables = self._page_tables(soup)
             print(f"Encontradas {len(all_tables)} tabelas na página")
             
             if len(all_tables) == 0:
@@ -528,20 +785,11 @@ class FBrefScraper:
                     "tables": {}
                 }
             
-            for idx, table in enumerate(all_tables):
-                table_id = table.get('id', f'table_{idx}')
-                table_name = table_id if table_id and table_id != f'table_{idx}' else f'table_{idx}'
-                
-                print(f"Extraindo tabela: {table_name}")
-                data = self.extract_table_data(soup, table_id=table_id if table_id and table_id != f'table_{idx}' else None)
-                
-                if data:
-                    # Remove todos os campos que terminam com _link
-                    for row in data:
-                        keys_to_remove = [key for key in row.keys() if key.endswith('_link')]
-                        for key in keys_to_remove:
-                            row.pop(key, None)
-                    results["tables"][table_name] = data
+            extracted = self._extract_tables_parallel(all_tables)
+            if extracted is None:
+                extracted = self._iter_page_tables(soup, all_tables=all_tables)
+            for table_name, rows in extracted:
+                results["tables"][table_name] = list(rows)
             
             if len(results["tables"]) == 0:
                 return {
@@ -550,28 +798,32 @@ class FBrefScraper:
                     "tables": {}
                 }
         else:
-            # Usa apenas as tabelas do mapeamento
-            tables_to_extract = list(self.TABLE_MAPPING.keys())
-            
-            for table_name in tables_to_extract:
-                possible_ids = self.TABLE_MAPPING[table_name]
-                table_found = False
-                
-                for table_id in possible_ids:
-                    table = soup.find('table', {'id': table_id})
-                    if table:
-                        print(f"Extraindo tabela: {table_name} (ID: {table_id})")
-                        data = self.extract_table_data(soup, table_id, table_name=table_name)
-                        if data:
-                            results["tables"][table_name] = data
-                            table_found = True
-                            break
-                
-                if not table_found:
-                    print(f"Aviso: Tabela '{table_name}' não encontrada. IDs tentados: {possible_ids}")
+            for table_name, rows in self._iter_page_tables(soup, extract_all_tables=False):
+                results["tables"][table_name] = list(rows)
         
         return results
     
+    def stream_any_page(self, url: str, extract_all_tables: bool = True) -> Dict:
+        """
+        Como scrape_any_page, mas sem manter as tabelas em memória
+        
+        "tables" é um gerador de (nome, iterador de linhas) consumido uma única
+        vez, por exemplo por save_to_csv/save_to_json, que gravam linha a linha.
+        
+        Returns:
+            {"url", "tables": gerador} ou o dicionário de erro de scrape_any_page
+        """
+        print(f"Fazendo scraping de: {url}")
+        soup = self.get_page(url)
+        
+        if not soup:
+            return self._page_unavailable(url)
+        
+        return {
+            "url": url,
+            "tables": self._iter_page_tables(soup, extract_all_tables)
+        }
+    
     def scrape_serie_a_stats(self, season: Optional[str] = None, table_filter: Optional[List[str]] = None, url: Optional[str] = None) -> Dict:
         """
         Extrai estatísticas da Serie A
@@ -625,10 +877,10 @@ class FBrefScraper:
             table_found = False
             
             for table_id in possible_ids:
-                table = soup.find('table', {'id': table_id})
+                table = self._find_table(soup, table_id)
                 if table:
                     print(f"Extraindo tabela: {table_name} (ID: {table_id})")
-                    data = self.extract_table_data(soup, table_id, table_name=table_name)
+                    data = self.extract_table_data(soup, table_id, table_name=table_name, table=table)
                     if data:
                         # Remove todos os campos que terminam com _link
                         for row in data:
@@ -645,39 +897,149 @@ class FBrefScraper:
         
         return results
     
+    @staticmethod
+    def _table_items(tables) -> Iterable[Tuple[str, Iterable[Dict]]]:
+        """Pares (nome, linhas) de data["tables"]: dict ou gerador de stream_any_page"""
+        return tables.items() if isinstance(tables, dict) else tables
+    
+    @staticmethod
+    def _spool_rows(rows: Iterable[Dict]) -> Tuple[List[str], Iterable[Dict]]:
+        """
+        Colunas (união ordenada das chaves de todas as linhas) e as linhas para reler
+        
+        Listas são percorridas duas vezes; iteradores (stream_any_page) passam por
+        um arquivo temporário em JSON lines, sem montar a tabela em memória.
+        """
+        fieldnames: Dict[str, None] = {}
+        if isinstance(rows, list):
+            for row in rows:
+                fieldnames.update(dict.fromkeys(row))
+            return list(fieldnames), rows
+        
+        spool = tempfile.TemporaryFile('w+', encoding='utf-8')
+        for row in rows:
+            fieldnames.update(dict.fromkeys(row))
+            spool.write(json.dumps(row, ensure_ascii=False) + '\n')
+        if not fieldnames:
+            spool.close()
+            return [], []
+        spool.seek(0)
+        
+        def reread() -> Iterator[Dict]:
+            with spool:
+                for line in spool:
+                    yield json.loads(line)
+        
+        return list(fieldnames), reread()
+    
     def save_to_csv(self, data: Dict, output_dir: str = "output"):
         """
-        Salva os dados extraídos em arquivos CSV
+        Salva os dados extraídos em arquivos CSV, uma linha por vez
+        
+        As colunas são a união das chaves de todas as linhas, na ordem em que
+        aparecem (como o DataFrame do pandas); células ausentes ficam vazias.
         
         Args:
-            data: Dicionário com os dados extraídos
+            data: Dicionário com os dados extraídos (de scrape_* ou stream_any_page)
             output_dir: Diretório de saída
         """
         import os
         os.makedirs(output_dir, exist_ok=True)
         
-        for table_name, table_data in data.get("tables", {}).items():
-            if table_data:
-                df = pd.DataFrame(table_data)
-                filename = f"{output_dir}/{table_name}.csv"
-                df.to_csv(filename, index=False, encoding='utf-8-sig')
-                print(f"Dados salvos em: {filename}")
+        for table_name, table_data in self._table_items(data.get("tables", {})):
+            fieldnames, rows = self._spool_rows(table_data)
+            if not fieldnames:
+                continue
+            filename = f"{output_dir}/{table_name}.csv"
+            with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames, restval='', lineterminator='\n')
+                writer.writeheader()
+                writer.writerows(rows)
+            print(f"Dados salvos em: {filename}")
     
-    def save_to_json(self, data: Dict, filename: str = "output/serie_a_stats.json"):
+    def save_to_json(self, data: Dict, filename: str = "output/serie_a_stats.json", table_format: str = "rows"):
         """
         Salva os dados extraídos em arquivo JSON
         
+        As linhas são gravadas à medida que o iterador de cada tabela as produz;
+        o arquivo é o mesmo de json.dump(data, indent=2). No formato colunar cada
+        tabela é montada inteira antes de ser gravada.
+        
         Args:
-            data: Dicionário com os dados extraídos
+            data: Dicionário com os dados extraídos (de scrape_* ou stream_any_page)
             filename: Nome do arquivo de saída
+            table_format: 'rows' (lista de dicts) ou 'columnar' ({"columns", "rows"})
         """
         import os
         os.makedirs(os.path.dirname(filename) if os.path.dirname(filename) else '.', exist_ok=True)
         
+        if table_format != "rows":
+            if parse_table_format is None:
+                raise ValueError("Formato colunar requer api/_table_format.py")
+            table_format = parse_table_format(table_format)
+        
+        def dump(value, indent: str) -> str:
+            return json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n' + indent)
+        
+        items = dict(data)
+        if table_format != "rows":
+            items["format"] = table_format
+        
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write('{')
+            for key_idx, (key, value) in enumerate(items.items()):
+                f.write((',' if key_idx else '') + '\n  ' + json.dumps(key, ensure_ascii=False) + ': ')
+                if key != "tables":
+                    f.write(dump(value, '  '))
+                    continue
+                
+                f.write('{')
+                table_count = 0
+                for table_name, table_data in self._table_items(value):
+                    f.write((',' if table_count else '') + '\n    ' + json.dumps(table_name, ensure_ascii=False) + ': ')
+                    table_count += 1
+                    if table_format != "rows":
+                        f.write(dump(format_table(list(table_data), table_format), '    '))
+                        continue
+                    row_count = 0
+                    for row in table_data:
+                        f.write((',' if row_count else '[') + '\n      ' + dump(row, '      '))
+                        row_count += 1
+                    f.write('\n    ]' if row_count else '[]')
+                f.write('\n  }' if table_count else '}')
+            f.write('\n}' if items else '}')
         
         print(f"Dados salvos em: {filename}")
+    
+    def save_to_snapshots(self, data: Dict, db_path: str = "output/fbref-snapshots.sqlite3") -> Dict[str, int]:
+        """
+        Grava cada tabela como snapshot no SQLite (api/_snapshot_store.py)
+        
+        Extrações iguais à anterior da mesma tabela não criam snapshot novo;
+        SnapshotStore.diff(id_anterior) devolve só as linhas que mudaram.
+        
+        Args:
+            data: Dicionário com os dados extraídos (de scrape_*; não aceita gerador)
+            db_path: Arquivo SQLite de saída
+        
+        Returns:
+            {nome da tabela: id do snapshot}
+        """
+        if SnapshotStore is None:
+            raise ValueError("Snapshots requerem api/_snapshot_store.py")
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        store = SnapshotStore(db_path)
+        league, season = snapshot_key(data.get("url", ""))
+        
+        snapshot_ids = {}
+        for table_name, table_data in data.get("tables", {}).items():
+            if not table_data:
+                continue
+            snapshot = store.record(league, season, table_name, table_data, url=data.get("url"))
+            snapshot_ids[table_name] = snapshot["id"]
+            status = "novo" if snapshot["created"] else "sem alterações"
+            print(f"Snapshot {snapshot['id']} ({table_name}, {status}) em: {db_path}")
+        return snapshot_ids
 
 
 def main():
@@ -698,6 +1060,8 @@ def main():
     # Salva os dados
     scraper.save_to_json(data)
     scraper.save_to_csv(data)
+    if SnapshotStore is not None:
+        scraper.save_to_snapshots(data)
     
     print(f"\nScraping concluído!")
     print(f"Total de tabelas extraídas: {len(data.get('tables', {}))}")
@@ -5,6 +5,7 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
@@ -14,6 +15,22 @@ import json
 import time
 from typing import Dict, List, Optional
 import os
+import sys
+
+# Reaproveita os módulos compartilhados de api/ (pool de navegadores) quando o scraper roda dentro do repositório
+_API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'api'))
+if os.path.isdir(_API_DIR) and _API_DIR not in sys.path:
+    sys.path.append(_API_DIR)
+
+try:
+    from _browser_pool import BrowserPool
+except ImportError:
+    BrowserPool = None
+
+try:
+    from _selenium_wait import dismiss_cookie_banner, table_id_patterns, wait_for_page_ready
+except ImportError:
+    wait_for_page_ready = None
 
 
 class FBrefSeleniumScraper:
@@ -50,13 +67,21 @@ class FBrefSeleniumScraper:
         ]
     }
     
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, driver=None):
         """
         Inicializa o driver Selenium
         
         Args:
             headless: Se True, executa o navegador em modo headless
+            driver: WebDriver já aberto (ex.: emprestado de um BrowserPool); nesse
+                caso close() não encerra o navegador
         """
+        self._owns_driver = driver is None
+        self.driver = driver if driver is not None else self.create_driver(headless)
+    
+    @staticmethod
+    def create_driver(headless: bool = True):
+        """Abre um novo Chrome configurado para o FBref"""
         chrome_options = Options()
         if headless:
             chrome_options.add_argument('--headless')
@@ -68,16 +93,18 @@ class FBrefSeleniumScraper:
         chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
         
         service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        return driver
     
-    def get_page(self, url: str, wait_time: int = 10) -> Optional[BeautifulSoup]:
+    def get_page(self, url: str, wait_time: int = 10, table_types: Optional[List[str]] = None) -> Optional[BeautifulSoup]:
         """
         Carrega a página e retorna o conteúdo parseado
         
         Args:
             url: URL completa
-            wait_time: Tempo de espera em segundos
+            wait_time: Tempo máximo de espera em segundos
+            table_types: Tabelas do TABLE_MAPPING aguardadas (None = espera o DOM estabilizar)
             
         Returns:
             BeautifulSoup object ou None em caso de erro
@@ -85,23 +112,22 @@ class FBrefSeleniumScraper:
         try:
             self.driver.get(url)
             
-            # Aguarda o carregamento da página
-            time.sleep(3)
-            
-            # Tenta aceitar cookies se existir
-            try:
-                accept_button = WebDriverWait(self.driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'Aceitar')]"))
+            if wait_for_page_ready is None:
+                # Fora do repositório (sem api/_selenium_wait.py): espera qualquer tabela
+                WebDriverWait(self.driver, wait_time).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "table"))
                 )
-                accept_button.click()
-                time.sleep(1)
-            except:
-                pass  # Botão de cookies não encontrado ou já foi clicado
-            
-            # Aguarda tabelas carregarem
-            WebDriverWait(self.driver, wait_time).until(
-                EC.presence_of_element_located((By.TAG_NAME, "table"))
-            )
+            else:
+                # Retorna assim que as tabelas alvo estão no DOM (ou o DOM estabiliza)
+                patterns = table_id_patterns(self.TABLE_MAPPING, table_types) if table_types else None
+                try:
+                    wait_for_page_ready(self.driver, wait_time, patterns)
+                except TimeoutException:
+                    # Páginas com muitos anúncios não param de mudar o DOM: segue com o que já carregou
+                    print(f"Aviso: página não estabilizou após {wait_time}s, usando o HTML atual")
+                
+                # Aceita cookies se o banner já estiver na tela (não bloqueia esperando por ele)
+                dismiss_cookie_banner(self.driver)
             
             # Obtém o HTML da página
             html = self.driver.page_source
@@ -426,7 +452,7 @@ class FBrefSeleniumScraper:
             Dicionário com todas as tabelas encontradas na página
         """
         print(f"Fazendo scraping com Selenium de: {url}")
-        soup = self.get_page(url)
+        soup = self.get_page(url, table_types=None if extract_all_tables else list(self.TABLE_MAPPING.keys()))
         
         if not soup:
             return {
@@ -551,17 +577,6 @@ class FBrefSeleniumScraper:
             if season:
                 final_url = f"https://fbref.com/en/comps/11/{season}/Serie-A-Stats"
         
-        print(f"Fazendo scraping com Selenium de: {final_url}")
-        soup = self.get_page(final_url)
-        
-        if not soup:
-            return {"error": "Não foi possível acessar a página"}
-        
-        results = {
-            "url": final_url,
-            "tables": {}
-        }
-        
         # Define quais tabelas extrair
         if table_filter is None:
             # Usa as tabelas padrão do mapeamento
@@ -573,6 +588,17 @@ class FBrefSeleniumScraper:
                 missing = set(table_filter) - set(tables_to_extract)
                 print(f"Aviso: Algumas tabelas não estão no mapeamento: {missing}")
         
+        print(f"Fazendo scraping com Selenium de: {final_url}")
+        soup = self.get_page(final_url, table_types=tables_to_extract)
+        
+        if not soup:
+            return {"error": "Não foi possível acessar a página"}
+        
+        results = {
+            "url": final_url,
+            "tables": {}
+        }
+        
         # Busca cada tabela especificada
         for table_name in tables_to_extract:
             possible_ids = self.TABLE_MAPPING[table_name]
@@ -620,41 +646,53 @@ class FBrefSeleniumScraper:
         print(f"Dados salvos em: {filename}")
     
     def close(self):
-        """Fecha o driver do navegador"""
-        if self.driver:
+        """Fecha o driver do navegador (apenas se foi aberto por este scraper)"""
+        if self._owns_driver and self.driver:
             self.driver.quit()
 
 
 def main():
     """Função principal"""
-    scraper = FBrefSeleniumScraper(headless=True)
+    if BrowserPool is None:
+        scraper = FBrefSeleniumScraper(headless=True)
+        try:
+            run(scraper)
+        finally:
+            scraper.close()
+        return
     
+    # Checkout/checkin pelo mesmo pool usado pela API; o driver é encerrado no close()
+    pool = BrowserPool(lambda: FBrefSeleniumScraper.create_driver(headless=True))
     try:
-        # Tabelas padrão para extrair
-        default_tables = ['results2025-2026111_overall', 'results2025-2026111_home_away', 
-                          'standard_for', 'passing_for', 'gca_for']
-        
-        print("Iniciando scraping da Serie A com Selenium...")
-        data = scraper.scrape_serie_a_stats(table_filter=default_tables)
-        
-        if "error" in data:
-            print(f"Erro: {data['error']}")
-            return
-        
-        # Salva os dados
-        scraper.save_to_json(data, "output/serie_a_stats_selenium.json")
-        scraper.save_to_csv(data, "output")
-        
-        print(f"\nScraping concluído!")
-        print(f"Total de tabelas extraídas: {len(data.get('tables', {}))}")
-        
-        for table_name, table_data in data.get("tables", {}).items():
-            print(f"  - {table_name}: {len(table_data)} linhas")
-            
+        with pool.driver() as driver:
+            run(FBrefSeleniumScraper(driver=driver))
     finally:
-        scraper.close()
+        pool.close()
+
+
+def run(scraper: FBrefSeleniumScraper):
+    """Extrai as tabelas padrão da Serie A e salva em JSON/CSV"""
+    # Tabelas padrão para extrair
+    default_tables = ['results2025-2026111_overall', 'results2025-2026111_home_away', 
+                      'standard_for', 'passing_for', 'gca_for']
+    
+    print("Iniciando scraping da Serie A com Selenium...")
+    data = scraper.scrape_serie_a_stats(table_filter=default_tables)
+    
+    if "error" in data:
+        print(f"Erro: {data['error']}")
+        return
+    
+    # Salva os dados
+    scraper.save_to_json(data, "output/serie_a_stats_selenium.json")
+    scraper.save_to_csv(data, "output")
+    
+    print(f"\nScraping concluído!")
+    print(f"Total de tabelas extraídas: {len(data.get('tables', {}))}")
+    
+    for table_name, table_data in data.get("tables", {}).items():
+        print(f"  - {table_name}: {len(table_data)} linhas")
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,200 @@
+"""
+Pool de navegadores headless (Selenium/Chrome) reutilizados entre requisições.
+
+Abrir o Chrome (e, localmente, rodar ChromeDriverManager().install()) custa
+vários segundos; com o pool o custo é pago uma vez por driver e as próximas
+requisições reaproveitam o navegador já aberto enquanto a função estiver
+"quente".
+
+- checkout/checkin (ou o context manager `driver()`)
+- tamanho máximo configurável; quem chega com o pool cheio espera
+- reciclagem por número de páginas servidas (evita vazamento de memória do Chrome)
+- health check antes de entregar um driver ocioso
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_POOL_SIZE = 1
+DEFAULT_MAX_PAGES = 50
+DEFAULT_CHECKOUT_TIMEOUT = 60.0
+
+
+class PooledDriver:
+    """Driver do pool com os contadores usados na reciclagem"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.time()
+
+
+class BrowserPool:
+    """Pool de WebDrivers com checkout/checkin, reciclagem e health check"""
+
+    def __init__(self, factory: Callable, size: Optional[int] = None, max_pages: Optional[int] = None,
+                 checkout_timeout: Optional[float] = None):
+        """
+        Args:
+            factory: Função que cria um novo WebDriver
+            size: Número máximo de navegadores abertos (FBREF_BROWSER_POOL_SIZE)
+            max_pages: Páginas servidas por driver antes de reciclá-lo (FBREF_BROWSER_MAX_PAGES)
+            checkout_timeout: Espera máxima por um driver livre, em segundos
+        """
+        self.factory = factory
+        self.size = max(1, size or int(os.environ.get('FBREF_BROWSER_POOL_SIZE', DEFAULT_POOL_SIZE)))
+        self.max_pages = max(1, max_pages or int(os.environ.get('FBREF_BROWSER_MAX_PAGES', DEFAULT_MAX_PAGES)))
+        self.checkout_timeout = checkout_timeout if checkout_timeout is not None else DEFAULT_CHECKOUT_TIMEOUT
+        self._idle: List[PooledDriver] = []
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {'created': 0, 'reused': 0, 'recycled': 0, 'unhealthy': 0}
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        try:
+            return pooled.driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def _quit(self, pooled: PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def checkout(self, timeout: Optional[float] = None) -> PooledDriver:
+        """Retira um driver do pool (reaproveita um ocioso saudável ou cria um novo)"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError('BrowserPool fechado')
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._open < self.size:
+                        self._open += 1
+                        pooled = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f'Nenhum navegador livre no pool após {timeout:g}s')
+                    self._cond.wait(remaining)
+
+            if pooled is None:
+                try:
+                    driver = self.factory()
+                except BaseException:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats['created'] += 1
+                return PooledDriver(driver)
+
+            # Health check fora do lock: um driver travado não bloqueia o pool inteiro
+            if self._is_healthy(pooled):
+                with self._cond:
+                    self._stats['reused'] += 1
+                return pooled
+
+            print("[BrowserPool] Driver ocioso não respondeu ao health check; descartando")
+            self._quit(pooled)
+            with self._cond:
+                self._open -= 1
+                self._stats['unhealthy'] += 1
+                self._cond.notify()
+
+    def checkin(self, pooled: PooledDriver, healthy: bool = True):
+        """Devolve o driver ao pool (ou o encerra se atingiu o limite de páginas)"""
+        pooled.pages += 1
+        recycle = not healthy or pooled.pages >= self.max_pages or self._closed
+
+        if not recycle:
+            try:
+                # Libera a memória da página anterior antes de deixar o driver ocioso
+                pooled.driver.get('about:blank')
+            except Exception:
+                recycle = True
+
+        if recycle:
+            self._quit(pooled)
+            with self._cond:
+                self._open -= 1
+                self._stats['recycled'] += 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None):
+        """Context manager: `with pool.driver() as driver: ...`"""
+        pooled = self.checkout(timeout)
+        healthy = True
+        try:
+            yield pooled.driver
+        except BaseException:
+            # Erros de página não significam driver quebrado; o health check decide no próximo checkout
+            healthy = self._is_healthy(pooled)
+            raise
+        finally:
+            self.checkin(pooled, healthy=healthy)
+
+    def warm(self, count: Optional[int] = None):
+        """Abre navegadores antecipadamente (até `count` ou o tamanho do pool)"""
+        drivers = []
+        try:
+            for _ in range(min(count or self.size, self.size)):
+                drivers.append(self.checkout())
+        finally:
+            for pooled in drivers:
+                pooled.pages -= 1  # o aquecimento não conta como página servida
+                self.checkin(pooled)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                **self._stats,
+                'size': self.size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+            }
+
+    def close(self):
+        """Encerra os drivers ociosos; os em uso são encerrados no checkin"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+
+
+_default_pool: Optional[BrowserPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool(factory: Callable) -> BrowserPool:
+    """
+    Pool padrão do processo (sobrevive entre invocações enquanto a função estiver quente)
+
+    FBREF_BROWSER_POOL_SIZE e FBREF_BROWSER_MAX_PAGES ajustam tamanho e reciclagem.
+    A `factory` só é usada na primeira chamada.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = BrowserPool(factory)
+        return _default_pool
@@ -0,0 +1,261 @@
+"""
+Circuit breaker por host para as requisições ao FBref.
+
+Quando o FBref entra numa sequência de 403 ("403 storm"), cada requisição
+ainda gastava três tentativas com backoff crescente antes de falhar,
+prendendo o worker por ~10 s. O breaker acompanha a taxa de falhas do host e:
+
+- closed: requisições normais; abre quando, numa janela de tempo, há pelo
+  menos `min_requests` requisições e a fração de falhas atinge `failure_rate`
+- open: falha na hora (ou o chamador serve a cópia do cache) até o fim do
+  tempo de abertura, que dobra a cada probe que falha (backoff adaptativo)
+- half_open: uma única requisição de teste (probe) é liberada; sucesso fecha
+  o circuito, falha reabre
+
+Falhas são bloqueios e indisponibilidade (403, 429, 5xx, timeout, erro de
+conexão); 404 e páginas de erro contam como sucesso, pois o host respondeu.
+
+Mesmo esquema de estado do _fbref_ratelimit: um registro por host num arquivo
+SQLite compartilhado entre threads e processos (api/fbref-extract.py,
+api/fbref-html-proxy.py e o scraper Selenium), com volta para memória.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout
+    FAILURE_EXCEPTIONS: Tuple[type, ...] = (RequestsTimeout, RequestsConnectionError)
+except ImportError:
+    FAILURE_EXCEPTIONS = ()
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULT_FAILURE_RATE = 0.5
+DEFAULT_MIN_REQUESTS = 4
+DEFAULT_WINDOW = 60.0
+DEFAULT_OPEN_SECONDS = 60.0
+MAX_OPEN_SECONDS = 900.0
+# Probe sem resultado por mais que isso (worker morto) libera outro probe
+PROBE_TIMEOUT = 60.0
+DEFAULT_STATE_PATH = os.path.join(tempfile.gettempdir(), 'fbref-breaker.sqlite3')
+
+
+def is_failure_status(status_code: Optional[int]) -> bool:
+    """True para respostas que indicam bloqueio ou indisponibilidade do host"""
+    return status_code is not None and (status_code in (403, 429) or status_code >= 500)
+
+
+def _new_record(now: float) -> Dict:
+    return {'state': CLOSED, 'window_start': now, 'requests': 0, 'failures': 0,
+            'opened_at': None, 'trips': 0, 'probe_at': None}
+
+
+class CircuitBreaker:
+    """Circuit breaker por host, compartilhado entre threads e processos"""
+
+    def __init__(self, failure_rate: Optional[float] = None, min_requests: Optional[int] = None,
+                 window: Optional[float] = None, open_seconds: Optional[float] = None,
+                 state_path: Optional[str] = None, enabled: Optional[bool] = None):
+        """
+        Args:
+            failure_rate: Fração de falhas na janela que abre o circuito
+            min_requests: Requisições mínimas na janela antes de avaliar a taxa
+            window: Duração da janela de contagem (s)
+            open_seconds: Tempo aberto após a primeira abertura (dobra a cada probe que falha)
+            state_path: Arquivo SQLite do estado compartilhado ('' = só memória)
+            enabled: False desativa o breaker (allow sempre True)
+        """
+        self.failure_rate = failure_rate if failure_rate is not None else \
+            float(os.environ.get('FBREF_BREAKER_FAILURE_RATE', DEFAULT_FAILURE_RATE))
+        self.min_requests = min_requests if min_requests is not None else \
+            int(os.environ.get('FBREF_BREAKER_MIN_REQUESTS', DEFAULT_MIN_REQUESTS))
+        self.window = window if window is not None else float(os.environ.get('FBREF_BREAKER_WINDOW', DEFAULT_WINDOW))
+        self.open_seconds = open_seconds if open_seconds is not None else \
+            float(os.environ.get('FBREF_BREAKER_OPEN_SECONDS', DEFAULT_OPEN_SECONDS))
+        if enabled is None:
+            enabled = os.environ.get('FBREF_BREAKER_DISABLED', '').lower() not in ('1', 'true', 'yes')
+        self.enabled = enabled
+        self.state_path = state_path if state_path is not None else os.environ.get('FBREF_BREAKER_DB', DEFAULT_STATE_PATH)
+        self._lock = threading.Lock()
+        self._memory_state: Dict[str, Dict] = {}
+        self._use_sqlite = bool(self.state_path)
+        if self._use_sqlite:
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        'CREATE TABLE IF NOT EXISTS breakers ('
+                        'host TEXT PRIMARY KEY, record TEXT NOT NULL, updated_at REAL NOT NULL)'
+                    )
+            except sqlite3.Error as e:
+                print(f"[CircuitBreaker] SQLite indisponível ({e}); usando estado em memória")
+                self._use_sqlite = False
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.state_path, timeout=10, isolation_level=None)
+
+    def _update(self, host: str, func: Callable[[Dict, float], Tuple[Dict, object]]):
+        """Lê o registro do host, aplica func(record, now) -> (record, resultado) e grava"""
+        with self._lock:
+            now = time.time()
+            if self._use_sqlite:
+                try:
+                    conn = self._connect()
+                    try:
+                        conn.execute('BEGIN IMMEDIATE')
+                        row = conn.execute('SELECT record FROM breakers WHERE host = ?', (host,)).fetchone()
+                        record = json.loads(row[0]) if row else _new_record(now)
+                        record, result = func(record, now)
+                        conn.execute(
+                            'INSERT INTO breakers (host, record, updated_at) VALUES (?, ?, ?) '
+                            'ON CONFLICT(host) DO UPDATE SET record = excluded.record, updated_at = excluded.updated_at',
+                            (host, json.dumps(record), now),
+                        )
+                        conn.execute('COMMIT')
+                    finally:
+                        conn.close()
+                    return result
+                except (sqlite3.Error, ValueError) as e:
+                    print(f"[CircuitBreaker] Falha no SQLite ({e}); usando estado em memória")
+                    self._use_sqlite = False
+
+            record, result = func(dict(self._memory_state.get(host) or _new_record(now)), now)
+            self._memory_state[host] = record
+            return result
+
+    def _open_duration(self, record: Dict) -> float:
+        return min(MAX_OPEN_SECONDS, self.open_seconds * (2 ** max(0, record['trips'] - 1)))
+
+    def _snapshot(self, record: Dict, now: float) -> Dict:
+        retry_after = 0.0
+        if record['state'] == OPEN:
+            retry_after = max(0.0, record['opened_at'] + self._open_duration(record) - now)
+        return {
+            'state': record['state'],
+            'requests': record['requests'],
+            'failures': record['failures'],
+            'retryAfter': round(retry_after, 1),
+        }
+
+    def allow(self, host: str) -> bool:
+        """
+        True se a requisição ao host pode ser feita
+
+        Com o circuito aberto e o tempo de abertura esgotado, a primeira chamada
+        passa a ser o probe (half_open) e as demais continuam bloqueadas.
+        """
+        if not self.enabled:
+            return True
+
+        def check(record: Dict, now: float):
+            state = record['state']
+            if state == OPEN and now - record['opened_at'] >= self._open_duration(record):
+                record['state'] = HALF_OPEN
+                record['probe_at'] = now
+                return record, True
+            if state == HALF_OPEN and (record['probe_at'] is None or now - record['probe_at'] >= PROBE_TIMEOUT):
+                record['probe_at'] = now
+                return record, True
+            return record, state == CLOSED
+
+        allowed = self._update(host, check)
+        if not allowed:
+            print(f"[CircuitBreaker] Circuito de {host} aberto; requisição bloqueada")
+        return allowed
+
+    def record(self, host: str, success: bool) -> Dict:
+        """Registra o resultado de uma requisição ao host e retorna o novo estado"""
+        if not self.enabled:
+            return self.snapshot(host)
+
+        def apply(record: Dict, now: float):
+            state = record['state']
+            if state == HALF_OPEN:
+                if success:
+                    record.update(_new_record(now))
+                    print(f"[CircuitBreaker] Probe de {host} bem-sucedido; circuito fechado")
+                else:
+                    record.update(state=OPEN, opened_at=now, probe_at=None, trips=record['trips'] + 1)
+                    print(f"[CircuitBreaker] Probe de {host} falhou; circuito reaberto por {self._open_duration(record):.0f}s")
+                return record, self._snapshot(record, now)
+            if state == OPEN:
+                # Resultado atrasado de uma requisição anterior à abertura
+                return record, self._snapshot(record, now)
+
+            if now - record['window_start'] >= self.window:
+                record.update(window_start=now, requests=0, failures=0)
+            record['requests'] += 1
+            if not success:
+                record['failures'] += 1
+            if record['requests'] >= self.min_requests and \
+                    record['failures'] / record['requests'] >= self.failure_rate:
+                record.update(state=OPEN, opened_at=now, trips=1, probe_at=None)
+                print(f"[CircuitBreaker] {record['failures']}/{record['requests']} falhas em {host}; "
+                      f"circuito aberto por {self._open_duration(record):.0f}s")
+            return record, self._snapshot(record, now)
+
+        return self._update(host, apply)
+
+    def record_success(self, host: str) -> Dict:
+        return self.record(host, True)
+
+    def record_failure(self, host: str) -> Dict:
+        return self.record(host, False)
+
+    def snapshot(self, host: str) -> Dict:
+        """Estado atual do host: state, requests, failures (janela atual) e retryAfter (s)"""
+        if not self.enabled:
+            return {'state': CLOSED, 'requests': 0, 'failures': 0, 'retryAfter': 0.0}
+        return self._update(host, lambda record, now: (record, self._snapshot(record, now)))
+
+
+def guarded_request(breaker: Optional[CircuitBreaker], limiter, host: str) -> Callable[[Callable[[], Any]], Any]:
+    """
+    Guarda para requisições fora do laço de tentativas (revalidação em background do cache)
+
+    guard(send) só chama send() com o circuito fechado e um token disponível no
+    bucket do host (sem esperar); senão devolve None sem contatar o FBref. O
+    resultado (status ou timeout/erro de conexão) é registrado no breaker como
+    nas demais requisições. O probe do half_open fica com as requisições normais.
+    """
+    def guard(send: Callable[[], Any]):
+        if breaker is not None and breaker.snapshot(host)['state'] != CLOSED:
+            return None
+        if limiter is not None and not limiter.try_acquire(host):
+            return None
+        try:
+            response = send()
+        except FAILURE_EXCEPTIONS:
+            if breaker is not None:
+                breaker.record_failure(host)
+            raise
+        if breaker is not None:
+            breaker.record(host, not is_failure_status(response.status_code))
+        return response
+
+    return guard
+
+
+_default_breaker: Optional[CircuitBreaker] = None
+_default_breaker_lock = threading.Lock()
+
+
+def get_default_breaker() -> CircuitBreaker:
+    """
+    Breaker padrão do processo (configurado por variáveis de ambiente)
+
+    FBREF_BREAKER_FAILURE_RATE, FBREF_BREAKER_MIN_REQUESTS, FBREF_BREAKER_WINDOW,
+    FBREF_BREAKER_OPEN_SECONDS, FBREF_BREAKER_DB (vazio = só memória) e
+    FBREF_BREAKER_DISABLED=1.
+    """
+    global _default_breaker
+    with _default_breaker_lock:
+        if _default_breaker is None:
+            _default_breaker = CircuitBreaker()
+        return _default_breaker
@@ -0,0 +1,357 @@
+"""
+Cache persistente em disco para as respostas HTTP do FBref.
+
+Compartilhado por api/fbref-extract.py, api/fbref-html-proxy.py e pelo scraper
+standalone (Cur Sor/.../scraper.py). Arquivos com prefixo "_" em api/ não
+viram rotas na Vercel.
+
+- Entradas indexadas pela URL normalizada (entries/<sha256>.json)
+- Corpo armazenado por conteúdo (blobs/<sha256>), deduplicado entre URLs
+- TTL: dentro do TTL a resposta vem direto do disco
+- stale-while-revalidate: após o TTL (e dentro da janela SWR) devolve a cópia
+  antiga imediatamente e revalida em background
+- Revalidação condicional com If-None-Match / If-Modified-Since (304)
+"""
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:
+    from requests.structures import CaseInsensitiveDict
+except ImportError:
+    CaseInsensitiveDict = dict
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'fbref-cache')
+DEFAULT_TTL = 3600
+DEFAULT_STALE_WHILE_REVALIDATE = 24 * 3600
+
+# Fração dos stores que dispara a limpeza de entradas expiradas e blobs órfãos
+PRUNE_PROBABILITY = 0.05
+
+# Headers da resposta mantidos na entrada do cache
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Date', 'Cache-Control')
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normaliza a URL para uso como chave do cache
+
+    Esquema/host em minúsculas, sem "www.", sem porta padrão, sem fragmento e
+    com os parâmetros da query ordenados.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'https').lower()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    port = parts.port
+    if port and not ((scheme == 'https' and port == 443) or (scheme == 'http' and port == 80)):
+        host = f'{host}:{port}'
+    path = parts.path or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+class CachedResponse:
+    """Resposta servida pelo cache com a mesma interface usada de requests.Response"""
+
+    def __init__(self, entry: Dict, content: bytes, cache_status: str):
+        self.status_code = entry.get('status_code', 200)
+        self.reason = entry.get('reason', 'OK')
+        self.url = entry.get('final_url') or entry.get('url')
+        self.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        self.encoding = entry.get('encoding')
+        self.content = content
+        self.cache_status = cache_status
+        self.from_cache = True
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def raise_for_status(self):
+        pass
+
+
+class ResponseCache:
+    """Cache HTTP em disco com TTL, revalidação condicional e stale-while-revalidate"""
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[float] = None,
+                 stale_while_revalidate: Optional[float] = None):
+        self.cache_dir = cache_dir or os.environ.get('FBREF_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.ttl = ttl if ttl is not None else float(os.environ.get('FBREF_CACHE_TTL', DEFAULT_TTL))
+        self.stale_while_revalidate = (
+            stale_while_revalidate if stale_while_revalidate is not None
+            else float(os.environ.get('FBREF_CACHE_SWR', DEFAULT_STALE_WHILE_REVALIDATE))
+        )
+        self._entries_dir = os.path.join(self.cache_dir, 'entries')
+        self._blobs_dir = os.path.join(self.cache_dir, 'blobs')
+        os.makedirs(self._entries_dir, exist_ok=True)
+        os.makedirs(self._blobs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._revalidating = set()
+
+    # ------------------------------------------------------------------
+    # Armazenamento
+    # ------------------------------------------------------------------
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self._entries_dir, f'{key}.json')
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._blobs_dir, digest)
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def get_entry(self, url: str) -> Optional[Dict]:
+        """Retorna os metadados da entrada (ou None se não existir/corrompida)"""
+        try:
+            with open(self._entry_path(self._key(url)), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(self._blob_path(entry.get('body_sha256', ''))):
+            return None
+        return entry
+
+    def has_usable_entry(self, url: str) -> bool:
+        """True se fetch() responderia direto do disco (fresh ou dentro da janela SWR)"""
+        entry = self.get_entry(url)
+        if not entry:
+            return False
+        return time.time() - entry.get('validated_at', 0) < self.ttl + self.stale_while_revalidate
+
+    def _read_body(self, entry: Dict) -> Optional[bytes]:
+        try:
+            with open(self._blob_path(entry['body_sha256']), 'rb') as f:
+                return f.read()
+        except (OSError, KeyError):
+            return None
+
+    def _write_entry(self, entry: Dict):
+        self._atomic_write(self._entry_path(entry['key']), json.dumps(entry).encode('utf-8'))
+
+    def store(self, url: str, response) -> Optional[Dict]:
+        """Armazena uma resposta 200; outras respostas não são cacheadas"""
+        if response.status_code != 200:
+            return None
+
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            self._atomic_write(blob_path, content)
+
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        now = time.time()
+        entry = {
+            'key': self._key(url),
+            'url': url,
+            'normalized_url': normalize_url(url),
+            'final_url': response.url,
+            'status_code': response.status_code,
+            'reason': response.reason,
+            'headers': headers,
+            'encoding': response.encoding,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'body_sha256': digest,
+            'size': len(content),
+            'fetched_at': now,
+            'validated_at': now,
+        }
+        self._write_entry(entry)
+
+        if random.random() < PRUNE_PROBABILITY:
+            self.prune()
+        return entry
+
+    def invalidate(self, url: str):
+        """Remove a entrada da URL (ex.: conteúdo rejeitado pelo chamador)"""
+        try:
+            os.unlink(self._entry_path(self._key(url)))
+        except OSError:
+            pass
+
+    def prune(self):
+        """Remove entradas fora da janela stale-while-revalidate e blobs sem referência"""
+        max_age = self.ttl + self.stale_while_revalidate
+        now = time.time()
+        referenced = set()
+        for name in os.listdir(self._entries_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self._entries_dir, name)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                entry = None
+            if not entry or now - entry.get('validated_at', 0) > max_age:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+                continue
+            referenced.add(entry.get('body_sha256'))
+
+        for name in os.listdir(self._blobs_dir):
+            if name.startswith('.tmp-') or name in referenced:
+                continue
+            try:
+                os.unlink(self._blob_path(name))
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Requisições
+    # ------------------------------------------------------------------
+
+    def _cached_response(self, entry: Dict, cache_status: str) -> Optional[CachedResponse]:
+        content = self._read_body(entry)
+        if content is None:
+            return None
+        return CachedResponse(entry, content, cache_status)
+
+    def fallback(self, url: str) -> Optional[CachedResponse]:
+        """
+        Cópia em disco de qualquer idade (até ser removida pela limpeza), para
+        quando o FBref não pode ser acessado (circuit breaker aberto)
+        """
+        entry = self.get_entry(url)
+        if not entry:
+            return None
+        return self._cached_response(entry, 'fallback')
+
+    def _conditional_get(self, session, url: str, entry: Optional[Dict], **request_kwargs):
+        """GET com If-None-Match/If-Modified-Since; 304 devolve a cópia do cache"""
+        base_headers = request_kwargs.pop('headers', None)
+        headers = dict(base_headers or {})
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = session.get(url, headers=headers or None, **request_kwargs)
+
+        if response.status_code == 304 and entry:
+            entry['validated_at'] = time.time()
+            for name in KEPT_HEADERS:
+                if name in response.headers:
+                    entry['headers'][name] = response.headers[name]
+            entry['etag'] = entry['headers'].get('ETag')
+            entry['last_modified'] = entry['headers'].get('Last-Modified')
+            self._write_entry(entry)
+            cached = self._cached_response(entry, 'revalidated')
+            if cached is not None:
+                return cached
+            # Blob removido entre a leitura e a revalidação: busca completa
+            response = session.get(url, headers=base_headers, **request_kwargs)
+
+        if response.status_code == 200:
+            self.store(url, response)
+        response.cache_status = 'miss'
+        response.from_cache = False
+        return response
+
+    def _revalidate_in_background(self, session, url: str, entry: Dict, request_kwargs: Dict,
+                                  guard: Optional[Callable[[Callable[[], Any]], Any]] = None):
+        key = entry['key']
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def send():
+            return self._conditional_get(session, url, entry, **request_kwargs)
+
+        def run():
+            try:
+                if guard is None:
+                    send()
+                elif guard(send) is None:
+                    print(f"[ResponseCache] Revalidação de {url} adiada (circuito aberto ou limite de taxa)")
+            except Exception as e:
+                print(f"[ResponseCache] Falha ao revalidar {url} em background: {e}")
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=run, name='fbref-cache-revalidate', daemon=True).start()
+
+    def fetch(self, session, url: str, guard: Optional[Callable[[Callable[[], Any]], Any]] = None, **request_kwargs):
+        """
+        GET com cache: fresh → disco; stale (janela SWR) → disco + revalidação em
+        background; expirado/ausente → GET condicional
+
+        Exceções do requests são propagadas para o chamador (mesma taxonomia de
+        erros de session.get). O atributo `cache_status` da resposta indica
+        'hit', 'stale', 'revalidated' ou 'miss'.
+
+        Args:
+            guard: Envolve a revalidação em background (guard(send) -> resposta ou
+                None se não pôde enviar), já que ela corre fora do laço de tentativas
+                do chamador; ver _circuit_breaker.guarded_request
+        """
+        entry = self.get_entry(url)
+        if entry:
+            age = time.time() - entry.get('validated_at', 0)
+            if age < self.ttl:
+                cached = self._cached_response(entry, 'hit')
+                if cached is not None:
+                    return cached
+            elif age < self.ttl + self.stale_while_revalidate:
+                cached = self._cached_response(entry, 'stale')
+                if cached is not None:
+                    self._revalidate_in_background(session, url, dict(entry), dict(request_kwargs), guard)
+                    return cached
+
+        return self._conditional_get(session, url, entry, **request_kwargs)
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[ResponseCache]:
+    """
+    Cache padrão do processo (configurado por variáveis de ambiente)
+
+    FBREF_CACHE_DISABLED=1 desliga o cache; FBREF_CACHE_DIR, FBREF_CACHE_TTL e
+    FBREF_CACHE_SWR ajustam diretório, TTL e janela stale-while-revalidate (s).
+    """
+    global _default_cache
+    if os.environ.get('FBREF_CACHE_DISABLED', '').lower() in ('1', 'true', 'yes'):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = ResponseCache()
+            except OSError as e:
+                print(f"[ResponseCache] Cache desativado: {e}")
+                return None
+        return _default_cache
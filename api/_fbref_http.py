@@ -0,0 +1,152 @@
+"""
+Pool de conexões HTTP do processo, reaproveitado entre invocações "quentes".
+
+Cada FBrefScraper (e cada requisição do proxy) criava um requests.Session
+novo e descartava as conexões TCP/TLS no fim da requisição, mesmo com o
+container da função serverless ainda ativo. Aqui um único HTTPAdapter (com o
+PoolManager do urllib3) vive no módulo e é montado em todas as sessões criadas
+por new_session(): os headers continuam por sessão (o ajuste de Referer após
+um 403 não vaza para outras requisições), mas as conexões keep-alive são do
+processo.
+
+- FBREF_HTTP_POOL_SIZE: conexões mantidas por host (padrão 10)
+- FBREF_HTTP_POOL_HOSTS: hosts com pool próprio (padrão 4)
+- FBREF_HTTP2=1: HTTP/2 experimental do urllib3 (>= 2.3, requer o pacote h2);
+  sem suporte, segue em HTTP/1.1 keep-alive
+
+connection_stats() conta conexões novas e reaproveitadas para medir a
+economia de handshakes TLS.
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+    HTTPAdapter = object
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_HOSTS = 4
+
+
+def _enable_http2() -> bool:
+    """Ativa o HTTP/2 experimental do urllib3 (negociado via ALPN, com volta ao HTTP/1.1)"""
+    try:
+        import urllib3.http2
+        urllib3.http2.inject_into_urllib3()
+        return True
+    except (ImportError, AttributeError) as e:
+        print(f"[FBrefHttp] HTTP/2 indisponível ({e}); usando HTTP/1.1 keep-alive")
+        return False
+
+
+class SharedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter compartilhado entre sessões
+
+    close() da sessão não fecha o pool (as conexões pertencem ao processo) e
+    os contadores dos pools descartados pelo PoolManager são preservados.
+    """
+
+    def __init__(self, pool_size: int, pool_hosts: int):
+        self._stats_lock = threading.Lock()
+        self._retired = {'connections': 0, 'requests': 0}
+        super().__init__(pool_connections=pool_hosts, pool_maxsize=pool_size)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        pools = self.poolmanager.pools
+        dispose = pools.dispose_func
+
+        def retire(pool):
+            with self._stats_lock:
+                self._retired['connections'] += pool.num_connections
+                self._retired['requests'] += pool.num_requests
+            if dispose:
+                dispose(pool)
+
+        pools.dispose_func = retire
+
+    def close(self):
+        pass  # O pool é do processo; use close_pool()
+
+    def close_pool(self):
+        super().close()
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            connections = self._retired['connections']
+            requests_count = self._retired['requests']
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            try:
+                pool = pools[key]
+            except KeyError:
+                continue  # Descartado entre keys() e a leitura (já contado em retire)
+            connections += pool.num_connections
+            requests_count += pool.num_requests
+        return {'connections': connections, 'requests': requests_count}
+
+
+_adapter: Optional[SharedHTTPAdapter] = None
+_adapter_lock = threading.Lock()
+http2_enabled = False
+
+
+def get_adapter() -> SharedHTTPAdapter:
+    """Adapter (pool de conexões) do processo, criado na primeira chamada"""
+    global _adapter, http2_enabled
+    with _adapter_lock:
+        if _adapter is None:
+            if os.environ.get('FBREF_HTTP2', '').lower() in ('1', 'true', 'yes'):
+                http2_enabled = _enable_http2()
+            _adapter = SharedHTTPAdapter(
+                pool_size=int(os.environ.get('FBREF_HTTP_POOL_SIZE', DEFAULT_POOL_SIZE)),
+                pool_hosts=int(os.environ.get('FBREF_HTTP_POOL_HOSTS', DEFAULT_POOL_HOSTS)),
+            )
+        return _adapter
+
+
+def new_session(headers: Optional[Dict[str, str]] = None) -> 'requests.Session':
+    """
+    Sessão com headers próprios sobre o pool de conexões do processo
+
+    Criar uma sessão por scraper/requisição é barato; o que se reaproveita são
+    as conexões do adapter compartilhado.
+    """
+    session = requests.Session()
+    adapter = get_adapter()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def connection_stats() -> Dict:
+    """
+    Contadores do pool: requisições, conexões novas (handshakes) e reaproveitadas
+
+    As novas tentativas internas do urllib3 também contam como requisições.
+    """
+    if _adapter is None:
+        return {'requests': 0, 'new': 0, 'reused': 0, 'http2': http2_enabled}
+    stats = _adapter.stats()
+    return {
+        'requests': stats['requests'],
+        'new': stats['connections'],
+        'reused': max(0, stats['requests'] - stats['connections']),
+        'http2': http2_enabled,
+    }
+
+
+def close_pool():
+    """Fecha todas as conexões do processo (o próximo new_session recria o pool)"""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is not None:
+            _adapter.close_pool()
+            _adapter = None
@@ -0,0 +1,201 @@
+"""
+Limitador de taxa (token bucket) por host para as requisições ao FBref.
+
+Substitui os delays aleatórios fixos antes de cada requisição: só espera
+quando o orçamento de requisições do host está esgotado. O estado do bucket
+fica num arquivo SQLite, compartilhado entre threads e entre processos
+(workers) da mesma máquina; se o SQLite não estiver disponível o estado fica
+só em memória.
+
+O mesmo componente calcula o backoff das novas tentativas. Em respostas de
+bloqueio (403/429) o bucket do host é drenado, de modo que todos os workers
+desaceleram juntos em vez de cada um insistir sozinho.
+
+O padrão de 10 requisições/minuto segue o limite publicado pelo FBref para
+acesso automatizado.
+"""
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_RATE_PER_MINUTE = 10.0
+DEFAULT_BURST = 3.0
+DEFAULT_STATE_PATH = os.path.join(tempfile.gettempdir(), 'fbref-ratelimit.sqlite3')
+
+# Backoff das novas tentativas: base * 2^tentativa + jitter, limitado a MAX_BACKOFF
+BACKOFF_BASE = 1.0
+MAX_BACKOFF = 30.0
+
+
+def host_key(url: str) -> str:
+    """Host usado como chave do bucket (sem "www.")"""
+    host = (urlsplit(url).hostname or url).lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class TokenBucketLimiter:
+    """Token bucket por host, compartilhado entre threads e processos"""
+
+    def __init__(self, rate_per_minute: Optional[float] = None, burst: Optional[float] = None,
+                 state_path: Optional[str] = None):
+        """
+        Args:
+            rate_per_minute: Requisições por minuto reabastecidas no bucket (0 desativa o limite)
+            burst: Capacidade do bucket (requisições seguidas sem espera)
+            state_path: Arquivo SQLite do estado compartilhado ('' = só memória)
+        """
+        if rate_per_minute is None:
+            rate_per_minute = float(os.environ.get('FBREF_RATE_PER_MINUTE', DEFAULT_RATE_PER_MINUTE))
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst if burst is not None else float(os.environ.get('FBREF_RATE_BURST', DEFAULT_BURST))
+        self.state_path = state_path if state_path is not None else os.environ.get('FBREF_RATE_LIMIT_DB', DEFAULT_STATE_PATH)
+        self._lock = threading.Lock()
+        self._memory_state: Dict[str, Tuple[float, float]] = {}
+        self._use_sqlite = bool(self.state_path)
+        if self._use_sqlite:
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        'CREATE TABLE IF NOT EXISTS buckets ('
+                        'host TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)'
+                    )
+            except sqlite3.Error as e:
+                print(f"[TokenBucketLimiter] SQLite indisponível ({e}); usando estado em memória")
+                self._use_sqlite = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: a transação é controlada manualmente (BEGIN IMMEDIATE)
+        return sqlite3.connect(self.state_path, timeout=10, isolation_level=None)
+
+    def _update(self, host: str, cost: float, drain_seconds: float = 0.0, available_only: bool = False) -> float:
+        """
+        Reabastece o bucket, consome `cost` tokens e retorna a espera necessária
+
+        O saldo pode ficar negativo: a requisição fica "reservada" e a espera
+        é o tempo para o bucket voltar a zero. `drain_seconds` empurra o saldo
+        para baixo (pausa o host para todos os workers). Com `available_only`,
+        sem saldo suficiente nada é consumido e a espera retornada é positiva.
+        """
+        with self._lock:
+            now = time.time()
+            if self._use_sqlite:
+                try:
+                    conn = self._connect()
+                    try:
+                        conn.execute('BEGIN IMMEDIATE')
+                        row = conn.execute('SELECT tokens, updated_at FROM buckets WHERE host = ?', (host,)).fetchone()
+                        tokens, wait = self._apply(self._refill(row, now), cost, drain_seconds, available_only)
+                        conn.execute(
+                            'INSERT INTO buckets (host, tokens, updated_at) VALUES (?, ?, ?) '
+                            'ON CONFLICT(host) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at',
+                            (host, tokens, now),
+                        )
+                        conn.execute('COMMIT')
+                    finally:
+                        conn.close()
+                    return wait
+                except sqlite3.Error as e:
+                    print(f"[TokenBucketLimiter] Falha no SQLite ({e}); usando estado em memória")
+                    self._use_sqlite = False
+
+            tokens, wait = self._apply(self._refill(self._memory_state.get(host), now), cost, drain_seconds,
+                                       available_only)
+            self._memory_state[host] = (tokens, now)
+            return wait
+
+    def _apply(self, tokens: float, cost: float, drain_seconds: float, available_only: bool) -> Tuple[float, float]:
+        """(novo saldo, espera) para o saldo já reabastecido"""
+        if available_only and tokens < cost:
+            return tokens, self._wait_for(tokens - cost)
+        tokens = self._consume(tokens, cost, drain_seconds)
+        return tokens, self._wait_for(tokens)
+
+    def _refill(self, state: Optional[Tuple[float, float]], now: float) -> float:
+        if not state:
+            return self.burst
+        tokens, updated_at = state
+        return min(self.burst, tokens + max(0.0, now - updated_at) * self.rate)
+
+    def _consume(self, tokens: float, cost: float, drain_seconds: float) -> float:
+        tokens -= cost
+        if drain_seconds:
+            tokens = min(tokens, 0.0) - drain_seconds * self.rate
+        return tokens
+
+    def _wait_for(self, tokens: float) -> float:
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+    def reserve(self, host: str) -> float:
+        """Consome um token do host e retorna quantos segundos esperar antes da requisição"""
+        if not self.enabled:
+            return 0.0
+        return self._update(host, 1.0)
+
+    def try_acquire(self, host: str) -> bool:
+        """Consome um token só se houver saldo agora; False (sem consumir nem esperar) caso contrário"""
+        if not self.enabled:
+            return True
+        return self._update(host, 1.0, available_only=True) == 0.0
+
+    def acquire(self, host: str) -> float:
+        """Espera (bloqueante) até haver orçamento para uma requisição ao host"""
+        wait = self.reserve(host)
+        if wait > 0:
+            print(f"[TokenBucketLimiter] Limite de {host} atingido; aguardando {wait:.2f}s")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, host: str) -> float:
+        """Versão assíncrona de acquire"""
+        wait = self.reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def backoff_delay(self, host: str, attempt: int, throttled: bool = False) -> float:
+        """
+        Delay antes da tentativa `attempt` (>= 1) após uma falha
+
+        Args:
+            throttled: True quando o host respondeu com bloqueio (403/429); drena
+                o bucket pelo mesmo tempo para que os outros workers também esperem
+        """
+        delay = min(MAX_BACKOFF, BACKOFF_BASE * (2 ** attempt)) + random.uniform(0.5, 1.5)
+        if throttled and self.enabled:
+            self._update(host, 0.0, drain_seconds=delay)
+        return delay
+
+    def backoff(self, host: str, attempt: int, throttled: bool = False) -> float:
+        """Espera (bloqueante) o backoff da nova tentativa"""
+        delay = self.backoff_delay(host, attempt, throttled)
+        print(f"[TokenBucketLimiter] Aguardando {delay:.2f}s antes da tentativa {attempt + 1}...")
+        time.sleep(delay)
+        return delay
+
+
+_default_limiter: Optional[TokenBucketLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_default_limiter() -> TokenBucketLimiter:
+    """
+    Limitador padrão do processo (configurado por variáveis de ambiente)
+
+    FBREF_RATE_PER_MINUTE (0 desativa), FBREF_RATE_BURST e FBREF_RATE_LIMIT_DB
+    (arquivo SQLite compartilhado entre processos; vazio = só memória).
+    """
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = TokenBucketLimiter()
+        return _default_limiter
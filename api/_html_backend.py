@@ -0,0 +1,293 @@
+"""
+Backends de parse HTML para a extração das tabelas do FBref.
+
+extract_table_data e find_table_by_type só precisam de poucas operações sobre
+o documento: título, tabelas com id (para o TableLocator), tabela por id e as
+células (texto, colspan/rowspan) do thead e das linhas de dados. Cada backend
+implementa essas operações sobre a própria árvore, sem converter nada para
+BeautifulSoup:
+
+- 'bs4': BeautifulSoup(html, 'lxml'), como sempre foi
+- 'lxml': lxml.html (libxml2) navegado direto em C, sem objetos Python por nó
+- 'selectolax': selectolax (Lexbor, parser HTML5), se estiver instalado
+
+As regras de texto seguem get_text(strip=True) do BeautifulSoup: cada nó de
+texto é aparado e os pedaços são concatenados; comentários e o conteúdo de
+<script>/<style> não entram. tests/python/test_html_backends.py garante que os
+backends devolvem as mesmas linhas nas fixtures de Jsons/ e Tabela teste/.
+O selectolax monta a árvore pelas regras do HTML5 (ex.: cria <tbody> em tabelas
+sem ele), então tabelas malformadas podem divergir dos backends libxml2.
+
+Selecionado por FBREF_PARSER (ver api/fbref-extract.py).
+"""
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+try:
+    import lxml.html as lxml_html
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_html = None
+    lxml_etree = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+from _table_headers import HeaderCell, thead_cells
+from _table_locator import IndexEntry
+
+# Célula de uma linha de dados: (texto, colspan)
+RowCell = Tuple[str, int]
+
+DEFAULT_BACKEND = 'bs4'
+
+
+def _is_repeated_header(classes: Optional[str]) -> bool:
+    # Linhas "thead" repetidas no meio do tbody (FBref)
+    return bool(classes) and 'thead' in classes
+
+
+class SoupBackend:
+    """BeautifulSoup com o parser lxml"""
+
+    name = 'bs4'
+
+    def parse(self, content):
+        return BeautifulSoup(content, 'lxml')
+
+    def title(self, doc) -> Optional[str]:
+        tag = doc.find('title')
+        return tag.get_text() if tag else None
+
+    def tables(self, doc) -> List[IndexEntry]:
+        return [(table.get('id'), table.get('class') or [], table) for table in doc.find_all('table', id=True)]
+
+    def find_table(self, doc, table_id: Optional[str] = None):
+        if table_id:
+            return doc.find('table', {'id': table_id})
+        # Tenta encontrar tabela por múltiplos critérios
+        return (doc.find('table', {'class': 'stats_table'}) or
+                doc.find('table', {'id': lambda x: x and 'stats' in str(x).lower()}) or
+                doc.find('table'))
+
+    def header_cells(self, table) -> List[List[HeaderCell]]:
+        thead = table.find('thead')
+        return thead_cells(thead) if thead else []
+
+    def first_row(self, table) -> Optional[List[RowCell]]:
+        row = table.find('tr')
+        if not row:
+            first_cell = table.find(['th', 'td'])
+            row = first_cell.find_parent('tr') if first_cell else None
+        if not row:
+            return None
+        return [(cell.get_text(strip=True), int(cell.get('colspan', 1))) for cell in row.find_all(['th', 'td'])]
+
+    def first_body_row_width(self, table) -> int:
+        row = table.find('tbody')
+        if row:
+            row = row.find('tr')
+        if not row:
+            row = table.find('tr')
+        return len(row.find_all(['td', 'th'])) if row else 0
+
+    def body_rows(self, table) -> Iterator[List[RowCell]]:
+        tbody = table.find('tbody')
+        for row in (tbody.find_all('tr') if tbody else table.find_all('tr')):
+            if _is_repeated_header(' '.join(row.get('class') or [])):
+                continue
+            yield [(cell.get_text(strip=True), int(cell.get('colspan', 1))) for cell in row.find_all(['td', 'th'])]
+
+
+class LxmlBackend:
+    """lxml.html (também recebe o documento parcial do HTMLPullParser do modo 'stream')"""
+
+    name = 'lxml'
+
+    def parse(self, content):
+        if isinstance(content, bytes):
+            # Sem <meta charset> o libxml2 assume latin-1; o BeautifulSoup detecta UTF-8
+            try:
+                content = content.decode('utf-8')
+            except UnicodeDecodeError:
+                pass
+        return self.adopt(lxml_html.document_fromstring(content))
+
+    @staticmethod
+    def adopt(doc):
+        """Prepara um documento lxml já parseado (remove <script>/<style>, ignorados por get_text)"""
+        lxml_etree.strip_elements(doc, 'script', 'style', with_tail=False)
+        return doc
+
+    @staticmethod
+    def _text(node) -> str:
+        return ''.join(text.strip() for text in node.itertext())
+
+    @classmethod
+    def _cells(cls, row) -> List[RowCell]:
+        return [(cls._text(cell), int(cell.get('colspan', 1))) for cell in row.iterdescendants('th', 'td')]
+
+    def title(self, doc) -> Optional[str]:
+        tag = next(doc.iter('title'), None)
+        if tag is None:
+            return None
+        return ''.join(tag.itertext()) or None
+
+    def tables(self, doc) -> List[IndexEntry]:
+        return [(table.get('id'), (table.get('class') or '').split(), table)
+                for table in doc.iter('table') if table.get('id') is not None]
+
+    def find_table(self, doc, table_id: Optional[str] = None):
+        if table_id:
+            return next((table for table in doc.iter('table') if table.get('id') == table_id), None)
+        first = by_stats_id = None
+        for table in doc.iter('table'):
+            if 'stats_table' in (table.get('class') or '').split():
+                return table
+            if by_stats_id is None and 'stats' in (table.get('id') or '').lower():
+                by_stats_id = table
+            if first is None:
+                first = table
+        return by_stats_id if by_stats_id is not None else first
+
+    def header_cells(self, table) -> List[List[HeaderCell]]:
+        thead = next(table.iterdescendants('thead'), None)
+        if thead is None:
+            return []
+        return [
+            [(self._text(cell), int(cell.get('colspan', 1)), int(cell.get('rowspan', 1)))
+             for cell in row.iterdescendants('th', 'td')]
+            for row in thead.iterdescendants('tr')
+        ]
+
+    def first_row(self, table) -> Optional[List[RowCell]]:
+        row = next(table.iterdescendants('tr'), None)
+        if row is None:
+            first_cell = next(table.iterdescendants('th', 'td'), None)
+            row = next(first_cell.iterancestors('tr'), None) if first_cell is not None else None
+        return self._cells(row) if row is not None else None
+
+    def first_body_row_width(self, table) -> int:
+        tbody = next(table.iterdescendants('tbody'), None)
+        row = next(tbody.iterdescendants('tr'), None) if tbody is not None else None
+        if row is None:
+            row = next(table.iterdescendants('tr'), None)
+        return sum(1 for _ in row.iterdescendants('td', 'th')) if row is not None else 0
+
+    def body_rows(self, table) -> Iterator[List[RowCell]]:
+        tbody = next(table.iterdescendants('tbody'), None)
+        for row in (tbody if tbody is not None else table).iterdescendants('tr'):
+            if _is_repeated_header(row.get('class')):
+                continue
+            yield self._cells(row)
+
+
+class SelectolaxBackend:
+    """selectolax com o parser Lexbor"""
+
+    name = 'selectolax'
+
+    def parse(self, content):
+        tree = SelectolaxParser(content)
+        tree.strip_tags(['script', 'style'])
+        return tree
+
+    @staticmethod
+    def _text(node) -> str:
+        return node.text(deep=True, separator='', strip=True)
+
+    @staticmethod
+    def _cell_nodes(row) -> List:
+        # Em ordem de documento (uma lista de seletores CSS agruparia por seletor)
+        return [node for node in row.traverse() if node.tag in ('th', 'td')]
+
+    @classmethod
+    def _cells(cls, row) -> List[RowCell]:
+        return [(cls._text(cell), int(cell.attributes.get('colspan') or 1)) for cell in cls._cell_nodes(row)]
+
+    @staticmethod
+    def _classes(node) -> str:
+        return node.attributes.get('class') or ''
+
+    def title(self, doc) -> Optional[str]:
+        tag = doc.css_first('title')
+        return (tag.text() or None) if tag is not None else None
+
+    def tables(self, doc) -> List[IndexEntry]:
+        return [(table.attributes.get('id') or '', self._classes(table).split(), table) for table in doc.css('table[id]')]
+
+    def find_table(self, doc, table_id: Optional[str] = None):
+        if table_id:
+            return next((table for table in doc.css('table[id]') if table.attributes.get('id') == table_id), None)
+        first = by_stats_id = None
+        for table in doc.css('table'):
+            if 'stats_table' in self._classes(table).split():
+                return table
+            if by_stats_id is None and 'stats' in (table.attributes.get('id') or '').lower():
+                by_stats_id = table
+            if first is None:
+                first = table
+        return by_stats_id if by_stats_id is not None else first
+
+    def header_cells(self, table) -> List[List[HeaderCell]]:
+        thead = table.css_first('thead')
+        if thead is None:
+            return []
+        return [
+            [(self._text(cell), int(cell.attributes.get('colspan') or 1), int(cell.attributes.get('rowspan') or 1))
+             for cell in self._cell_nodes(row)]
+            for row in thead.css('tr')
+        ]
+
+    def first_row(self, table) -> Optional[List[RowCell]]:
+        row = table.css_first('tr')
+        return self._cells(row) if row is not None else None
+
+    def first_body_row_width(self, table) -> int:
+        row = table.css_first('tbody tr') or table.css_first('tr')
+        return len(self._cell_nodes(row)) if row is not None else 0
+
+    def body_rows(self, table) -> Iterator[List[RowCell]]:
+        tbody = table.css_first('tbody')
+        for row in (tbody if tbody is not None else table).css('tr'):
+            if _is_repeated_header(row.attributes.get('class')):
+                continue
+            yield self._cells(row)
+
+
+# Backend -> módulo exigido
+BACKENDS = {
+    'bs4': (SoupBackend, lambda: BeautifulSoup),
+    'lxml': (LxmlBackend, lambda: lxml_html),
+    'selectolax': (SelectolaxBackend, lambda: SelectolaxParser),
+}
+
+_backends: Dict[str, object] = {}
+
+
+def available_backends() -> List[str]:
+    """Backends cujas dependências estão instaladas"""
+    return [name for name, (_, dependency) in BACKENDS.items() if dependency() is not None]
+
+
+def get_backend(name: Optional[str] = None):
+    """
+    Backend pelo nome ('bs4', 'lxml', 'selectolax'; padrão 'bs4')
+
+    Nome desconhecido ou dependência ausente caem no BeautifulSoup.
+    """
+    name = (name or DEFAULT_BACKEND).lower()
+    if name not in available_backends():
+        if name != DEFAULT_BACKEND:
+            print(f"[HtmlBackend] Backend '{name}' indisponível; usando BeautifulSoup")
+        name = DEFAULT_BACKEND
+    backend = _backends.get(name)
+    if backend is None:
+        backend = _backends.setdefault(name, BACKENDS[name][0]())
+    return backend
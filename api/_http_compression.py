@@ -0,0 +1,114 @@
+"""
+Compressão das respostas HTTP (gzip/brotli) negociada pelo Accept-Encoding.
+
+Usado pelo api/fbref-html-proxy.py, cujo corpo (HTML bruto do FBref dentro de
+um JSON) tem vários MB. O corpo é comprimido em pedaços e enviado com
+Transfer-Encoding: chunked, sem montar a versão comprimida inteira em memória.
+
+brotli é opcional: sem o pacote, só gzip é oferecido.
+"""
+import os
+import zlib
+from typing import Dict, Iterable, Iterator, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 5
+
+# Quantidade de bytes acumulada antes de alimentar o compressor
+CHUNK_SIZE = 64 * 1024
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    preferences = {}
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        preferences[name] = q
+    return preferences
+
+
+def supported_encodings() -> list:
+    """Codificações oferecidas pelo servidor, em ordem de preferência"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Escolhe 'br' ou 'gzip' conforme o Accept-Encoding do cliente (maior q;
+    empate favorece brotli). Retorna None para enviar sem compressão.
+    """
+    if not accept_encoding:
+        return None
+    preferences = _parse_accept_encoding(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = preferences.get(encoding, preferences.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _BrotliCompressor:
+    """Adapta brotli.Compressor à interface compress()/flush() do zlib"""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def make_compressor(encoding: str):
+    """
+    Compressor incremental para a codificação
+
+    Níveis: FBREF_PROXY_GZIP_LEVEL (1-9, padrão 6) e FBREF_PROXY_BROTLI_QUALITY
+    (0-11, padrão 5).
+    """
+    if encoding == 'gzip':
+        level = int(os.environ.get('FBREF_PROXY_GZIP_LEVEL', DEFAULT_GZIP_LEVEL))
+        # wbits 16 + 15: cabeçalho/rodapé gzip
+        return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if encoding == 'br' and brotli is not None:
+        return _BrotliCompressor(int(os.environ.get('FBREF_PROXY_BROTLI_QUALITY', DEFAULT_BROTLI_QUALITY)))
+    raise ValueError(f'Codificação não suportada: {encoding}')
+
+
+def iter_compressed(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Comprime um fluxo de bytes em pedaços de ~CHUNK_SIZE"""
+    compressor = make_compressor(encoding)
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= CHUNK_SIZE:
+            out = compressor.compress(b''.join(buffer))
+            buffer, buffered = [], 0
+            if out:
+                yield out
+    if buffer:
+        out = compressor.compress(b''.join(buffer))
+        if out:
+            yield out
+    out = compressor.flush()
+    if out:
+        yield out
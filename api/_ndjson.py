@@ -0,0 +1,120 @@
+"""
+Respostas NDJSON em streaming (Transfer-Encoding: chunked) para os handlers.
+
+Opt-in pelo cliente com `Accept: application/x-ndjson`: em vez de montar a
+resposta inteira e escrevê-la com um único json.dumps no final, o handler
+emite uma linha JSON por evento (tabela extraída, resultado de cada URL) assim
+que ele fica pronto.
+
+Cada linha tem um campo "type":
+- "table": {"type", "url", "table", "rows"} (com write_rows as linhas são
+  serializadas e enviadas à medida que o iterador as produz)
+- "result": resultado da URL sem as tabelas (success, missingTables ou error)
+- "done": resumo final (apenas em lote)
+- "error": erro interno após o início do stream
+"""
+import json
+import threading
+from typing import Dict, Iterable
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+# Linhas de tabela acumuladas por chunk HTTP em write_rows
+ROWS_PER_CHUNK = 200
+
+
+def wants_ndjson(headers) -> bool:
+    """True se o cliente pediu streaming NDJSON no header Accept"""
+    return NDJSON_CONTENT_TYPE in (headers.get('Accept') or '')
+
+
+class NDJSONStream:
+    """Escreve linhas NDJSON em chunks HTTP; seguro para uso por várias threads"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.started = False
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def start(self, status_code: int = 200):
+        """Envia status e headers (chunked exige HTTP/1.1 na linha de status)"""
+        handler = self.handler
+        handler.protocol_version = 'HTTP/1.1'
+        handler.send_response(status_code)
+        handler.send_header('Content-Type', f'{NDJSON_CONTENT_TYPE}; charset=utf-8')
+        handler.send_header('Access-Control-Allow-Origin', '*')
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.send_header('X-Accel-Buffering', 'no')
+        handler.send_header('Transfer-Encoding', 'chunked')
+        handler.send_header('Connection', 'close')
+        handler.end_headers()
+        self.started = True
+
+    def _write_chunk(self, data: bytes):
+        self.handler.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.handler.wfile.flush()
+
+    def write(self, event: Dict):
+        """Serializa o evento numa linha e a envia como um chunk"""
+        line = (json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            if self.closed:
+                return
+            self._write_chunk(line)
+
+    def write_rows(self, event: Dict, rows: Iterable[Dict], chunk_rows: int = ROWS_PER_CHUNK) -> int:
+        """
+        Envia o evento com o campo "rows" sem montar a lista de linhas
+
+        A linha NDJSON é a mesma de write({**event, 'rows': list(rows)}), mas sai
+        em vários chunks HTTP (chunk_rows linhas cada) enquanto o iterador é
+        consumido. O lock fica preso até o fim da linha para que eventos de
+        outras threads não se intercalem. Se o iterador falhar no meio, a linha
+        é fechada com "truncated": true e a exceção é propagada.
+
+        Returns:
+            Número de linhas enviadas
+        """
+        head = json.dumps(event, ensure_ascii=False)
+        parts = [head[:-1] + (', ' if event else '') + '"rows": [']
+        count = 0
+        with self._lock:
+            if self.closed:
+                return 0
+            try:
+                for row in rows:
+                    if count:
+                        parts.append(', ')
+                    parts.append(json.dumps(row, ensure_ascii=False))
+                    count += 1
+                    if count % chunk_rows == 0:
+                        self._write_chunk(''.join(parts).encode('utf-8'))
+                        parts = []
+            except BaseException:
+                parts.append('], "truncated": true}\n')
+                self._write_chunk(''.join(parts).encode('utf-8'))
+                raise
+            parts.append(']}\n')
+            self._write_chunk(''.join(parts).encode('utf-8'))
+        return count
+
+    def close(self):
+        """Envia o chunk final"""
+        with self._lock:
+            if self.closed or not self.started:
+                return
+            self.closed = True
+            self.handler.wfile.write(b'0\r\n\r\n')
+            self.handler.wfile.flush()
+
+
+def result_event(payload: Dict, **extra) -> Dict:
+    """Evento "result" a partir da resposta de uma URL, sem as tabelas (já enviadas)"""
+    event = {'type': 'result', **extra}
+    for key, value in payload.items():
+        if key == 'data':
+            event['missingTables'] = value.get('missingTables', [])
+        else:
+            event[key] = value
+    return event
@@ -0,0 +1,178 @@
+"""
+Extração de tabelas dentro do navegador (Selenium execute_script).
+
+Em vez de serializar o DOM inteiro com driver.page_source (vários MB pelo
+protocolo WebDriver) e parsear de novo com BeautifulSoup, o JavaScript abaixo
+roda na página e devolve só as tabelas alvo em JSON compacto:
+
+- header: matriz de cabeçalhos do thead com colspan/rowspan já resolvidos
+  (mesmo algoritmo de extract_table_data)
+- rows: linhas do corpo como listas de [texto, colspan]
+- html: outerHTML da tabela apenas quando ela não tem thead utilizável, para o
+  Python cair no caminho BeautifulSoup
+
+O texto das células imita get_text(strip=True): cada nó de texto é aparado e
+os não vazios são concatenados.
+"""
+from typing import Dict, Iterable, List, Optional
+
+# Páginas de bloqueio reconhecidas pelo título (em minúsculas): 403 do servidor,
+# Access Denied de CDN e desafio do Cloudflare. Um "403" solto no conteúdo
+# (público de 24,403, estatística de jogador) não é bloqueio.
+BLOCK_TITLES = ('403 forbidden', 'access denied', 'just a moment', 'attention required')
+# Marcadores das páginas de erro/desafio do Cloudflare
+BLOCK_MARKERS = ('id="cf-error-details"', 'id="challenge-form"', 'cf-browser-verification', 'window._cf_chl_opt')
+
+# arguments[0]: BLOCK_MARKERS. Título, marcador de bloqueio e tabelas com id (em ordem de documento)
+_PAGE_INFO_JS = """
+var html = document.documentElement.outerHTML;
+var markers = arguments[0];
+var tables = [];
+var nodes = document.querySelectorAll('table[id]');
+for (var i = 0; i < nodes.length; i++) {
+    tables.push({id: nodes[i].id, classes: (nodes[i].getAttribute('class') || '').split(/\\s+/).filter(Boolean)});
+}
+return {
+    title: document.title,
+    marker: markers.some(function (marker) { return html.indexOf(marker) >= 0; }),
+    tables: tables
+};
+"""
+
+# arguments[0]: ids das tabelas a extrair
+_EXTRACT_TABLES_JS = """
+function cellText(cell) {
+    var walker = document.createTreeWalker(cell, NodeFilter.SHOW_TEXT, null, false);
+    var parts = [], node, text;
+    while ((node = walker.nextNode())) {
+        text = node.nodeValue.trim();
+        if (text) {
+            parts.push(text);
+        }
+    }
+    return parts.join('');
+}
+
+function span(cell, name) {
+    var value = cell.getAttribute(name);
+    return value === null ? 1 : parseInt(value, 10);
+}
+
+function headerMatrix(table) {
+    var thead = table.querySelector('thead');
+    if (!thead) {
+        return null;
+    }
+    var headerRows = thead.querySelectorAll('tr');
+    if (!headerRows.length) {
+        return null;
+    }
+    var rows = [], maxCols = 0, r, c, i;
+    for (r = 0; r < headerRows.length; r++) {
+        var cells = headerRows[r].querySelectorAll('th, td');
+        var count = 0;
+        rows.push(cells);
+        for (i = 0; i < cells.length; i++) {
+            count += span(cells[i], 'colspan');
+        }
+        maxCols = Math.max(maxCols, count);
+    }
+    if (!maxCols) {
+        return null;
+    }
+    var matrix = [];
+    for (r = 0; r < rows.length; r++) {
+        var line = [];
+        for (c = 0; c < maxCols; c++) {
+            line.push('');
+        }
+        matrix.push(line);
+    }
+    for (r = 0; r < rows.length; r++) {
+        var col = 0;
+        for (i = 0; i < rows[r].length; i++) {
+            while (col < maxCols && matrix[r][col]) {
+                col++;
+            }
+            if (col >= maxCols) {
+                break;
+            }
+            var cell = rows[r][i];
+            var colspan = span(cell, 'colspan'), rowspan = span(cell, 'rowspan');
+            var text = cellText(cell);
+            for (var rr = r; rr < Math.min(r + rowspan, rows.length); rr++) {
+                for (c = col; c < Math.min(col + colspan, maxCols); c++) {
+                    if (!matrix[rr][c]) {
+                        matrix[rr][c] = text;
+                    }
+                }
+            }
+            col += colspan;
+        }
+    }
+    return matrix;
+}
+
+function bodyRows(table) {
+    var tbody = table.querySelector('tbody');
+    var rows = (tbody || table).querySelectorAll('tr');
+    var result = [];
+    for (var r = 0; r < rows.length; r++) {
+        // Ignora linhas de cabeçalho repetidas
+        if ((rows[r].getAttribute('class') || '').indexOf('thead') >= 0) {
+            continue;
+        }
+        var cells = rows[r].querySelectorAll('td, th');
+        var line = [];
+        for (var i = 0; i < cells.length; i++) {
+            line.push([cellText(cells[i]), span(cells[i], 'colspan')]);
+        }
+        result.push(line);
+    }
+    return result;
+}
+
+var result = {};
+var ids = arguments[0];
+for (var t = 0; t < ids.length; t++) {
+    var table = document.getElementById(ids[t]);
+    if (!table || table.tagName !== 'TABLE') {
+        continue;
+    }
+    var header = headerMatrix(table);
+    result[ids[t]] = header
+        ? {header: header, rows: bodyRows(table)}
+        : {html: table.outerHTML};
+}
+return result;
+"""
+
+
+def is_block_title(title: Optional[str]) -> bool:
+    """True se o título é de uma página de bloqueio (403, Access Denied, Cloudflare)"""
+    title_text = (title or '').strip().lower()
+    return title_text == '403' or any(block_title in title_text for block_title in BLOCK_TITLES)
+
+
+def has_block_marker(html: str, markers: Iterable[str] = BLOCK_MARKERS) -> bool:
+    """True se o HTML traz um marcador das páginas de erro/desafio do Cloudflare"""
+    return any(marker in html for marker in markers)
+
+
+def is_blocked_page(title: Optional[str], html: str) -> bool:
+    """Bloqueio real: pelo título ou por um marcador do Cloudflare, nunca por substring solta"""
+    return is_block_title(title) or has_block_marker(html)
+
+
+def page_info(driver) -> Dict:
+    """Título, indicador de bloqueio (is_blocked_page) e [{id, classes}] das tabelas"""
+    info = driver.execute_script(_PAGE_INFO_JS, list(BLOCK_MARKERS))
+    info['blocked'] = is_block_title(info.get('title')) or bool(info.pop('marker', False))
+    return info
+
+
+def extract_tables(driver, table_ids: List[str]) -> Dict[str, Dict]:
+    """Extrai as tabelas pelo id; tabelas ausentes não aparecem no resultado"""
+    if not table_ids:
+        return {}
+    return driver.execute_script(_EXTRACT_TABLES_JS, list(table_ids))
@@ -0,0 +1,113 @@
+"""
+Esperas orientadas a eventos para páginas carregadas via Selenium.
+
+Substitui o piso fixo de time.sleep(3) + espera do botão de cookies: a página é
+considerada pronta assim que as tabelas alvo (ids do TABLE_MAPPING) estão no
+DOM ou, se elas não aparecerem, quando document.readyState é 'complete' e o DOM
+fica sem mutações por um intervalo curto (MutationObserver).
+"""
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Tempo sem mutações no DOM para considerar a página estável (ms)
+DEFAULT_SETTLE_MS = 500
+POLL_FREQUENCY = 0.1
+
+COOKIE_BUTTON_XPATH = "//button[contains(text(), 'Accept') or contains(text(), 'Aceitar')]"
+
+# Flags de re traduzidas para o RegExp do JavaScript (as demais não têm equivalente)
+_JS_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'))
+
+# arguments[0]: lista (uma por tipo de tabela) de [{source, flags}] ou null; arguments[1]: settle em ms
+_PAGE_READY_JS = """
+var patterns = arguments[0], settleMs = arguments[1];
+if (!window.__fbrefObserver) {
+    window.__fbrefLastMutation = Date.now();
+    window.__fbrefObserver = new MutationObserver(function () {
+        window.__fbrefLastMutation = Date.now();
+    });
+    window.__fbrefObserver.observe(document.documentElement, {childList: true, subtree: true});
+}
+if (patterns && patterns.length) {
+    var ids = [];
+    var tables = document.querySelectorAll('table[id]');
+    for (var i = 0; i < tables.length; i++) {
+        ids.push(tables[i].id);
+    }
+    var ready = patterns.every(function (alternatives) {
+        return alternatives.some(function (pattern) {
+            var re = new RegExp(pattern.source, pattern.flags);
+            return ids.some(function (id) { return re.test(id); });
+        });
+    });
+    if (ready) {
+        return 'tables';
+    }
+}
+if (document.readyState === 'complete' && Date.now() - window.__fbrefLastMutation >= settleMs) {
+    return 'settled';
+}
+return false;
+"""
+
+
+def js_flags(flags: int) -> str:
+    """Flags de um re.Pattern no formato do RegExp ('i', 'm', 's')"""
+    return ''.join(js_flag for re_flag, js_flag in _JS_FLAGS if flags & re_flag)
+
+
+def table_id_patterns(table_mapping: Dict, table_types: Iterable[str]) -> List[List[Dict[str, str]]]:
+    """
+    Converte as entradas do TABLE_MAPPING em regex JavaScript, uma lista por tipo de tabela
+
+    IDs literais viram ^id$; regex compiladas são reaproveitadas (re.search e
+    RegExp.test têm a mesma semântica de busca parcial) junto com as flags, para
+    que um padrão com re.IGNORECASE também ignore maiúsculas no navegador.
+    Alternativas com as mesmas flags são unidas num único {source, flags}.
+    """
+    patterns = []
+    for table_type in table_types:
+        alternatives: Dict[str, List[str]] = {}
+        for table_id in table_mapping.get(table_type, []):
+            if isinstance(table_id, str):
+                alternatives.setdefault('', []).append(f'^{re.escape(table_id)}$')
+            elif hasattr(table_id, 'pattern'):
+                alternatives.setdefault(js_flags(table_id.flags), []).append(table_id.pattern)
+        if alternatives:
+            patterns.append([
+                {'source': '|'.join(f'(?:{source})' for source in sources), 'flags': flags}
+                for flags, sources in alternatives.items()
+            ])
+    return patterns
+
+
+def wait_for_page_ready(driver, timeout: float, patterns: Optional[List[List[Dict[str, str]]]] = None,
+                        settle_ms: int = DEFAULT_SETTLE_MS) -> str:
+    """
+    Espera as tabelas alvo ou a estabilização do DOM
+
+    Returns:
+        'tables' (todas as tabelas alvo presentes) ou 'settled' (DOM estável sem elas)
+
+    Raises:
+        TimeoutException se nenhuma das condições ocorrer dentro de `timeout`
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(
+        lambda d: d.execute_script(_PAGE_READY_JS, patterns or None, settle_ms)
+    )
+
+
+def dismiss_cookie_banner(driver) -> bool:
+    """Clica no botão de cookies se ele já estiver visível (sem esperar por ele)"""
+    from selenium.webdriver.common.by import By
+
+    try:
+        for button in driver.find_elements(By.XPATH, COOKIE_BUTTON_XPATH):
+            if button.is_displayed():
+                button.click()
+                return True
+    except Exception:
+        pass  # Banner removido/obstruído entre a busca e o clique
+    return False
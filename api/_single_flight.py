@@ -0,0 +1,182 @@
+"""
+Single-flight: requisições simultâneas para a mesma URL compartilham uma busca.
+
+Quando vários clientes abrem o mesmo campeonato ao mesmo tempo, só a primeira
+chamada (líder) busca e faz o parse da página; as demais esperam e recebem o
+mesmo resultado, em vez de cada uma bater no FBref.
+
+- No processo: chamadas em andamento indexadas pela chave (URL normalizada),
+  com um threading.Event que acorda as chamadas que chegaram depois
+- Entre processos (opcional, FBREF_SINGLE_FLIGHT=file): o líder de cada
+  processo segura um lock de arquivo (fcntl.flock) por chave. O líder de outro
+  processo espera o lock e, quando o obtém, a resposta já está no cache em
+  disco (_fbref_cache), então a busca dele não vai ao FBref. Sem o cache
+  habilitado o lock só serializa as buscas.
+
+FBREF_SINGLE_FLIGHT: 'process' (padrão), 'file' ou 'off'.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: só o modo em processo
+
+DEFAULT_LOCK_DIR = os.path.join(tempfile.gettempdir(), 'fbref-single-flight')
+
+MODES = ('process', 'file', 'off')
+
+
+class _Call:
+    """Chamada em andamento: resultado (ou exceção) compartilhado com quem esperar por ela"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+    def get(self):
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Agrupa chamadas simultâneas com a mesma chave numa única execução"""
+
+    def __init__(self, mode: Optional[str] = None, lock_dir: Optional[str] = None):
+        """
+        Args:
+            mode: 'process', 'file' (também lock de arquivo entre processos) ou 'off'
+            lock_dir: Diretório dos arquivos de lock do modo 'file'
+        """
+        mode = (mode or os.environ.get('FBREF_SINGLE_FLIGHT', 'process')).lower()
+        if mode not in MODES:
+            print(f"[SingleFlight] Modo desconhecido '{mode}'; usando 'process'")
+            mode = 'process'
+        if mode == 'file' and fcntl is None:
+            print("[SingleFlight] fcntl indisponível; lock entre processos desativado")
+            mode = 'process'
+        self.mode = mode
+        self.lock_dir = lock_dir or os.environ.get('FBREF_SINGLE_FLIGHT_DIR', DEFAULT_LOCK_DIR)
+        if self.mode == 'file':
+            os.makedirs(self.lock_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats = {'leaders': 0, 'shared': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off'
+
+    def _join(self, key: str) -> Tuple[_Call, bool]:
+        """Retorna (chamada, True se quem chamou é o líder)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats['shared'] += 1
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            self._stats['leaders'] += 1
+            return call, True
+
+    def _finish(self, key: str, call: _Call):
+        with self._lock:
+            self._calls.pop(key, None)
+        call.event.set()
+
+    @contextmanager
+    def _file_lock(self, key: str):
+        """Lock exclusivo por chave entre processos (no-op fora do modo 'file')"""
+        if self.mode != 'file':
+            yield
+            return
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        with open(os.path.join(self.lock_dir, f'{digest}.lock'), 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def do(self, key: str, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Executa func uma única vez por chave entre as chamadas simultâneas
+
+        Returns:
+            Tupla (resultado de func, True se o resultado veio de outra chamada)
+        """
+        if not self.enabled:
+            return func(), False
+
+        call, leader = self._join(key)
+        if not leader:
+            return call.get(), True
+
+        try:
+            with self._file_lock(key):
+                call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result, False
+
+    async def do_async(self, key: str, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Versão para corrotinas: func() retorna um awaitable
+
+        As chamadas que esperam não ocupam o event loop (a espera roda no
+        executor padrão), e o agrupamento vale também entre event loops de
+        threads diferentes.
+        """
+        if not self.enabled:
+            return await func(), False
+
+        loop = asyncio.get_running_loop()
+        call, leader = self._join(key)
+        if not leader:
+            return await loop.run_in_executor(None, call.get), True
+
+        file_lock = self._file_lock(key)
+        try:
+            await loop.run_in_executor(None, file_lock.__enter__)
+            try:
+                call.result = await func()
+            finally:
+                file_lock.__exit__(None, None, None)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result, False
+
+    def stats(self) -> Dict:
+        """Contadores de execuções (leaders), resultados compartilhados e chamadas em andamento"""
+        with self._lock:
+            return {**self._stats, 'in_flight': len(self._calls)}
+
+
+_default_single_flight: Optional[SingleFlight] = None
+_default_lock = threading.Lock()
+
+
+def get_default_single_flight() -> SingleFlight:
+    """SingleFlight do processo, compartilhado por todos os scrapers e handlers"""
+    global _default_single_flight
+    with _default_lock:
+        if _default_single_flight is None:
+            _default_single_flight = SingleFlight()
+        return _default_single_flight
@@ -0,0 +1,287 @@
+"""
+Snapshots das tabelas extraídas do FBref em SQLite, com diff entre snapshots.
+
+save_to_json/save_to_csv sobrescreviam output/*.json|csv e as rotas não
+guardavam nada, então cada análise refazia o scraping da tabela inteira. Aqui
+cada tabela extraída vira um snapshot (liga, temporada, tipo, fetched_at) com
+as linhas em JSON:
+
+- índices por liga/temporada/tipo + data e por squad (histórico de um time)
+- extrações iguais à última do mesmo tipo não criam snapshot novo (hash da tabela)
+- diff(de, para) devolve só as linhas novas ou alteradas (chave: Squad, senão
+  Rk, senão a posição) e as chaves removidas, para o frontend pedir deltas
+- mantém os últimos `keep` snapshots por liga/temporada/tipo
+
+Usado por api/fbref-extract.py (parâmetros "since"/"snapshot", ver FBREF_SNAPSHOTS)
+e pelo scraper standalone (save_to_snapshots). Arquivos com prefixo "_" em
+api/ não viram rotas na Vercel.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), 'fbref-snapshots.sqlite3')
+DEFAULT_KEEP = 50
+
+# /en/comps/<id>/[<temporada>/]...: liga pelo id da competição
+COMP_URL_RE = re.compile(r'/comps/(\d+)(?:/(\d{4}(?:-\d{4})?)/)?')
+CURRENT_SEASON = 'current'
+
+# Colunas que identificam a linha entre snapshots, em ordem de preferência
+ROW_KEY_COLUMNS = ('Squad', 'Rk')
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS snapshots ('
+    'id INTEGER PRIMARY KEY AUTOINCREMENT, league TEXT NOT NULL, season TEXT NOT NULL, '
+    'table_type TEXT NOT NULL, url TEXT, fetched_at REAL NOT NULL, row_count INTEGER NOT NULL, '
+    'table_hash TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS idx_snapshots_key ON snapshots (league, season, table_type, fetched_at)',
+    'CREATE INDEX IF NOT EXISTS idx_snapshots_fetched_at ON snapshots (fetched_at)',
+    'CREATE TABLE IF NOT EXISTS snapshot_rows ('
+    'snapshot_id INTEGER NOT NULL, position INTEGER NOT NULL, row_key TEXT NOT NULL, squad TEXT, '
+    'row_hash TEXT NOT NULL, data TEXT NOT NULL, PRIMARY KEY (snapshot_id, position))',
+    'CREATE INDEX IF NOT EXISTS idx_snapshot_rows_squad ON snapshot_rows (squad, snapshot_id)',
+)
+
+SNAPSHOT_COLUMNS = 'id, league, season, table_type, url, fetched_at, row_count'
+
+
+def snapshot_key(url: str) -> Tuple[str, str]:
+    """(liga, temporada) pela URL do FBref; sem temporada na URL, 'current'"""
+    match = COMP_URL_RE.search(url or '')
+    if not match:
+        return ('unknown', CURRENT_SEASON)
+    return (match.group(1), match.group(2) or CURRENT_SEASON)
+
+
+def _row_hash(data: str) -> str:
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _row_keys(rows: List[Dict]) -> List[str]:
+    """Chave de cada linha; repetições ganham sufixo #n para continuar únicas"""
+    keys = []
+    seen: Dict[str, int] = {}
+    for position, row in enumerate(rows):
+        key = next((str(row[column]) for column in ROW_KEY_COLUMNS if row.get(column)), str(position))
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        keys.append(f'{key}#{count}' if count else key)
+    return keys
+
+
+def _snapshot_dict(row) -> Dict:
+    snapshot_id, league, season, table_type, url, fetched_at, row_count = row
+    return {'id': snapshot_id, 'league': league, 'season': season, 'tableType': table_type,
+            'url': url, 'fetchedAt': fetched_at, 'rowCount': row_count}
+
+
+class SnapshotStore:
+    """Snapshots de tabelas num arquivo SQLite compartilhado entre threads e processos"""
+
+    def __init__(self, path: Optional[str] = None, keep: Optional[int] = None):
+        """
+        Args:
+            path: Arquivo SQLite (padrão FBREF_SNAPSHOT_DB ou <tmp>/fbref-snapshots.sqlite3)
+            keep: Snapshots mantidos por liga/temporada/tipo (padrão FBREF_SNAPSHOT_KEEP ou 50)
+        """
+        self.path = path or os.environ.get('FBREF_SNAPSHOT_DB') or DEFAULT_DB_PATH
+        self.keep = keep if keep is not None else int(os.environ.get('FBREF_SNAPSHOT_KEEP', DEFAULT_KEEP))
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    def record(self, league: str, season: str, table_type: str, rows: List[Dict],
+               url: Optional[str] = None, fetched_at: Optional[float] = None) -> Dict:
+        """
+        Grava a tabela como snapshot e devolve seus metadados
+
+        Se as linhas forem iguais às do último snapshot da mesma
+        liga/temporada/tipo, devolve esse snapshot sem gravar outro.
+        """
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        encoded = [json.dumps(row, ensure_ascii=False, sort_keys=True) for row in rows]
+        row_hashes = [_row_hash(data) for data in encoded]
+        table_hash = _row_hash('\n'.join(row_hashes))
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                latest = conn.execute(
+                    f'SELECT {SNAPSHOT_COLUMNS}, table_hash FROM snapshots '
+                    'WHERE league = ? AND season = ? AND table_type = ? ORDER BY fetched_at DESC, id DESC LIMIT 1',
+                    (league, season, table_type),
+                ).fetchone()
+                if latest is not None and latest[-1] == table_hash:
+                    conn.execute('COMMIT')
+                    return {**_snapshot_dict(latest[:-1]), 'created': False}
+
+                snapshot_id = conn.execute(
+                    'INSERT INTO snapshots (league, season, table_type, url, fetched_at, row_count, table_hash) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (league, season, table_type, url, fetched_at, len(rows), table_hash),
+                ).lastrowid
+                conn.executemany(
+                    'INSERT INTO snapshot_rows (snapshot_id, position, row_key, squad, row_hash, data) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [(snapshot_id, position, key, row.get('Squad'), row_hash, data)
+                     for position, (row, key, row_hash, data)
+                     in enumerate(zip(rows, _row_keys(rows), row_hashes, encoded))],
+                )
+                self._prune(conn, league, season, table_type)
+                conn.execute('COMMIT')
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+            finally:
+                conn.close()
+
+        return {'id': snapshot_id, 'league': league, 'season': season, 'tableType': table_type,
+                'url': url, 'fetchedAt': fetched_at, 'rowCount': len(rows), 'created': True}
+
+    def _prune(self, conn: sqlite3.Connection, league: str, season: str, table_type: str):
+        """Remove os snapshots além dos `keep` mais recentes da liga/temporada/tipo"""
+        if self.keep <= 0:
+            return
+        stale = [row[0] for row in conn.execute(
+            'SELECT id FROM snapshots WHERE league = ? AND season = ? AND table_type = ? '
+            'ORDER BY fetched_at DESC, id DESC LIMIT -1 OFFSET ?',
+            (league, season, table_type, self.keep),
+        )]
+        if stale:
+            placeholders = ','.join('?' * len(stale))
+            conn.execute(f'DELETE FROM snapshot_rows WHERE snapshot_id IN ({placeholders})', stale)
+            conn.execute(f'DELETE FROM snapshots WHERE id IN ({placeholders})', stale)
+
+    def get(self, snapshot_id: int) -> Optional[Dict]:
+        """Metadados do snapshot ou None"""
+        with self._connect() as conn:
+            row = conn.execute(f'SELECT {SNAPSHOT_COLUMNS} FROM snapshots WHERE id = ?', (snapshot_id,)).fetchone()
+        return _snapshot_dict(row) if row else None
+
+    def history(self, league: str, season: str, table_type: str, limit: int = 20) -> List[Dict]:
+        """Snapshots da liga/temporada/tipo, do mais recente para o mais antigo"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f'SELECT {SNAPSHOT_COLUMNS} FROM snapshots WHERE league = ? AND season = ? AND table_type = ? '
+                'ORDER BY fetched_at DESC, id DESC LIMIT ?',
+                (league, season, table_type, limit),
+            ).fetchall()
+        return [_snapshot_dict(row) for row in rows]
+
+    def rows(self, snapshot_id: int) -> List[Dict]:
+        """Linhas do snapshot, na ordem da tabela"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT data FROM snapshot_rows WHERE snapshot_id = ? ORDER BY position', (snapshot_id,)
+            ).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def squad_history(self, league: str, season: str, table_type: str, squad: str,
+                      limit: int = 20) -> List[Dict]:
+        """Linha do time em cada snapshot (mais recente primeiro), com fetchedAt e snapshotId"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT s.id, s.fetched_at, r.data FROM snapshot_rows r JOIN snapshots s ON s.id = r.snapshot_id '
+                'WHERE r.squad = ? AND s.league = ? AND s.season = ? AND s.table_type = ? '
+                'ORDER BY s.fetched_at DESC, s.id DESC LIMIT ?',
+                (squad, league, season, table_type, limit),
+            ).fetchall()
+        return [{'snapshotId': snapshot_id, 'fetchedAt': fetched_at, 'row': json.loads(data)}
+                for snapshot_id, fetched_at, data in rows]
+
+    def _keyed_rows(self, conn: sqlite3.Connection, snapshot_id: int) -> Iterable[Tuple[str, str, str]]:
+        return conn.execute(
+            'SELECT row_key, row_hash, data FROM snapshot_rows WHERE snapshot_id = ? ORDER BY position', (snapshot_id,)
+        )
+
+    def diff(self, from_id: int, to_id: Optional[int] = None) -> Optional[Dict]:
+        """
+        Linhas que mudaram de um snapshot para outro
+
+        Args:
+            from_id: Snapshot de referência (o último que o cliente tem)
+            to_id: Snapshot de destino; padrão: o mais recente da mesma liga/temporada/tipo
+
+        Returns:
+            {"from", "to", "changed": [linhas novas ou alteradas, na ordem de "to"],
+            "removed": [chaves], "unchanged": n} ou None se algum snapshot não existe
+            (ou são de tabelas diferentes)
+        """
+        base = self.get(from_id)
+        if base is None:
+            return None
+        if to_id is None:
+            latest = self.history(base['league'], base['season'], base['tableType'], limit=1)
+            to_id = latest[0]['id'] if latest else from_id
+        target = self.get(to_id)
+        if target is None or (target['league'], target['season'], target['tableType']) != \
+                (base['league'], base['season'], base['tableType']):
+            return None
+
+        with self._connect() as conn:
+            before = {key: row_hash for key, row_hash, _ in self._keyed_rows(conn, from_id)}
+            changed = []
+            unchanged = 0
+            seen = set()
+            for key, row_hash, data in self._keyed_rows(conn, to_id):
+                seen.add(key)
+                if before.get(key) == row_hash:
+                    unchanged += 1
+                else:
+                    changed.append(json.loads(data))
+        return {
+            'from': from_id,
+            'to': to_id,
+            'changed': changed,
+            'removed': [key for key in before if key not in seen],
+            'unchanged': unchanged,
+        }
+
+
+SNAPSHOT_MODES = ('request', 'always', 'off')
+
+
+def snapshots_mode() -> str:
+    """
+    FBREF_SNAPSHOTS: 'request' (padrão; só quando a requisição pede, com since ou
+    "snapshot": true), 'always' (toda extração) ou 'off'
+    """
+    mode = os.environ.get('FBREF_SNAPSHOTS', 'request').lower()
+    return mode if mode in SNAPSHOT_MODES else 'request'
+
+
+_default_store: Optional[SnapshotStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_snapshot_store() -> Optional[SnapshotStore]:
+    """
+    Store do processo, ou None com FBREF_SNAPSHOTS=off ou SQLite indisponível
+
+    FBREF_SNAPSHOT_DB (arquivo) e FBREF_SNAPSHOT_KEEP (snapshots por tabela).
+    """
+    global _default_store
+    if snapshots_mode() == 'off':
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            try:
+                _default_store = SnapshotStore()
+            except sqlite3.Error as e:
+                print(f"[SnapshotStore] SQLite indisponível ({e}); snapshots desativados")
+                return None
+        return _default_store
@@ -0,0 +1,48 @@
+"""
+Formatos de saída das tabelas extraídas.
+
+- 'rows' (padrão): lista de dicts, um por linha, como extract_table_data devolve
+- 'columnar': {"columns": [...], "rows": [[...], ...]}; os nomes das colunas
+  aparecem uma vez só em vez de se repetirem em cada linha, o que reduz
+  memória e payload nas tabelas largas (standard_for tem ~30 colunas)
+"""
+from typing import Dict, List, Union
+
+TABLE_FORMATS = ('rows', 'columnar')
+
+
+def parse_table_format(value) -> str:
+    """Valida o formato pedido pelo cliente (None = 'rows'); ValueError se desconhecido"""
+    if value is None:
+        return 'rows'
+    if value not in TABLE_FORMATS:
+        raise ValueError(f"format deve ser um de: {', '.join(TABLE_FORMATS)}")
+    return value
+
+
+def to_columnar(rows: List[Dict]) -> Dict:
+    """
+    Converte linhas (dicts) para o formato colunar
+
+    As colunas seguem a ordem em que aparecem; chaves ausentes numa linha
+    viram None.
+    """
+    columns = {}
+    for row in rows:
+        for key in row:
+            columns.setdefault(key, None)
+    columns = list(columns)
+    return {
+        'columns': columns,
+        'rows': [[row.get(column) for column in columns] for row in rows],
+    }
+
+
+def format_table(rows: List[Dict], table_format: str) -> Union[List[Dict], Dict]:
+    """Aplica o formato de saída a uma tabela"""
+    return to_columnar(rows) if table_format == 'columnar' else rows
+
+
+def table_fields(rows: List[Dict], table_format: str) -> Dict:
+    """Campos da tabela num evento NDJSON: {"rows"} ou {"columns", "rows"}"""
+    return to_columnar(rows) if table_format == 'columnar' else {'rows': rows}
@@ -0,0 +1,229 @@
+"""
+Cabeçalhos das tabelas do FBref: normalização memoizada e cache de layouts.
+
+- normalize_header_name: mapeamento fixo (HEADER_FIELD_MAPPING) montado uma
+  vez por processo, com lru_cache sobre o nome bruto
+- header_matrix: resolve colspan/rowspan do thead numa matriz linhas x colunas
+- HeaderLayoutCache: o layout do thead de cada tabela do FBref é estável entre
+  páginas e temporadas; os cabeçalhos finais ficam guardados pela assinatura
+  (hash) das células do thead, e extrações repetidas pulam a matriz e a
+  combinação das linhas
+
+Usado por api/fbref-extract.py e api/fbref-extract-selenium.py.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Célula do thead: (texto, colspan, rowspan)
+HeaderCell = Tuple[str, int, int]
+
+DEFAULT_LAYOUT_CACHE_SIZE = 256
+
+HEADER_FIELD_MAPPING = {
+    'rk': 'Rk',
+    'rank': 'Rk',
+    'squad': 'Squad',
+    'team': 'Squad',
+    'mp': 'MP',
+    'matches played': 'MP',
+    'w': 'W',
+    'wins': 'W',
+    'd': 'D',
+    'draws': 'D',
+    'l': 'L',
+    'losses': 'L',
+    'gf': 'GF',
+    'goals for': 'GF',
+    'ga': 'GA',
+    'goals against': 'GA',
+    'gd': 'GD',
+    'goal difference': 'GD',
+    'pts': 'Pts',
+    'points': 'Pts',
+    'pts/mp': 'Pts/MP',
+    'pts / mp': 'Pts/MP',
+    'points per match': 'Pts/MP',
+    'xg': 'xG',
+    'expected goals': 'xG',
+    'xga': 'xGA',
+    'expected goals against': 'xGA',
+    'xgd': 'xGD',
+    'expected goal difference': 'xGD',
+    'xgd/90': 'xGD/90',
+    'xgd /90': 'xGD/90',
+    'xgd / 90': 'xGD/90',
+    'last 5': 'Last 5',
+    'last5': 'Last 5',
+    'last five': 'Last 5',
+    'attendance': 'Attendance',
+    'top team scorer': 'Top Team Scorer',
+    'top scorer': 'Top Team Scorer',
+    'goalkeeper': 'Goalkeeper',
+    'gk': 'Goalkeeper',
+}
+
+
+@lru_cache(maxsize=4096)
+def normalize_header_name(header: str) -> str:
+    """
+    Normaliza nomes de cabeçalhos para garantir consistência
+    """
+    if not header:
+        return header
+
+    # Remove espaços extras
+    header = ' '.join(header.split())
+
+    # Mapeamento de normalizações comuns (case-insensitive)
+    header_lower = header.lower().strip()
+
+    if header_lower in HEADER_FIELD_MAPPING:
+        return HEADER_FIELD_MAPPING[header_lower]
+
+    # Normalizações específicas para campos compostos
+    if 'pts' in header_lower and 'mp' in header_lower:
+        return 'Pts/MP'
+    if 'xgd' in header_lower and '90' in header_lower:
+        return 'xGD/90'
+    if 'last' in header_lower and '5' in header_lower:
+        return 'Last 5'
+    if 'top' in header_lower and 'scorer' in header_lower:
+        return 'Top Team Scorer'
+
+    # Mantém o header original capitalizado apropriadamente
+    if header.isupper() or header.islower():
+        words = header.split()
+        if len(words) > 1:
+            return ' '.join(word.capitalize() for word in words)
+        else:
+            return header.capitalize()
+
+    return header
+
+
+def header_matrix(header_rows: Sequence[Sequence[HeaderCell]]) -> List[List[str]]:
+    """
+    Monta a matriz de cabeçalhos (linhas x colunas) resolvendo colspan e rowspan
+
+    Args:
+        header_rows: Linhas do thead; cada célula é (texto, colspan, rowspan)
+    """
+    # Calcula número máximo de colunas
+    max_cols = 0
+    for row in header_rows:
+        max_cols = max(max_cols, sum(colspan for _, colspan, _ in row))
+
+    # Cria matriz de cabeçalhos
+    matrix = [[''] * max_cols for _ in range(len(header_rows))]
+
+    # Preenche matriz considerando colspan e rowspan
+    for row_idx, row in enumerate(header_rows):
+        col_idx = 0
+        for cell_text, colspan, rowspan in row:
+            # Pula células já preenchidas por rowspan de linhas anteriores
+            while col_idx < max_cols and matrix[row_idx][col_idx]:
+                col_idx += 1
+
+            if col_idx >= max_cols:
+                break
+
+            # Preenche todas as células cobertas por colspan e rowspan
+            for r in range(row_idx, min(row_idx + rowspan, len(header_rows))):
+                for c in range(col_idx, min(col_idx + colspan, max_cols)):
+                    if not matrix[r][c]:
+                        matrix[r][c] = cell_text
+
+            col_idx += colspan
+
+    return matrix
+
+
+def thead_cells(thead) -> List[List[HeaderCell]]:
+    """Células (texto, colspan, rowspan) de cada linha de um thead do BeautifulSoup"""
+    return [
+        [(cell.get_text(strip=True), int(cell.get('colspan', 1)), int(cell.get('rowspan', 1)))
+         for cell in row.find_all(['th', 'td'])]
+        for row in thead.find_all('tr')
+    ]
+
+
+def thead_signature(header_rows: Sequence[Sequence], variant: str = '') -> str:
+    """
+    Assinatura (hash) do layout do thead
+
+    Aceita as células (texto, colspan, rowspan) de thead_cells ou uma matriz
+    de cabeçalhos já resolvida (linhas de strings, como a do extrator JS).
+    `variant` separa layouts iguais resolvidos com regras diferentes (ex.: a
+    combinação de categorias só vale para standard_for).
+    """
+    digest = hashlib.blake2b(variant.encode('utf-8'), digest_size=16)
+    for row in header_rows:
+        digest.update(b'\x1e')
+        for cell in row:
+            digest.update(b'\x1f')
+            if isinstance(cell, str):
+                digest.update(cell.encode('utf-8'))
+            else:
+                digest.update('\x00'.join(str(part) for part in cell).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class HeaderLayoutCache:
+    """Cabeçalhos resolvidos por assinatura do thead (LRU, thread-safe)"""
+
+    def __init__(self, maxsize: int = DEFAULT_LAYOUT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._layouts: 'OrderedDict[str, Tuple[str, ...]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, header_rows: Sequence[Sequence], build: Callable[[], List[str]],
+                variant: str = '') -> List[str]:
+        """
+        Cabeçalhos do thead: do cache pela assinatura, ou `build()` na primeira vez
+
+        Devolve sempre uma lista nova (o chamador pode estendê-la com col_N).
+        """
+        key = thead_signature(header_rows, variant)
+        with self._lock:
+            layout = self._layouts.get(key)
+            if layout is not None:
+                self._layouts.move_to_end(key)
+                self.hits += 1
+                return list(layout)
+            self.misses += 1
+
+        layout = tuple(build())
+        with self._lock:
+            self._layouts[key] = layout
+            self._layouts.move_to_end(key)
+            while len(self._layouts) > self.maxsize:
+                self._layouts.popitem(last=False)
+        return list(layout)
+
+    def clear(self):
+        with self._lock:
+            self._layouts.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'size': len(self._layouts), 'hits': self.hits, 'misses': self.misses}
+
+
+_default_layout_cache: Optional[HeaderLayoutCache] = None
+_default_layout_cache_lock = threading.Lock()
+
+
+def get_default_header_cache() -> HeaderLayoutCache:
+    """Cache de layouts do processo, compartilhado entre instâncias dos scrapers"""
+    global _default_layout_cache
+    with _default_layout_cache_lock:
+        if _default_layout_cache is None:
+            _default_layout_cache = HeaderLayoutCache()
+        return _default_layout_cache
@@ -0,0 +1,149 @@
+"""
+Localização das tabelas do FBref por tipo (geral, ...), a partir do TABLE_MAPPING.
+
+find_table_by_type recompilava os regex a cada chamada, fazia uma varredura do
+documento por padrão e tratava qualquer string iniciada por 'r' como regex
+(inclusive ids literais como 'results2025-2026111_overall', buscados como
+'esults2025-2026111_overall'). O TableLocator:
+
+- compila o mapeamento uma vez: strings são ids literais, padrões são
+  re.Pattern (re.compile)
+- indexa as tabelas do documento numa única passada (id, classes, nó) e
+  resolve cada tipo sobre esse índice, em O(tabelas)
+- mantém as regras de antes: prioridade na ordem do mapeamento, ordem do
+  documento entre tabelas que casam o mesmo padrão, 'geral' ignora home_away
+  e, sem nenhum padrão, cai nas tabelas stats_table com '_overall' no id
+
+Usado por api/fbref-extract.py (índice vindo do backend de parse e parada
+antecipada no modo stream)
+e api/fbref-extract-selenium.py (lista [{id, classes}] vinda do navegador).
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Tuple, Union
+
+# results<temporada><competição>_overall em qualquer temporada/competição:
+# results2025-2026111_overall, stats_results_2025-2026_111_overall, results2025221_overall
+SEASON_OVERALL_RE = re.compile(r'^(?:stats_)?results_?\d{4}(?:-\d{4})?_?\d+_overall$', re.IGNORECASE)
+
+# Ids ignorados por tipo (a tabela casa/fora também termina em _overall em algumas páginas)
+EXCLUDED_ID_PARTS = {
+    'geral': ('home_away',),
+}
+
+# Entrada do índice: (id, classes, nó)
+IndexEntry = Tuple[str, Sequence[str], object]
+
+
+class TableLocator:
+    """Resolve tipos de tabela contra um índice de ids do documento"""
+
+    def __init__(self, table_mapping: Dict[str, Sequence[Union[str, Pattern]]]):
+        self._literals: Dict[str, List[str]] = {}
+        self._rules: Dict[str, List[Union[str, Pattern]]] = {}
+        for table_type, patterns in table_mapping.items():
+            rules = []
+            for pattern in patterns:
+                if isinstance(pattern, str):
+                    rules.append(pattern)
+                else:
+                    rules.append(re.compile(pattern.pattern, pattern.flags | re.IGNORECASE))
+            self._rules[table_type] = rules
+            self._literals[table_type] = [rule for rule in rules if isinstance(rule, str)]
+        self._candidate_literals = {rule for rules in self._literals.values() for rule in rules}
+        self._candidate_patterns = [rule for rules in self._rules.values() for rule in rules if not isinstance(rule, str)]
+
+    @property
+    def mapping(self) -> Dict[str, List[Union[str, Pattern]]]:
+        """Regras compiladas por tipo (padrões já com re.IGNORECASE), na ordem de prioridade"""
+        return {table_type: list(rules) for table_type, rules in self._rules.items()}
+
+    @staticmethod
+    def index(soup) -> List[IndexEntry]:
+        """Tabelas com id do documento BeautifulSoup, em ordem de documento"""
+        return [(table.get('id'), table.get('class') or [], table) for table in soup.find_all('table', id=True)]
+
+    @staticmethod
+    def _excluded(table_type: str, table_id: str) -> bool:
+        table_id_lower = table_id.lower()
+        return any(part in table_id_lower for part in EXCLUDED_ID_PARTS.get(table_type, ()))
+
+    def resolve(self, entries: Iterable[IndexEntry], table_type: str):
+        """Nó (terceiro item da entrada) da tabela do tipo, ou None"""
+        entries = list(entries)
+        by_id = {}
+        for entry in entries:
+            by_id.setdefault(entry[0], entry)
+
+        for rule in self._rules.get(table_type, []):
+            if isinstance(rule, str):
+                entry = by_id.get(rule)
+                if entry is not None:
+                    return entry[2]
+                continue
+            for table_id, _, node in entries:
+                if rule.search(table_id) and not self._excluded(table_type, table_id):
+                    return node
+
+        # Fallback: busca por classe stats_table e verifica ID
+        if table_type == 'geral':
+            for table_id, classes, node in entries:
+                if 'stats_table' in classes and '_overall' in table_id.lower() and not self._excluded(table_type, table_id):
+                    return node
+        return None
+
+    def locate(self, soup, table_type: str):
+        """Tabela do tipo no documento BeautifulSoup (equivalente a find_table_by_type)"""
+        return self.resolve(self.index(soup), table_type)
+
+    def locate_all(self, soup, table_types: Iterable[str]) -> Dict[str, object]:
+        """Tabelas de vários tipos com uma única indexação do documento"""
+        return self.resolve_all(self.index(soup), table_types)
+
+    def resolve_all(self, entries: Iterable[IndexEntry], table_types: Iterable[str]) -> Dict[str, object]:
+        """resolve de vários tipos sobre o mesmo índice (ex.: HtmlBackend.tables)"""
+        entries = list(entries)
+        found = {}
+        for table_type in table_types:
+            table = self.resolve(entries, table_type)
+            if table is not None:
+                found[table_type] = table
+        return found
+
+    def select_id(self, tables: Sequence[Dict], table_type: str) -> Optional[str]:
+        """Id da tabela do tipo sobre a lista [{id, classes}] (ex.: vinda do navegador)"""
+        return self.resolve(((t['id'], t.get('classes') or [], t['id']) for t in tables if t.get('id')), table_type)
+
+    def is_final(self, table_type: str, table_id: Optional[str]) -> bool:
+        """
+        True se o id casa a regra de maior prioridade do tipo
+
+        Nenhuma tabela posterior no documento pode substituí-la em resolve, então
+        a leitura incremental pode parar assim que ela fecha.
+        """
+        rules = self._rules.get(table_type)
+        if not table_id or not rules:
+            return False
+        rule = rules[0]
+        if isinstance(rule, str):
+            return table_id == rule
+        return bool(rule.search(table_id)) and not self._excluded(table_type, table_id)
+
+    def is_candidate(self, table_id: Optional[str]) -> bool:
+        """True se o id pode ser resolvido para algum tipo mapeado"""
+        if not table_id:
+            return False
+        if '_overall' in table_id.lower() or table_id in self._candidate_literals:
+            return True
+        return any(pattern.search(table_id) for pattern in self._candidate_patterns)
+
+
+_locators: Dict[int, Tuple[Dict, TableLocator]] = {}
+
+
+def get_locator(table_mapping: Dict[str, Sequence[Union[str, Pattern]]]) -> TableLocator:
+    """Locator compilado uma vez por mapeamento (TABLE_MAPPING da classe) no processo"""
+    cached = _locators.get(id(table_mapping))
+    if cached is None or cached[0] is not table_mapping:
+        cached = (table_mapping, TableLocator(table_mapping))
+        _locators[id(table_mapping)] = cached
+    return cached[1]
@@ -0,0 +1,147 @@
+"""
+Conversão tipada das colunas numéricas extraídas do FBref.
+
+extract_table_data devolve tudo como texto ("+18.7", "2.78", "45,123"), e cada
+consumidor convertia de novo. Aqui as colunas conhecidas viram int/float numa
+passada por coluna, vetorizada com NumPy quando disponível:
+
+- Sinal "+" e separador de milhar "," são removidos
+- Células vazias (ou "—"/"-"), valores não numéricos e não finitos (nan, inf) viram None
+- Colunas inteiras: cada valor inteiro vira int e os demais ficam float, célula a
+  célula, com ou sem NumPy (os dois caminhos devolvem os mesmos valores e tipos)
+- Colunas de casa/fora ("Home MP", "Away xG", ...) usam o tipo da coluna base
+- Demais colunas (Squad, Last 5, links, ...) ficam intactas
+"""
+import math
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+INT = 'int'
+FLOAT = 'float'
+
+COLUMN_TYPES: Dict[str, str] = {
+    'MP': INT,
+    'W': INT,
+    'D': INT,
+    'L': INT,
+    'GF': INT,
+    'GA': INT,
+    'GD': INT,
+    'Pts': INT,
+    'Pts/MP': FLOAT,
+    'xG': FLOAT,
+    'xGA': FLOAT,
+    'xGD': FLOAT,
+    'xGD/90': FLOAT,
+    'Attendance': INT,
+}
+
+# Prefixos das colunas da tabela casa/fora
+SPLIT_PREFIXES = ('Home ', 'Away ')
+
+NULL_VALUES = ('', '-', '—', '–')
+
+# Linhas convertidas por vez em iter_typed_rows
+TYPED_BATCH_ROWS = 500
+
+
+def column_type(column: str, schema: Dict[str, str] = COLUMN_TYPES) -> Optional[str]:
+    """Tipo da coluna pelo schema (considerando os prefixos Home/Away) ou None"""
+    kind = schema.get(column)
+    if kind is None:
+        for prefix in SPLIT_PREFIXES:
+            if column.startswith(prefix):
+                return schema.get(column[len(prefix):])
+    return kind
+
+
+def _clean(value) -> str:
+    if value is None:
+        return ''
+    return str(value).strip().replace(',', '').lstrip('+')
+
+
+def convert_value(value, kind: str):
+    """Converte um valor isolado; vazio ou não numérico vira None"""
+    text = _clean(value)
+    if text in NULL_VALUES:
+        return None
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    if not math.isfinite(number):
+        return None
+    if kind == INT:
+        return int(number) if number.is_integer() else number
+    return number
+
+
+def _convert_column_numpy(values: Sequence, kind: str) -> List:
+    cleaned = np.array([_clean(value) for value in values], dtype=object)
+    blank = np.isin(cleaned, NULL_VALUES)
+    try:
+        numbers = np.where(blank, 'nan', cleaned).astype(np.float64)
+    except ValueError:
+        # Algum valor não numérico na coluna: converte célula a célula
+        return [convert_value(value, kind) for value in values]
+
+    blank |= ~np.isfinite(numbers)
+    converted = numbers.tolist()
+    if kind != INT:
+        return [None if is_blank else number for number, is_blank in zip(converted, blank.tolist())]
+    # int() por célula (o astype(int64) estouraria em valores fora do int64)
+    integral = (~blank & (np.where(blank, 0, numbers) % 1 == 0)).tolist()
+    return [None if is_blank else int(number) if is_integral else number
+            for number, is_blank, is_integral in zip(converted, blank.tolist(), integral)]
+
+
+def convert_column(values: Sequence, kind: str) -> List:
+    """Converte uma coluna inteira (NumPy se disponível, senão valor a valor)"""
+    if np is not None and values:
+        return _convert_column_numpy(values, kind)
+    return [convert_value(value, kind) for value in values]
+
+
+def apply_column_types(rows: List[Dict], schema: Dict[str, str] = COLUMN_TYPES) -> List[Dict]:
+    """
+    Devolve novas linhas com as colunas do schema convertidas
+
+    As linhas originais não são alteradas; colunas ausentes em alguma linha
+    continuam ausentes nela.
+    """
+    if not rows:
+        return rows
+
+    columns = {}
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns[key] = column_type(key, schema)
+
+    typed = [dict(row) for row in rows]
+    for column, kind in columns.items():
+        if kind is None:
+            continue
+        present = [index for index, row in enumerate(rows) if column in row]
+        converted = convert_column([rows[index][column] for index in present], kind)
+        for index, value in zip(present, converted):
+            typed[index][column] = value
+    return typed
+
+
+def iter_typed_rows(rows: Iterable[Dict], schema: Dict[str, str] = COLUMN_TYPES,
+                    batch_rows: int = TYPED_BATCH_ROWS) -> Iterator[Dict]:
+    """apply_column_types em lotes, para linhas que chegam de um iterador (streaming)"""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_rows))
+        if not batch:
+            return
+        yield from apply_column_types(batch, schema)
+
@@ -2,18 +2,16 @@
 API route Python para extrair dados de tabelas do fbref.com usando Selenium
 Baseado no repositório app-scraper/scraper_selenium.py
 """
+import itertools
 import json
-import time
 import os
 import re
+import sys
 from http.server import BaseHTTPRequestHandler
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 try:
     from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
     from selenium.webdriver.chrome.service import Service
     from selenium.webdriver.chrome.options import Options
     from bs4 import BeautifulSoup
@@ -27,6 +25,20 @@ except ImportError:
     # Fallback para desenvolvimento local
     pass
 
+# Módulos auxiliares compartilhados (arquivos api/_*.py não viram rotas na Vercel)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _browser_pool import get_default_pool
+from _circuit_breaker import CircuitBreaker, get_default_breaker
+from _fbref_ratelimit import host_key
+from _html_backend import get_backend
+from _ndjson import NDJSONStream, result_event, wants_ndjson
+from _table_format import format_table, parse_table_format, table_fields
+from _table_headers import get_default_header_cache, header_matrix, normalize_header_name
+from _table_locator import SEASON_OVERALL_RE, get_locator
+from _table_types import apply_column_types, iter_typed_rows
+from _selenium_extract import extract_tables, is_block_title, is_blocked_page, page_info
+from _selenium_wait import dismiss_cookie_banner, table_id_patterns, wait_for_page_ready
+
 
 class FBrefSeleniumScraper:
     """Scraper usando Selenium para sites com JavaScript dinâmico"""
@@ -34,23 +46,39 @@ class FBrefSeleniumScraper:
     # Mapeamento de nomes de tabelas para IDs HTML possíveis
     TABLE_MAPPING = {
         'geral': [
-            'stats_results_2025-2026_111_overall',
-            'results_2025-2026_111_overall',
-            'stats_results_2025-2026111_overall',
-            'results2025-2026111_overall',
+            # results<temporada><competição>_overall de qualquer temporada (ex.: results2025-2026111_overall)
+            SEASON_OVERALL_RE,
             # Padrões genéricos
             re.compile(r'stats_results_.*_overall'),
             re.compile(r'results.*_overall'),
         ],
     }
 
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, driver=None, extract_mode: Optional[str] = None,
+                 breaker: Optional[CircuitBreaker] = None, parser: Optional[str] = None):
         """
         Inicializa o driver Selenium
-        
+
         Args:
             headless: Se True, executa o navegador em modo headless
+            driver: WebDriver já aberto (ex.: emprestado do BrowserPool); nesse caso
+                close() não encerra o navegador, quem devolve ao pool é o dono
+            extract_mode: 'html' (page_source + backend de parse) ou 'browser' (extração
+                via JavaScript na página); padrão pela env FBREF_SELENIUM_EXTRACT
+            breaker: Circuit breaker por host (padrão: o do processo, compartilhado com as rotas HTTP)
+            parser: Backend de parse do page_source ('bs4', 'lxml', 'selectolax'); padrão pela
+                env FBREF_PARSER ('stream' vira 'lxml': o HTML já está todo no navegador)
         """
+        self.breaker = breaker if breaker is not None else get_default_breaker()
+        parser = (parser or os.environ.get('FBREF_PARSER', 'bs4')).lower()
+        self.backend = get_backend('lxml' if parser == 'stream' else parser)
+        self.extract_mode = (extract_mode or os.environ.get('FBREF_SELENIUM_EXTRACT', 'html')).lower()
+        self._owns_driver = driver is None
+        self.driver = driver if driver is not None else self.create_driver(headless)
+
+    @staticmethod
+    def create_driver(headless: bool = True):
+        """Abre um novo Chrome configurado para o FBref"""
         if 'webdriver' not in globals():
             raise ImportError("Selenium webdriver não encontrado. Verifique as dependências.")
 
@@ -74,386 +102,360 @@ class FBrefSeleniumScraper:
         if USE_WEBDRIVER_MANAGER and not os.environ.get('VERCEL'):
             # Em ambiente local, usa webdriver-manager
             service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            driver = webdriver.Chrome(service=service, options=chrome_options)
         else:
             # Em ambiente serverless ou sem webdriver-manager, tenta usar ChromeDriver do PATH
-            self.driver = webdriver.Chrome(options=chrome_options)
+            driver = webdriver.Chrome(options=chrome_options)
+        
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        return driver
+
+    def _load_page(self, url: str, wait_time: int, table_types: Optional[List[str]]) -> tuple[str, Optional[Dict]]:
+        """
+        Navega até a URL e espera as tabelas alvo
+
+        Returns:
+            Tupla (URL atual, dict com informações de erro ou None)
+        """
+        print(f"[FBrefSeleniumScraper] Acessando: {url}")
+        self.driver.get(url)
+        current_url = self.driver.current_url
+        print(f"[FBrefSeleniumScraper] URL atual: {current_url}")
+        
+        # Verifica se foi redirecionado para página de bloqueio ou de erro
+        if is_block_title(self.driver.title):
+            return (current_url, self._blocked_error_info(url, current_url))
+        page_title = self.driver.title.lower()
+        if 'error' in page_title or 'not found' in page_title or '404' in page_title or '403' in page_title:
+            error_info = {
+                "type": "page_error",
+                "status_code": None,
+                "message": f"Página retornou erro: {self.driver.title}",
+                "url": url,
+                "current_url": current_url,
+                "title": self.driver.title
+            }
+            print(f"[FBrefSeleniumScraper] Erro detectado no título: {error_info}")
+            return (current_url, error_info)
+        
+        # Espera orientada a eventos: retorna assim que as tabelas alvo estão no DOM
+        # (ou o DOM estabiliza), sem piso fixo de sleep por página
+        # Regras do locator: a espera no navegador usa as mesmas flags (re.IGNORECASE) do matcher Python
+        patterns = table_id_patterns(self.locator.mapping, table_types if table_types is not None else self.TABLE_MAPPING)
+        try:
+            ready = wait_for_page_ready(self.driver, wait_time, patterns)
+            if ready == 'tables':
+                print("[FBrefSeleniumScraper] Tabelas alvo detectadas na página")
+            else:
+                print("[FBrefSeleniumScraper] DOM estável sem as tabelas alvo")
+        except Exception as e:
+            # Se não encontrou tabelas, ainda pode ser uma página válida
+            print(f"[FBrefSeleniumScraper] Aviso: Página não estabilizou após {wait_time}s: {e}")
+            # Não retorna erro aqui, apenas loga o aviso
+        
+        # Aceita cookies se o banner já estiver na tela (não bloqueia esperando por ele)
+        if dismiss_cookie_banner(self.driver):
+            print("[FBrefSeleniumScraper] Cookies aceitos")
+        
+        return (current_url, None)
+
+    def _blocked_error_info(self, url: str, current_url: str) -> Dict:
+        error_info = {
+            "type": "403",
+            "status_code": 403,
+            "message": "Acesso negado: página de bloqueio detectada (título ou marcador do Cloudflare)",
+            "url": url,
+            "current_url": current_url
+        }
+        print(f"[FBrefSeleniumScraper] Página de bloqueio (403) detectada: {error_info}")
+        return error_info
+
+    def _title_error_info(self, url: str, current_url: str, title: str) -> Optional[Dict]:
+        """Verifica se a página carregou corretamente pelo título do documento"""
+        title_text = title.lower()
+        if 'error' in title_text or 'not found' in title_text or '404' in title_text:
+            error_info = {
+                "type": "page_error",
+                "status_code": None,
+                "message": f"Página retornou erro: {title}",
+                "url": url,
+                "current_url": current_url,
+                "title": title
+            }
+            print(f"[FBrefSeleniumScraper] Erro detectado no título HTML: {error_info}")
+            return error_info
+        return None
+
+    def _exception_error_info(self, e: Exception, url: str, wait_time: int) -> Dict:
+        error_type = type(e).__name__
+        error_message = str(e)
+        
+        # Identifica tipos específicos de erro do Selenium
+        if 'TimeoutException' in error_type or 'timeout' in error_message.lower():
+            error_info = {
+                "type": "timeout",
+                "status_code": None,
+                "message": f"Timeout ao aguardar elementos da página: {error_message}",
+                "url": url,
+                "exception_type": error_type,
+                "wait_time": wait_time
+            }
+        elif 'WebDriverException' in error_type:
+            error_info = {
+                "type": "webdriver_error",
+                "status_code": None,
+                "message": f"Erro do WebDriver: {error_message}",
+                "url": url,
+                "exception_type": error_type
+            }
+        elif 'NoSuchElementException' in error_type:
+            error_info = {
+                "type": "element_not_found",
+                "status_code": None,
+                "message": f"Elemento não encontrado: {error_message}",
+                "url": url,
+                "exception_type": error_type
+            }
+        else:
+            error_info = {
+                "type": "selenium_exception",
+                "status_code": None,
+                "message": f"Erro ao carregar página: {error_message}",
+                "url": url,
+                "exception_type": error_type
+            }
         
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        print(f"[FBrefSeleniumScraper] Erro: {error_info}")
+        return error_info
+
+    def _circuit_error_info(self, url: str, host: str) -> Dict:
+        circuit = self.breaker.snapshot(host)
+        error_info = {
+            "type": "circuit_open",
+            "status_code": None,
+            "message": f"FBref bloqueando requisições; novas tentativas suspensas por {circuit['retryAfter']:.0f}s",
+            "url": url,
+            "circuit": circuit
+        }
+        print(f"[FBrefSeleniumScraper] Circuito aberto: {error_info}")
+        return error_info
+
+    def _with_circuit(self, url: str, load: Callable[[], tuple]) -> tuple:
+        """
+        Executa o carregamento sob o circuit breaker do host
+
+        Bloqueios (403) e timeouts contam como falha; páginas carregadas (mesmo
+        com erro no título) como sucesso. Erros locais do WebDriver não contam.
+        Só páginas de bloqueio reais (is_blocked_page: título ou marcador do
+        Cloudflare) viram 403, porque o breaker é compartilhado com as rotas HTTP.
+        """
+        host = host_key(url)
+        if not self.breaker.allow(host):
+            return (None, self._circuit_error_info(url, host))
+        result, error_info = load()
+        error_type = error_info.get('type') if error_info else None
+        if error_type in ('403', 'timeout'):
+            self.breaker.record_failure(host)
+        elif error_type in (None, 'page_error'):
+            self.breaker.record_success(host)
+        return (result, error_info)
 
-    def get_page(self, url: str, wait_time: int = 10) -> tuple[Optional[BeautifulSoup], Optional[Dict]]:
+    def get_page(self, url: str, wait_time: int = 10,
+                 table_types: Optional[List[str]] = None) -> tuple[Optional[BeautifulSoup], Optional[Dict]]:
         """
         Carrega a página e retorna o conteúdo parseado com informações de erro
         
         Args:
             url: URL completa
-            wait_time: Tempo de espera em segundos
+            wait_time: Tempo máximo de espera em segundos
+            table_types: Tipos do TABLE_MAPPING aguardados (None = todos)
             
         Returns:
             Tupla (BeautifulSoup object ou None, dict com informações de erro ou None)
         """
+        return self._with_circuit(url, lambda: self._get_page(url, wait_time, table_types))
+
+    def _get_page(self, url: str, wait_time: int,
+                  table_types: Optional[List[str]]) -> tuple[Optional[BeautifulSoup], Optional[Dict]]:
         try:
-            print(f"[FBrefSeleniumScraper] Acessando: {url}")
-            self.driver.get(url)
-            current_url = self.driver.current_url
-            print(f"[FBrefSeleniumScraper] URL atual: {current_url}")
-            
-            # Verifica se foi redirecionado para página de erro
-            page_title = self.driver.title.lower()
-            if 'error' in page_title or 'not found' in page_title or '404' in page_title or '403' in page_title:
-                error_info = {
-                    "type": "page_error",
-                    "status_code": None,
-                    "message": f"Página retornou erro: {self.driver.title}",
-                    "url": url,
-                    "current_url": current_url,
-                    "title": self.driver.title
-                }
-                print(f"[FBrefSeleniumScraper] Erro detectado no título: {error_info}")
+            current_url, error_info = self._load_page(url, wait_time, table_types)
+            if error_info:
                 return (None, error_info)
             
-            # Aguarda o carregamento da página
-            time.sleep(3)
-            
-            # Tenta aceitar cookies se existir
-            try:
-                accept_button = WebDriverWait(self.driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'Aceitar')]"))
-                )
-                accept_button.click()
-                print("[FBrefSeleniumScraper] Cookies aceitos")
-                time.sleep(1)
-            except:
-                pass  # Botão de cookies não encontrado ou já foi clicado
-            
-            # Aguarda tabelas carregarem
-            try:
-                WebDriverWait(self.driver, wait_time).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "table"))
-                )
-                print("[FBrefSeleniumScraper] Tabelas detectadas na página")
-            except Exception as e:
-                # Se não encontrou tabelas, ainda pode ser uma página válida
-                print(f"[FBrefSeleniumScraper] Aviso: Nenhuma tabela encontrada após {wait_time}s: {e}")
-                # Não retorna erro aqui, apenas loga o aviso
-            
             # Obtém o HTML da página
             html = self.driver.page_source
             
-            # Verifica se o HTML contém indicadores de erro
-            if '403' in html or 'Forbidden' in html or 'Access Denied' in html:
-                error_info = {
-                    "type": "403",
-                    "status_code": 403,
-                    "message": "Acesso negado detectado no conteúdo da página",
-                    "url": url,
-                    "current_url": current_url
-                }
-                print(f"[FBrefSeleniumScraper] Erro 403 detectado no conteúdo: {error_info}")
-                return (None, error_info)
+            soup = self.backend.parse(html)
+            title = self.backend.title(soup)
             
-            soup = BeautifulSoup(html, 'lxml')
+            # Bloqueio real (título ou marcador do Cloudflare); "403" no meio do conteúdo não conta
+            if is_blocked_page(title, html):
+                return (None, self._blocked_error_info(url, current_url))
             
             # Verifica se a página carregou corretamente pelo título
-            title_tag = soup.find('title')
-            if title_tag:
-                title_text = title_tag.get_text().lower()
-                if 'error' in title_text or 'not found' in title_text or '404' in title_text:
-                    error_info = {
-                        "type": "page_error",
-                        "status_code": None,
-                        "message": f"Página retornou erro: {title_tag.get_text()}",
-                        "url": url,
-                        "current_url": current_url,
-                        "title": title_tag.get_text()
-                    }
-                    print(f"[FBrefSeleniumScraper] Erro detectado no título HTML: {error_info}")
+            if title:
+                error_info = self._title_error_info(url, current_url, title)
+                if error_info:
                     return (None, error_info)
             
-            print(f"[FBrefSeleniumScraper] Página carregada com sucesso (título: {title_tag.get_text() if title_tag else 'N/A'})")
+            print(f"[FBrefSeleniumScraper] Página carregada com sucesso (título: {title or 'N/A'})")
             return (soup, None)
             
         except Exception as e:
-            error_type = type(e).__name__
-            error_message = str(e)
+            return (None, self._exception_error_info(e, url, wait_time))
+
+    def get_tables_in_browser(self, url: str, table_types: List[str],
+                              wait_time: int = 10) -> tuple[Optional[Dict[str, Iterator[Dict]]], Optional[Dict]]:
+        """
+        Carrega a página e extrai as tabelas dentro do navegador (sem page_source)
+
+        O JavaScript devolve só as tabelas alvo (matriz de cabeçalhos + linhas);
+        o Python aplica a mesma combinação/normalização de cabeçalhos de
+        extract_table_data, à medida que as linhas são lidas.
+
+        Returns:
+            Tupla (dict tipo -> iterador de linhas ou None, dict com informações de erro ou None)
+        """
+        return self._with_circuit(url, lambda: self._get_tables_in_browser(url, table_types, wait_time))
+
+    def _get_tables_in_browser(self, url: str, table_types: List[str],
+                               wait_time: int) -> tuple[Optional[Dict[str, Iterator[Dict]]], Optional[Dict]]:
+        try:
+            current_url, error_info = self._load_page(url, wait_time, table_types)
+            if error_info:
+                return (None, error_info)
             
-            # Identifica tipos específicos de erro do Selenium
-            if 'TimeoutException' in error_type or 'timeout' in error_message.lower():
-                error_info = {
-                    "type": "timeout",
-                    "status_code": None,
-                    "message": f"Timeout ao aguardar elementos da página: {error_message}",
-                    "url": url,
-                    "exception_type": error_type,
-                    "wait_time": wait_time
-                }
-            elif 'WebDriverException' in error_type:
-                error_info = {
-                    "type": "webdriver_error",
-                    "status_code": None,
-                    "message": f"Erro do WebDriver: {error_message}",
-                    "url": url,
-                    "exception_type": error_type
-                }
-            elif 'NoSuchElementException' in error_type:
-                error_info = {
-                    "type": "element_not_found",
-                    "status_code": None,
-                    "message": f"Elemento não encontrado: {error_message}",
-                    "url": url,
-                    "exception_type": error_type
-                }
-            else:
-                error_info = {
-                    "type": "selenium_exception",
-                    "status_code": None,
-                    "message": f"Erro ao carregar página: {error_message}",
-                    "url": url,
-                    "exception_type": error_type
-                }
+            info = page_info(self.driver)
+            if info.get('blocked'):
+                return (None, self._blocked_error_info(url, current_url))
+            
+            error_info = self._title_error_info(url, current_url, info.get('title') or '')
+            if error_info:
+                return (None, error_info)
+            
+            table_ids = {
+                table_type: self._select_table_id(info.get('tables', []), table_type)
+                for table_type in table_types
+            }
+            extracted = extract_tables(self.driver, [table_id for table_id in table_ids.values() if table_id])
+            print(f"[FBrefSeleniumScraper] Página carregada com sucesso (título: {info.get('title') or 'N/A'}); "
+                  f"{len(extracted)} tabela(s) extraída(s) no navegador")
+            
+            tables = {}
+            for table_type, table_id in table_ids.items():
+                if table_id in extracted:
+                    tables[table_type] = self._iter_table_from_browser(extracted[table_id], table_type)
+            return (tables, None)
             
-            print(f"[FBrefSeleniumScraper] Erro: {error_info}")
-            return (None, error_info)
+        except Exception as e:
+            return (None, self._exception_error_info(e, url, wait_time))
 
-    def _normalize_header_name(self, header: str) -> str:
+    @property
+    def locator(self):
+        """TableLocator do TABLE_MAPPING (compilado uma vez por processo)"""
+        return get_locator(self.TABLE_MAPPING)
+
+    def _select_table_id(self, tables: List[Dict], table_type: str) -> Optional[str]:
         """
-        Normaliza nomes de cabeçalhos para garantir consistência
+        Equivalente a find_table_by_type sobre a lista [{id, classes}] das tabelas
+        da página (em ordem de documento)
         """
-        if not header:
-            return header
-        
-        # Remove espaços extras
-        header = ' '.join(header.split())
-        
-        # Mapeamento de normalizações comuns (case-insensitive)
-        header_lower = header.lower().strip()
-        
-        field_mapping = {
-            'rk': 'Rk',
-            'rank': 'Rk',
-            'squad': 'Squad',
-            'team': 'Squad',
-            'mp': 'MP',
-            'matches played': 'MP',
-            'w': 'W',
-            'wins': 'W',
-            'd': 'D',
-            'draws': 'D',
-            'l': 'L',
-            'losses': 'L',
-            'gf': 'GF',
-            'goals for': 'GF',
-            'ga': 'GA',
-            'goals against': 'GA',
-            'gd': 'GD',
-            'goal difference': 'GD',
-            'pts': 'Pts',
-            'points': 'Pts',
-            'pts/mp': 'Pts/MP',
-            'pts / mp': 'Pts/MP',
-            'points per match': 'Pts/MP',
-            'xg': 'xG',
-            'expected goals': 'xG',
-            'xga': 'xGA',
-            'expected goals against': 'xGA',
-            'xgd': 'xGD',
-            'expected goal difference': 'xGD',
-            'xgd/90': 'xGD/90',
-            'xgd /90': 'xGD/90',
-            'xgd / 90': 'xGD/90',
-            'last 5': 'Last 5',
-            'last5': 'Last 5',
-            'last five': 'Last 5',
-            'attendance': 'Attendance',
-            'top team scorer': 'Top Team Scorer',
-            'top scorer': 'Top Team Scorer',
-            'goalkeeper': 'Goalkeeper',
-            'gk': 'Goalkeeper',
-        }
-        
-        if header_lower in field_mapping:
-            return field_mapping[header_lower]
-        
-        # Normalizações específicas para campos compostos
-        if 'pts' in header_lower and 'mp' in header_lower:
-            return 'Pts/MP'
-        if 'xgd' in header_lower and '90' in header_lower:
-            return 'xGD/90'
-        if 'last' in header_lower and '5' in header_lower:
-            return 'Last 5'
-        if 'top' in header_lower and 'scorer' in header_lower:
-            return 'Top Team Scorer'
-        
-        # Mantém o header original capitalizado apropriadamente
-        if header.isupper() or header.islower():
-            words = header.split()
-            if len(words) > 1:
-                return ' '.join(word.capitalize() for word in words)
-            else:
-                return header.capitalize()
+        return self.locator.select_id(tables, table_type)
+
+    def _iter_table_from_browser(self, extracted: Dict, table_name: str) -> Iterator[Dict]:
+        """Converte o JSON do extrator JavaScript nas mesmas linhas de extract_table_data"""
+        if 'html' in extracted:
+            # Tabela sem thead utilizável: usa as heurísticas de cabeçalho do caminho HTML
+            doc = self.backend.parse(extracted['html'])
+            yield from self.iter_table_rows(doc, table_name=table_name)
+            return
         
-        return header
+        headers = get_default_header_cache().resolve(
+            extracted['header'], lambda: self._combine_header_matrix(extracted['header']), variant='selenium:matrix')
+        rows = ([(text, colspan) for text, colspan in row] for row in extracted['rows'])
+        yield from self._iter_rows_to_dicts(headers, rows)
 
-    def extract_table_data(self, soup: BeautifulSoup, table_id: Optional[str] = None, table_name: Optional[str] = None) -> List[Dict]:
+    def _normalize_header_name(self, header: str) -> str:
         """
-        Extrai dados de uma tabela HTML processando célula-por-célula para garantir todas as colunas
+        Normaliza nomes de cabeçalhos para garantir consistência (memoizado em _table_headers)
         """
-        if table_id:
-            table = soup.find('table', {'id': table_id})
-        else:
-            # Tenta encontrar tabela por múltiplos critérios
-            table = (soup.find('table', {'class': 'stats_table'}) or 
-                    soup.find('table', {'id': lambda x: x and 'stats' in str(x).lower()}) or
-                    soup.find('table'))
-        
-        if not table:
-            return []
-        
-        # 1. Extrair cabeçalhos do thead
+        return normalize_header_name(header)
+
+    def _combine_header_matrix(self, matrix: List[List[str]]) -> List[str]:
+        """Combina os cabeçalhos de múltiplas linhas (última linha como primária) e normaliza os nomes"""
+        max_cols = len(matrix[0]) if matrix else 0
         headers = []
-        thead = table.find('thead')
-        
-        if thead:
-            header_rows = thead.find_all('tr')
-            if header_rows:
-                # Calcula número máximo de colunas
-                max_cols = 0
-                for row in header_rows:
-                    cols = row.find_all(['th', 'td'])
-                    col_count = 0
-                    for col in cols:
-                        colspan = int(col.get('colspan', 1))
-                        col_count += colspan
-                    max_cols = max(max_cols, col_count)
-                
-                # Cria matriz de cabeçalhos
-                header_matrix = [[''] * max_cols for _ in range(len(header_rows))]
-                
-                # Preenche matriz considerando colspan e rowspan
-                for row_idx, row in enumerate(header_rows):
-                    col_idx = 0
-                    for cell in row.find_all(['th', 'td']):
-                        # Pula células já preenchidas por rowspan de linhas anteriores
-                        while col_idx < max_cols and header_matrix[row_idx][col_idx]:
-                            col_idx += 1
-                        
-                        if col_idx >= max_cols:
-                            break
-                        
-                        colspan = int(cell.get('colspan', 1))
-                        rowspan = int(cell.get('rowspan', 1))
-                        cell_text = cell.get_text(strip=True)
-                        
-                        # Preenche todas as células cobertas por colspan e rowspan
-                        for r in range(row_idx, min(row_idx + rowspan, len(header_rows))):
-                            for c in range(col_idx, min(col_idx + colspan, max_cols)):
-                                if not header_matrix[r][c]:
-                                    header_matrix[r][c] = cell_text
-                        
-                        col_idx += colspan
-                
-                # Combina cabeçalhos de múltiplas linhas (última linha como primária)
-                headers = []
-                for col_idx in range(max_cols):
-                    col_headers = []
-                    for row_idx in range(len(header_rows)):
-                        header_text = header_matrix[row_idx][col_idx]
-                        if header_text:
-                            col_headers.append(header_text)
+        for col_idx in range(max_cols):
+            col_headers = []
+            for row_idx in range(len(matrix)):
+                header_text = matrix[row_idx][col_idx]
+                if header_text:
+                    col_headers.append(header_text)
+            
+            # Remove duplicatas mantendo ordem
+            seen = set()
+            unique_headers = []
+            for h in col_headers:
+                if h and h not in seen:
+                    seen.add(h)
+                    unique_headers.append(h)
+            
+            # Combina: prioriza última linha (mais específica)
+            if unique_headers:
+                if len(unique_headers) > 1:
+                    last_header = unique_headers[-1]
+                    first_header = unique_headers[0] if unique_headers else ''
                     
-                    # Remove duplicatas mantendo ordem
-                    seen = set()
-                    unique_headers = []
-                    for h in col_headers:
-                        if h and h not in seen:
-                            seen.add(h)
-                            unique_headers.append(h)
+                    known_categories = ['Playing Time', 'Performance', 'Expected', 'Progression', 'Per 90 Minutes']
                     
-                    # Combina: prioriza última linha (mais específica)
-                    if unique_headers:
-                        if len(unique_headers) > 1:
-                            last_header = unique_headers[-1]
-                            first_header = unique_headers[0] if unique_headers else ''
-                            
-                            known_categories = ['Playing Time', 'Performance', 'Expected', 'Progression', 'Per 90 Minutes']
-                            
-                            if not last_header.strip():
-                                combined_header = first_header.strip() if first_header.strip() else f'col_{col_idx}'
-                            elif first_header.strip() and first_header != last_header and len(unique_headers) == 2:
-                                if first_header.strip() in known_categories and last_header.strip():
-                                    combined_header = f"{first_header.strip()}_{last_header.strip()}"
-                                elif '/' in last_header or last_header in ['xG', 'xGA', 'xGD', 'xGD/90', 'Last 5']:
-                                    combined_header = last_header.strip()
-                                elif first_header in ['Expected', 'Goals', 'Points'] and first_header not in known_categories:
-                                    combined_header = last_header.strip()
-                                else:
-                                    combined_header = f"{first_header} {last_header}".strip()
-                            else:
-                                combined_header = last_header.strip()
+                    if not last_header.strip():
+                        combined_header = first_header.strip() if first_header.strip() else f'col_{col_idx}'
+                    elif first_header.strip() and first_header != last_header and len(unique_headers) == 2:
+                        if first_header.strip() in known_categories and last_header.strip():
+                            combined_header = f"{first_header.strip()}_{last_header.strip()}"
+                        elif '/' in last_header or last_header in ['xG', 'xGA', 'xGD', 'xGD/90', 'Last 5']:
+                            combined_header = last_header.strip()
+                        elif first_header in ['Expected', 'Goals', 'Points'] and first_header not in known_categories:
+                            combined_header = last_header.strip()
                         else:
-                            combined_header = unique_headers[0].strip()
-                        
-                        # Normaliza nomes de campos comuns
-                        combined_header = self._normalize_header_name(combined_header)
+                            combined_header = f"{first_header} {last_header}".strip()
                     else:
-                        combined_header = f'col_{col_idx}'
-                    
-                    headers.append(combined_header)
-        
-        # Se não encontrou headers no thead, tenta na primeira linha
-        if not headers:
-            first_row = table.find('tr')
-            if not first_row:
-                first_cell = table.find(['th', 'td'])
-                if first_cell:
-                    first_row = first_cell.find_parent('tr')
-            
-            if first_row:
-                for th in first_row.find_all(['th', 'td']):
-                    colspan = int(th.get('colspan', 1))
-                    header_text = th.get_text(strip=True)
-                    if not header_text:
-                        header_text = f'col_{len(headers)}'
-                    for _ in range(colspan):
-                        headers.append(header_text if colspan == 1 else f'{header_text}_{len(headers)}')
-            
-            # Se ainda não encontrou headers, cria headers genéricos
-            if not headers:
-                first_data_row = table.find('tbody')
-                if first_data_row:
-                    first_data_row = first_data_row.find('tr')
-                if not first_data_row:
-                    first_data_row = table.find('tr')
+                        combined_header = last_header.strip()
+                else:
+                    combined_header = unique_headers[0].strip()
                 
-                if first_data_row:
-                    num_cols = len(first_data_row.find_all(['td', 'th']))
-                    headers = [f'col_{i}' for i in range(num_cols)]
-        
-        # 2. Extrair dados do tbody
-        data = []
-        tbody = table.find('tbody')
-        rows = tbody.find_all('tr') if tbody else table.find_all('tr')
-        
-        for row in rows:
-            # Ignora linhas de cabeçalho repetidas
-            if row.get('class') and 'thead' in ' '.join(row.get('class', [])):
-                continue
+                # Normaliza nomes de campos comuns
+                combined_header = self._normalize_header_name(combined_header)
+            else:
+                combined_header = f'col_{col_idx}'
             
+            headers.append(combined_header)
+        
+        return headers
+
+    def _rows_to_dicts(self, headers: List[str], rows: Iterable[List[tuple]]) -> List[Dict]:
+        """Lista de _iter_rows_to_dicts"""
+        return list(self._iter_rows_to_dicts(headers, rows))
+
+    def _iter_rows_to_dicts(self, headers: List[str], rows: Iterable[List[tuple]]) -> Iterator[Dict]:
+        """
+        Converte as linhas do corpo em dicionários coluna -> valor, à medida que são lidas
+
+        Args:
+            headers: Cabeçalhos (estendidos com col_N se houver mais células que colunas)
+            rows: Linhas do tbody; cada célula é (texto, colspan)
+        """
+        for cells in rows:
             row_data = {}
             col_idx = 0
-            cells = row.find_all(['td', 'th'])
             
-            for cell in cells:
+            for text, colspan in cells:
                 if col_idx >= len(headers):
                     while col_idx >= len(headers):
                         headers.append(f'col_{len(headers)}')
                 
-                colspan = int(cell.get('colspan', 1))
                 header = headers[col_idx] if col_idx < len(headers) else f'col_{col_idx}'
                 
-                # Extrai texto
-                text = cell.get_text(strip=True)
-                
                 # Salva o valor na coluna principal
                 row_data[header] = text
                 
@@ -470,49 +472,96 @@ class FBrefSeleniumScraper:
                     row_data[header] = ''
             
             if row_data:
-                data.append(row_data)
-        
-        return data
+                yield row_data
 
-    def find_table_by_type(self, soup: BeautifulSoup, table_type: str) -> Optional[BeautifulSoup]:
-        """Encontra uma tabela pelo tipo (geral, standard_for, etc.)"""
-        possible_ids = self.TABLE_MAPPING.get(table_type, [])
+    def extract_table_data(self, soup, table_id: Optional[str] = None, table_name: Optional[str] = None,
+                           table=None) -> List[Dict]:
+        """
+        Extrai dados de uma tabela HTML processando célula-por-célula para garantir todas as colunas
+
+        Args:
+            table: Tabela já localizada (dispensa a busca por table_id no soup)
+        """
+        return list(self.iter_table_rows(soup, table_id=table_id, table_name=table_name, table=table))
+
+    def iter_table_rows(self, soup, table_id: Optional[str] = None, table_name: Optional[str] = None,
+                        table=None) -> Iterator[Dict]:
+        """Mesmas linhas de extract_table_data, geradas à medida que são lidas"""
+        backend = self.backend
+        if table is None:
+            # Por id ou, sem id, por múltiplos critérios (stats_table, id com 'stats', primeira tabela)
+            table = backend.find_table(soup, table_id)
         
-        for table_id_pattern in possible_ids:
-            if isinstance(table_id_pattern, str):
-                # String literal
-                table = soup.find('table', {'id': table_id_pattern})
-                if table:
-                    return table
-            elif hasattr(table_id_pattern, 'pattern'):
-                # Regex pattern (compiled)
-                tables = soup.find_all('table', {'id': table_id_pattern})
-                if tables:
-                    # Para 'geral', evitar home_away
-                    if table_type == 'geral':
-                        for t in tables:
-                            table_id = t.get('id', '')
-                            if 'home_away' not in table_id.lower():
-                                return t
-                    else:
-                        return tables[0]
+        if table is None:
+            return
         
-        # Fallback: busca por classe stats_table e verifica ID
-        all_tables = soup.find_all('table', {'class': 'stats_table'})
-        for table in all_tables:
-            table_id = table.get('id', '')
-            if table_type == 'geral' and '_overall' in table_id.lower() and 'home_away' not in table_id.lower():
-                return table
+        # 1. Extrair cabeçalhos do thead
+        headers = []
+        header_rows = backend.header_cells(table)
+        if header_rows:
+            # Layout do thead é estável por tabela: a matriz só é montada na primeira vez
+            headers = get_default_header_cache().resolve(
+                header_rows, lambda: self._combine_header_matrix(header_matrix(header_rows)), variant='selenium')
+        
+        # Se não encontrou headers no thead, tenta na primeira linha
+        if not headers:
+            for header_text, colspan in backend.first_row(table) or []:
+                if not header_text:
+                    header_text = f'col_{len(headers)}'
+                for _ in range(colspan):
+                    headers.append(header_text if colspan == 1 else f'{header_text}_{len(headers)}')
+            
+            # Se ainda não encontrou headers, cria headers genéricos
+            if not headers:
+                headers = [f'col_{i}' for i in range(backend.first_body_row_width(table))]
+        
+        # 2. Extrair dados do tbody (linhas "thead" repetidas já vêm filtradas)
+        yield from self._iter_rows_to_dicts(headers, backend.body_rows(table))
 
-        return None
+    def find_table_by_type(self, soup, table_type: str):
+        """Encontra uma tabela pelo tipo (geral, standard_for, etc.)"""
+        return self.locator.resolve(self.backend.tables(soup), table_type)
 
-    def scrape_any_page(self, url: str, extract_all_tables: bool = True) -> Dict:
+    def _iter_tables_from_soup(self, soup, table_types: List[str]) -> Dict[str, Iterator[Dict]]:
+        """Localiza cada tipo de tabela no HTML parseado (linhas lidas sob demanda)"""
+        tables = {}
+        located = self.locator.resolve_all(self.backend.tables(soup), table_types)
+        for table_type in table_types:
+            table = located.get(table_type)
+            if table is not None:
+                tables[table_type] = self.iter_table_rows(soup, table_name=table_type, table=table)
+        return tables
+
+    @staticmethod
+    def _without_links(rows: Iterator[Dict]) -> Iterator[Dict]:
+        """Remove campos que terminam com _link"""
+        for row in rows:
+            keys_to_remove = [key for key in row.keys() if key.endswith('_link')]
+            for key in keys_to_remove:
+                row.pop(key, None)
+            yield row
+
+    def scrape_any_page(self, url: str, extract_all_tables: bool = True,
+                        on_table: Optional[Callable[[str, Iterator[Dict]], int]] = None) -> Dict:
         """
         Extrai todas as tabelas de qualquer página web (FBref)
+
+        Args:
+            on_table: Callback chamado com (tipo, iterador de linhas) para cada tabela
+                encontrada; consome as linhas à medida que são convertidas e devolve
+                quantas recebeu. As tabelas passadas ao callback não ficam no
+                resultado (só a contagem, em "streamed").
         """
-        soup, error_info = self.get_page(url)
+        # Mapear tabelas por tipo
+        table_types = ['geral']
         
-        if not soup:
+        if self.extract_mode == 'browser':
+            extracted, error_info = self.get_tables_in_browser(url, table_types)
+        else:
+            soup, error_info = self.get_page(url, table_types=table_types)
+            extracted = self._iter_tables_from_soup(soup, table_types) if soup is not None else None
+        
+        if extracted is None:
             # Construir mensagem de erro específica baseada no tipo de erro
             if error_info:
                 error_type = error_info.get("type", "unknown")
@@ -529,6 +578,8 @@ class FBrefSeleniumScraper:
                     error_message = f"Erro na página: {error_info.get('message', 'Página retornou erro')}\nURL: {url}"
                 elif error_type == "selenium_exception":
                     error_message = f"Erro do Selenium: {error_info.get('message', 'Erro desconhecido')}\nURL: {url}"
+                elif error_type == "circuit_open":
+                    error_message = f"FBref temporariamente indisponível: {error_info.get('message')}\nURL: {url}"
                 else:
                     error_message = f"Erro ao acessar a página: {error_info.get('message', 'Erro desconhecido')}\nURL: {url}"
             else:
@@ -545,25 +596,23 @@ class FBrefSeleniumScraper:
             "url": url,
             "tables": {}
         }
+        if on_table:
+            results["streamed"] = {}
         
-        # Mapear tabelas por tipo
-        table_types = ['geral']
-        
-        for table_type in table_types:
-            table = self.find_table_by_type(soup, table_type)
-            if table:
-                table_id = table.get('id', f'table_{table_type}')
-                data = self.extract_table_data(soup, table_id=table_id, table_name=table_type)
-                
-                if data:
-                    # Remove campos que terminam com _link
-                    for row in data:
-                        keys_to_remove = [key for key in row.keys() if key.endswith('_link')]
-                        for key in keys_to_remove:
-                            row.pop(key, None)
-                    results["tables"][table_type] = data
+        for table_type, rows in extracted.items():
+            rows = self._without_links(rows)
+            first_row = next(rows, None)
+            if first_row is None:
+                continue
+            rows = itertools.chain([first_row], rows)
+            
+            if on_table:
+                # Streaming: as linhas vão para o callback à medida que são convertidas
+                results["streamed"][table_type] = on_table(table_type, rows)
+            else:
+                results["tables"][table_type] = list(rows)
         
-        if len(results["tables"]) == 0:
+        if len(results["tables"]) == 0 and not results.get("streamed"):
             return {
                 "error": "Nenhuma tabela encontrada na página. Verifique se a URL está correta e se a página contém tabelas de estatísticas.",
                 "url": url,
@@ -573,8 +622,8 @@ class FBrefSeleniumScraper:
         return results
 
     def close(self):
-        """Fecha o driver do navegador"""
-        if hasattr(self, 'driver') and self.driver:
+        """Fecha o driver do navegador (apenas se foi aberto por este scraper)"""
+        if self._owns_driver and getattr(self, 'driver', None):
             try:
                 self.driver.quit()
             except:
@@ -594,12 +643,24 @@ class handler(BaseHTTPRequestHandler):
 
     def do_POST(self):
         """Handle POST request"""
-        scraper = None
+        # Streaming NDJSON (opt-in via Accept: application/x-ndjson); iniciado após a validação
+        self._stream = NDJSONStream(self) if wants_ndjson(self.headers) else None
+        self._table_format = 'rows'
+        self._typed = False
         try:
             # Ler body
             content_length = int(self.headers.get('Content-Length', 0))
             body = self.rfile.read(content_length)
             request_data = json.loads(body.decode('utf-8'))
+
+            # format "columnar": cada tabela como {"columns", "rows"} em vez de lista de dicts
+            try:
+                self._table_format = parse_table_format(request_data.get('format'))
+            except ValueError as e:
+                self._send_error(400, str(e))
+                return
+            # typed: colunas numéricas conhecidas (MP, Pts, xG, Attendance...) como int/float
+            self._typed = request_data.get('typed') is True
             
             # Validar request
             championship_url = request_data.get('championshipUrl', '')
@@ -610,52 +671,92 @@ class handler(BaseHTTPRequestHandler):
                 self._send_error(400, 'URL inválida. Apenas URLs do fbref.com são permitidas.')
                 return
             
-            # Inicializar scraper
-            scraper = FBrefSeleniumScraper(headless=True)
-            
-            # Extrair tabelas
-            result = scraper.scrape_any_page(championship_url, extract_all_tables=True)
-            
-            if 'error' in result:
-                response_data = {
-                    'success': False,
-                    'error': result['error']
-                }
-                # Incluir detalhes do erro se disponível (para debug)
-                if 'error_details' in result:
-                    response_data['error_details'] = result['error_details']
-                self._send_response(response_data)
+            # Circuito aberto: falha rápido sem ocupar um Chrome do pool
+            breaker = get_default_breaker()
+            circuit = breaker.snapshot(host_key(championship_url))
+            if circuit['state'] == 'open' and circuit['retryAfter'] > 0:
+                self._send_error(503, 'FBref temporariamente indisponível (circuito aberto). '
+                                      f'Tente novamente em {circuit["retryAfter"]:.0f}s.', circuit=circuit)
                 return
+
+            # Empresta um Chrome do pool (aberto na primeira requisição e reaproveitado
+            # enquanto a função estiver quente) e o devolve ao final
+            pool = get_default_pool(lambda: FBrefSeleniumScraper.create_driver(headless=True))
+            on_table = None
+            if self._stream:
+                self._stream.start()
+                on_table = lambda table_type, rows: self._write_table_event(
+                    {'type': 'table', 'url': championship_url, 'table': table_type}, rows)
+            with pool.driver() as driver:
+                scraper = FBrefSeleniumScraper(driver=driver)
+                result = scraper.scrape_any_page(championship_url, extract_all_tables=True, on_table=on_table)
             
-            # Mapear tabelas para formato esperado
-            tables = result.get('tables', {})
-            mapped_tables = {
-                'geral': tables.get('geral', [])
-            }
-            
-            # Identificar tabelas faltantes
-            missing_tables = []
-            for table_type in ['geral']:
-                if not mapped_tables[table_type] or len(mapped_tables[table_type]) == 0:
-                    missing_tables.append(table_type)
+            circuit = breaker.snapshot(host_key(championship_url))
+            if self._stream:
+                self._stream.write(result_event(self._result_payload(result), url=championship_url, circuit=circuit))
+                self._stream.close()
+                return
             
-            # Retornar resposta
-            self._send_response({
-                'success': True,
-                'data': {
-                    'tables': mapped_tables,
-                    'missingTables': missing_tables
-                }
-            })
+            # Retornar resposta (com o estado do circuit breaker do FBref)
+            payload = self._result_payload(result)
+            payload['circuit'] = circuit
+            self._send_response(payload)
             
         except json.JSONDecodeError:
             self._send_error(400, 'JSON inválido no body da requisição')
         except Exception as e:
             self._send_error(500, f'Erro interno: {str(e)}')
-        finally:
-            # Sempre fecha o driver
-            if scraper:
-                scraper.close()
+
+    def _output_rows(self, rows: List[Dict]) -> List[Dict]:
+        """Linhas como saem na resposta (tipadas se o cliente pediu typed)"""
+        return apply_column_types(rows) if self._typed else rows
+
+    def _write_table_event(self, event: Dict, rows: Iterator[Dict]) -> int:
+        """Envia o evento "table" no stream (no formato 'rows', serializado linha a linha)"""
+        if self._table_format == 'rows':
+            return self._stream.write_rows(event, iter_typed_rows(rows) if self._typed else rows)
+        rows = self._output_rows(list(rows))
+        self._stream.write({**event, **table_fields(rows, self._table_format)})
+        return len(rows)
+
+    def _result_payload(self, result: Dict) -> Dict:
+        """Converte o resultado de scrape_any_page no formato de resposta da API"""
+        if 'error' in result:
+            response_data = {
+                'success': False,
+                'error': result['error']
+            }
+            # Incluir detalhes do erro se disponível (para debug)
+            if 'error_details' in result:
+                response_data['error_details'] = result['error_details']
+            return response_data
+        
+        # Mapear tabelas para formato esperado
+        tables = result.get('tables', {})
+        streamed = result.get('streamed', {})
+        mapped_tables = {
+            'geral': tables.get('geral', [])
+        }
+        
+        # Identificar tabelas faltantes (as enviadas em streaming já saíram no evento "table")
+        missing_tables = []
+        for table_type in ['geral']:
+            if not mapped_tables[table_type] and not streamed.get(table_type):
+                missing_tables.append(table_type)
+        
+        data = {
+            'tables': {table_type: format_table(self._output_rows(rows), self._table_format)
+                       for table_type, rows in mapped_tables.items()},
+            'missingTables': missing_tables
+        }
+        if self._table_format != 'rows':
+            data['format'] = self._table_format
+        if self._typed:
+            data['typed'] = True
+        return {
+            'success': True,
+            'data': data
+        }
 
     def _send_response(self, data: Dict, status_code: int = 200):
         """Envia resposta JSON"""
@@ -665,11 +766,17 @@ class handler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(json.dumps(data, ensure_ascii=False).encode('utf-8'))
 
-    def _send_error(self, status_code: int, message: str):
+    def _send_error(self, status_code: int, message: str, **extra):
         """Envia erro"""
+        if getattr(self, '_stream', None) and self._stream.started:
+            # Status e headers já foram enviados: o erro vira a última linha do stream
+            self._stream.write({'type': 'error', 'success': False, 'error': message, **extra})
+            self._stream.close()
+            return
         self._send_response({
             'success': False,
-            'error': message
+            'error': message,
+            **extra
         }, status_code)
 
     def log_message(self, format, *args):
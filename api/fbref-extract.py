@@ -2,11 +2,18 @@
 API route Python para extrair dados de tabelas do fbref.com
 Baseado no repositório app-scraper/scraper.py
 """
+import asyncio
+import itertools
 import json
-import random
+import os
+import re
+import sqlite3
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from http.server import BaseHTTPRequestHandler
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 from urllib.parse import urljoin
 
 try:
@@ -16,6 +23,29 @@ except ImportError:
     # Fallback para desenvolvimento local
     pass
 
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+# Módulos auxiliares compartilhados (arquivos api/_*.py não viram rotas na Vercel)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _circuit_breaker import CircuitBreaker, get_default_breaker, guarded_request, is_failure_status
+from _fbref_cache import ResponseCache, get_default_cache, normalize_url
+from _fbref_http import connection_stats, new_session
+from _fbref_ratelimit import TokenBucketLimiter, get_default_limiter, host_key
+from _html_backend import get_backend
+from _ndjson import NDJSONStream, result_event, wants_ndjson
+from _table_format import format_table, parse_table_format, table_fields
+from _table_headers import get_default_header_cache, header_matrix, normalize_header_name
+from _table_locator import SEASON_OVERALL_RE, get_locator
+from _table_types import apply_column_types, iter_typed_rows
+from _single_flight import SingleFlight, get_default_single_flight
+from _snapshot_store import get_default_snapshot_store, snapshot_key, snapshots_mode
+
+# Tamanho dos blocos lidos da resposta no modo 'stream'
+STREAM_CHUNK_SIZE = 16 * 1024
+
 
 class FBrefScraper:
     """Classe para fazer scraping de dados do FBref.com"""
@@ -23,19 +53,34 @@ class FBrefScraper:
     # Mapeamento de nomes de tabelas para IDs HTML possíveis
     TABLE_MAPPING = {
         'geral': [
-            'stats_results_2025-2026_111_overall',
-            'results_2025-2026_111_overall',
-            'stats_results_2025-2026111_overall',
-            'results2025-2026111_overall',
+            # results<temporada><competição>_overall de qualquer temporada (ex.: results2025-2026111_overall)
+            SEASON_OVERALL_RE,
             # Padrões genéricos
-            r'stats_results_.*_overall',
-            r'results.*_overall',
+            re.compile(r'stats_results_.*_overall'),
+            re.compile(r'results.*_overall'),
         ],
     }
 
-    def __init__(self, base_url: str = "https://fbref.com"):
+    def __init__(self, base_url: str = "https://fbref.com", cache: Optional[ResponseCache] = None,
+                 limiter: Optional[TokenBucketLimiter] = None, parser: Optional[str] = None,
+                 single_flight: Optional[SingleFlight] = None, breaker: Optional[CircuitBreaker] = None):
         self.base_url = base_url
-        self.session = requests.Session()
+        # Backend de parse/extração (api/_html_backend.py): 'bs4', 'lxml' ou 'selectolax';
+        # 'stream' usa o backend lxml com parse incremental que para quando as tabelas alvo fecham
+        self.parser = (parser or os.environ.get('FBREF_PARSER', 'bs4')).lower()
+        self.backend = get_backend('lxml' if self.parser == 'stream' else self.parser)
+        if self.backend.name != self.parser and not (self.parser == 'stream' and self.backend.name == 'lxml'):
+            self.parser = self.backend.name
+        # Cache HTTP em disco (TTL + revalidação condicional); FBREF_CACHE_DISABLED=1 desativa
+        self.cache = cache if cache is not None else get_default_cache()
+        # Token bucket por host (compartilhado entre processos) no lugar dos delays fixos
+        self.limiter = limiter if limiter is not None else get_default_limiter()
+        # Requisições simultâneas para a mesma URL compartilham uma busca e um parse
+        self.single_flight = single_flight if single_flight is not None else get_default_single_flight()
+        # Circuit breaker por host: falha rápido (ou serve o cache) durante sequências de 403
+        self.breaker = breaker if breaker is not None else get_default_breaker()
+        # Sessão própria (headers) sobre o pool de conexões do processo, reaproveitado entre invocações
+        self.session = new_session()
         # Headers mais completos para evitar bloqueio 403
         # User-Agent atualizado para versão mais recente do Chrome
         self.session.headers.update({
@@ -57,6 +102,206 @@ class FBrefScraper:
             'Width': '1920',
         })
 
+    def _resolve_url(self, url: str) -> str:
+        if not url.startswith('http'):
+            url = urljoin(self.base_url, url)
+        return url
+
+    def _needs_request(self, url: str) -> bool:
+        """False quando a resposta sairá do cache em disco (não consome orçamento do FBref)"""
+        return not (self.cache and self.cache.has_usable_entry(url))
+
+    @property
+    def locator(self):
+        """TableLocator do TABLE_MAPPING (compilado uma vez por processo)"""
+        return get_locator(self.TABLE_MAPPING)
+
+    def _parse_html(self, content: bytes):
+        """
+        Faz o parse do HTML da página com o backend configurado
+
+        O documento devolvido (BeautifulSoup, árvore lxml ou selectolax) só é
+        lido pelos métodos do próprio backend.
+        """
+        return self.backend.parse(content)
+
+    def _parse_stream(self, response):
+        """
+        Parse incremental do corpo da resposta (modo 'stream')
+
+        Os blocos de iter_content alimentam um HTMLPullParser do lxml enquanto o
+        download continua. A leitura para assim que, para cada tipo do
+        TABLE_MAPPING, fechou uma tabela que casa a regra de maior prioridade
+        (ex.: results<temporada><competição>_overall para 'geral'); o resto da
+        página não é baixado. Sem essa tabela a página é lida até o fim. O
+        documento parcial é lido pelo backend lxml.
+        """
+        locator = self.locator
+        pending = set(self.TABLE_MAPPING)
+        parser = lxml_etree.HTMLPullParser(events=('end',), tag='table', encoding=response.encoding)
+        read = 0
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            read += len(chunk)
+            parser.feed(chunk)
+            for _, table in parser.read_events():
+                table_id = table.get('id')
+                pending = {table_type for table_type in pending if not locator.is_final(table_type, table_id)}
+            if not pending:
+                print(f"[FBrefScraper] Tabelas alvo completas após {read // 1024} KB; leitura interrompida")
+                break
+        return self.backend.adopt(parser.close())
+
+    def _parse_response(self, response):
+        """Parse do corpo: incremental para respostas em streaming, senão _parse_html"""
+        if self.parser == 'stream' and not getattr(response, '_content_consumed', True):
+            return self._parse_stream(response)
+        return self._parse_html(response.content)
+
+    @staticmethod
+    def _close_response(response):
+        """Libera a conexão de uma resposta em streaming (lida até o fim ou não)"""
+        close = getattr(response, 'close', None)
+        if close is not None:
+            close()
+
+    def _http_get(self, url: str):
+        """
+        GET passando pelo cache de respostas, quando habilitado
+
+        No modo 'stream', sem entrada no cache, o corpo fica para _parse_response
+        (stream=True). Essas respostas não são gravadas no cache: a leitura pode
+        parar antes do fim da página.
+        """
+        if self.parser == 'stream' and not (self.cache and self.cache.get_entry(url)):
+            return self.session.get(url, timeout=45, allow_redirects=True, stream=True)
+        if self.cache:
+            # A revalidação em background (stale) também respeita o breaker e o bucket do host
+            return self.cache.fetch(self.session, url, timeout=45, allow_redirects=True,
+                                    guard=guarded_request(self.breaker, self.limiter, host_key(url)))
+        return self.session.get(url, timeout=45, allow_redirects=True)
+
+    def _single_flight_key(self, url: str) -> str:
+        # O parser entra na chave: o documento compartilhado só é lido pelo backend que o criou
+        return f'{self.parser}:{normalize_url(url)}'
+
+    def _handle_response(self, response, url: str, attempt: int, retries: int) -> tuple[Optional[BeautifulSoup], Optional[Dict], Optional[float]]:
+        """
+        Classifica a resposta HTTP e faz o parse do HTML
+
+        Returns:
+            Tupla (BeautifulSoup ou None, dict com informações de erro ou None,
+            True se vale uma nova tentativa)
+        """
+        try:
+            return self._classify_response(response, url, attempt, retries)
+        finally:
+            self._close_response(response)
+
+    def _classify_response(self, response, url: str, attempt: int, retries: int) -> tuple[Optional[BeautifulSoup], Optional[Dict], Optional[float]]:
+        """Corpo de _handle_response"""
+        # Verifica status code
+        if response.status_code == 403:
+            error_info = {
+                "type": "403",
+                "status_code": 403,
+                "message": "Acesso negado. O site está bloqueando requisições automatizadas.",
+                "url": url,
+                "final_url": response.url,
+                "headers": dict(response.headers),
+                "attempt": attempt + 1,
+                "retries": retries
+            }
+            print(f"[FBrefScraper] Erro 403 detectado: {error_info}")
+
+            if attempt < retries - 1:
+                # Tenta com headers diferentes e estratégias anti-detecção
+                self.session.headers['Referer'] = 'https://fbref.com/'
+            return (None, error_info, True)
+
+        # Verifica outros códigos de erro
+        if response.status_code >= 400:
+            error_info = {
+                "type": "http_error",
+                "status_code": response.status_code,
+                "message": f"Erro HTTP {response.status_code}: {response.reason}",
+                "url": url,
+                "final_url": response.url,
+                "headers": dict(response.headers),
+                "attempt": attempt + 1,
+                "retries": retries
+            }
+            print(f"[FBrefScraper] Erro HTTP {response.status_code}: {error_info}")
+            return (None, error_info, True)
+
+        response.raise_for_status()
+
+        # FBref pode retornar diferentes encodings
+        if response.encoding is None or response.encoding == 'ISO-8859-1':
+            response.encoding = 'utf-8'
+
+        soup = self._parse_response(response)
+
+        # Verifica se a página carregou corretamente
+        title = self.backend.title(soup)
+        if title:
+            title_text = title.lower()
+            if 'error' in title_text or 'not found' in title_text or '404' in title_text:
+                error_info = {
+                    "type": "page_error",
+                    "status_code": response.status_code,
+                    "message": f"Página retornou erro: {title}",
+                    "url": url,
+                    "final_url": response.url,
+                    "title": title,
+                    "attempt": attempt + 1,
+                    "retries": retries
+                }
+                print(f"[FBrefScraper] Erro detectado no título da página: {error_info}")
+                return (None, error_info, False)
+
+        print(f"[FBrefScraper] Página carregada com sucesso (título: {title or 'N/A'})")
+        return (soup, None, False)
+
+    @staticmethod
+    def _is_throttled(error_info: Optional[Dict]) -> bool:
+        """True quando o FBref sinalizou bloqueio/limite de taxa"""
+        return bool(error_info) and error_info.get('status_code') in (403, 429)
+
+    def _request_error_info(self, e: Exception, url: str, attempt: int, retries: int) -> Dict:
+        """Monta o dict de erro para exceções do requests (timeout, conexão, etc.)"""
+        if isinstance(e, requests.exceptions.Timeout):
+            error_info = {
+                "type": "timeout",
+                "status_code": None,
+                "message": f"Timeout ao acessar a página: {str(e)}",
+                "url": url,
+                "attempt": attempt + 1,
+                "retries": retries
+            }
+            print(f"[FBrefScraper] Timeout: {error_info}")
+        elif isinstance(e, requests.exceptions.ConnectionError):
+            error_info = {
+                "type": "connection_error",
+                "status_code": None,
+                "message": f"Erro de conexão: {str(e)}",
+                "url": url,
+                "attempt": attempt + 1,
+                "retries": retries
+            }
+            print(f"[FBrefScraper] Erro de conexão: {error_info}")
+        else:
+            error_info = {
+                "type": "request_exception",
+                "status_code": None,
+                "message": f"Erro na requisição: {str(e)}",
+                "url": url,
+                "exception_type": type(e).__name__,
+                "attempt": attempt + 1,
+                "retries": retries
+            }
+            print(f"[FBrefScraper] Exceção na requisição: {error_info}")
+        return error_info
+
     def get_page(self, url: str, retries: int = 3) -> tuple[Optional[BeautifulSoup], Optional[Dict]]:
         """
         Faz requisição HTTP e retorna o conteúdo parseado com informações de erro
@@ -67,402 +312,210 @@ class FBrefScraper:
 
         Returns:
             Tupla (BeautifulSoup object ou None, dict com informações de erro ou None)
-        """
-        if not url.startswith('http'):
-            url = urljoin(self.base_url, url)
 
+        Chamadas simultâneas para a mesma URL recebem o mesmo resultado (o soup
+        é compartilhado e só é lido pela extração).
+        """
+        url = self._resolve_url(url)
+        result, shared = self.single_flight.do(self._single_flight_key(url), partial(self._fetch_page, url, retries))
+        if shared:
+            print(f"[FBrefScraper] Resultado compartilhado com requisição simultânea: {url}")
+        return result
+
+    def _fetch_page(self, url: str, retries: int) -> tuple[Optional[BeautifulSoup], Optional[Dict]]:
+        """Busca e parse da página com novas tentativas (corpo de get_page)"""
+        host = host_key(url)
         last_error = None
 
         for attempt in range(retries):
-            try:
-                # Adiciona delay antes da requisição para parecer mais humano
-                # Delays variáveis para parecer mais natural
-                if attempt > 0:
-                    # Backoff exponencial com variação aleatória
-                    base_delay = 2 ** attempt
-                    delay = base_delay + random.uniform(0.5, 1.5)
-                    time.sleep(delay)
-                else:
-                    # Primeira tentativa: delay aleatório entre 1-2 segundos
-                    delay = random.uniform(1.0, 2.0)
-                    time.sleep(delay)
+            needs_request = self._needs_request(url)
+            if needs_request and not self.breaker.allow(host):
+                # Circuito aberto: sem novas tentativas nem backoff
+                return self._circuit_open_result(url, host, last_error)
+            if attempt > 0:
+                # Backoff exponencial com variação aleatória (drena o bucket do host após 403/429)
+                self.limiter.backoff(host, attempt, throttled=self._is_throttled(last_error))
+            if needs_request:
+                # Só espera quando o orçamento de requisições ao host está esgotado
+                self.limiter.acquire(host)
 
+            try:
                 print(f"[FBrefScraper] Tentativa {attempt + 1}/{retries} - Acessando: {url}")
                 # Timeout aumentado para 45s para dar mais tempo em conexões lentas
-                response = self.session.get(url, timeout=45, allow_redirects=True)
-                print(f"[FBrefScraper] Status code: {response.status_code}, URL final: {response.url}")
-
-                # Verifica status code
-                if response.status_code == 403:
-                    error_info = {
-                        "type": "403",
-                        "status_code": 403,
-                        "message": "Acesso negado. O site está bloqueando requisições automatizadas.",
-                        "url": url,
-                        "final_url": response.url,
-                        "headers": dict(response.headers),
-                        "attempt": attempt + 1,
-                        "retries": retries
-                    }
-                    print(f"[FBrefScraper] Erro 403 detectado: {error_info}")
-                    last_error = error_info
-                    
-                    if attempt < retries - 1:
-                        # Tenta com headers diferentes e estratégias anti-detecção
-                        self.session.headers['Referer'] = 'https://fbref.com/'
-                        # Adiciona delay variável antes de tentar novamente
-                        retry_delay = random.uniform(2.0, 4.0)
-                        print(f"[FBrefScraper] Aguardando {retry_delay:.2f}s antes de nova tentativa...")
-                        time.sleep(retry_delay)
-                        continue
-                    else:
-                        return (None, error_info)
-
-                # Verifica outros códigos de erro
-                if response.status_code >= 400:
-                    error_info = {
-                        "type": "http_error",
-                        "status_code": response.status_code,
-                        "message": f"Erro HTTP {response.status_code}: {response.reason}",
-                        "url": url,
-                        "final_url": response.url,
-                        "headers": dict(response.headers),
-                        "attempt": attempt + 1,
-                        "retries": retries
-                    }
-                    print(f"[FBrefScraper] Erro HTTP {response.status_code}: {error_info}")
-                    last_error = error_info
-                    
-                    if attempt < retries - 1:
-                        continue
-                    else:
-                        return (None, error_info)
-
-                response.raise_for_status()
-
-                # FBref pode retornar diferentes encodings
-                if response.encoding is None or response.encoding == 'ISO-8859-1':
-                    response.encoding = 'utf-8'
-
-                soup = BeautifulSoup(response.content, 'lxml')
-
-                # Verifica se a página carregou corretamente
-                title_tag = soup.find('title')
-                if title_tag:
-                    title_text = title_tag.get_text().lower()
-                    if 'error' in title_text or 'not found' in title_text or '404' in title_text:
-                        error_info = {
-                            "type": "page_error",
-                            "status_code": response.status_code,
-                            "message": f"Página retornou erro: {title_tag.get_text()}",
-                            "url": url,
-                            "final_url": response.url,
-                            "title": title_tag.get_text(),
-                            "attempt": attempt + 1,
-                            "retries": retries
-                        }
-                        print(f"[FBrefScraper] Erro detectado no título da página: {error_info}")
-                        return (None, error_info)
-
-                print(f"[FBrefScraper] Página carregada com sucesso (título: {title_tag.get_text() if title_tag else 'N/A'})")
+                response = self._http_get(url)
+                print(f"[FBrefScraper] Status code: {response.status_code}, URL final: {response.url}, cache: {getattr(response, 'cache_status', '-')}")
+                self._record_outcome(host, response=response)
+                soup, error_info, retry = self._handle_response(response, url, attempt, retries)
+            except requests.exceptions.RequestException as e:
+                self._record_outcome(host, exception=e)
+                soup = None
+                error_info = self._request_error_info(e, url, attempt, retries)
+                retry = True
+
+            if not error_info:
                 return (soup, None)
 
-            except requests.exceptions.Timeout as e:
-                error_info = {
-                    "type": "timeout",
-                    "status_code": None,
-                    "message": f"Timeout ao acessar a página: {str(e)}",
-                    "url": url,
-                    "attempt": attempt + 1,
-                    "retries": retries
-                }
-                print(f"[FBrefScraper] Timeout: {error_info}")
-                last_error = error_info
-                
-                if attempt < retries - 1:
-                    time.sleep(2 ** attempt)  # Backoff exponencial
-                else:
-                    return (None, error_info)
-                    
-            except requests.exceptions.ConnectionError as e:
-                error_info = {
-                    "type": "connection_error",
-                    "status_code": None,
-                    "message": f"Erro de conexão: {str(e)}",
-                    "url": url,
-                    "attempt": attempt + 1,
-                    "retries": retries
-                }
-                print(f"[FBrefScraper] Erro de conexão: {error_info}")
-                last_error = error_info
-                
-                if attempt < retries - 1:
-                    time.sleep(2 ** attempt)  # Backoff exponencial
-                else:
-                    return (None, error_info)
-                    
-            except requests.exceptions.RequestException as e:
-                error_info = {
-                    "type": "request_exception",
-                    "status_code": None,
-                    "message": f"Erro na requisição: {str(e)}",
-                    "url": url,
-                    "exception_type": type(e).__name__,
-                    "attempt": attempt + 1,
-                    "retries": retries
-                }
-                print(f"[FBrefScraper] Exceção na requisição: {error_info}")
-                last_error = error_info
-                
-                if attempt < retries - 1:
-                    time.sleep(2 ** attempt)  # Backoff exponencial
-                else:
-                    return (None, error_info)
+            last_error = error_info
+            if not retry or attempt >= retries - 1:
+                return (None, error_info)
 
         # Se chegou aqui, todas as tentativas falharam
         return (None, last_error)
 
-    def _normalize_header_name(self, header: str) -> str:
+    def _record_outcome(self, host: str, response=None, exception: Optional[Exception] = None):
+        """Informa o circuit breaker do resultado de uma requisição que chegou ao host"""
+        if response is not None:
+            if getattr(response, 'cache_status', None) in ('hit', 'stale'):
+                return  # Servida do disco, sem contato com o FBref
+            self.breaker.record(host, not is_failure_status(response.status_code))
+        elif isinstance(exception, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+            self.breaker.record_failure(host)
+
+    def _circuit_open_result(self, url: str, host: str,
+                             last_error: Optional[Dict]) -> tuple[Optional[BeautifulSoup], Optional[Dict]]:
+        """
+        Resultado de get_page com o circuito aberto: a cópia do cache em disco
+        (de qualquer idade), se houver, ou um erro "circuit_open"
         """
-        Normaliza nomes de cabeçalhos para garantir consistência
-        """
-        if not header:
-            return header
-
-        # Remove espaços extras
-        header = ' '.join(header.split())
-
-        # Mapeamento de normalizações comuns (case-insensitive)
-        header_lower = header.lower().strip()
-
-        field_mapping = {
-            'rk': 'Rk',
-            'rank': 'Rk',
-            'squad': 'Squad',
-            'team': 'Squad',
-            'mp': 'MP',
-            'matches played': 'MP',
-            'w': 'W',
-            'wins': 'W',
-            'd': 'D',
-            'draws': 'D',
-            'l': 'L',
-            'losses': 'L',
-            'gf': 'GF',
-            'goals for': 'GF',
-            'ga': 'GA',
-            'goals against': 'GA',
-            'gd': 'GD',
-            'goal difference': 'GD',
-            'pts': 'Pts',
-            'points': 'Pts',
-            'pts/mp': 'Pts/MP',
-            'pts / mp': 'Pts/MP',
-            'points per match': 'Pts/MP',
-            'xg': 'xG',
-            'expected goals': 'xG',
-            'xga': 'xGA',
-            'expected goals against': 'xGA',
-            'xgd': 'xGD',
-            'expected goal difference': 'xGD',
-            'xgd/90': 'xGD/90',
-            'xgd /90': 'xGD/90',
-            'xgd / 90': 'xGD/90',
-            'last 5': 'Last 5',
-            'last5': 'Last 5',
-            'last five': 'Last 5',
-            'attendance': 'Attendance',
-            'top team scorer': 'Top Team Scorer',
-            'top scorer': 'Top Team Scorer',
-            'goalkeeper': 'Goalkeeper',
-            'gk': 'Goalkeeper',
+        fallback = self.cache.fallback(url) if self.cache else None
+        if fallback is not None:
+            print(f"[FBrefScraper] Circuito aberto; servindo cópia do cache: {url}")
+            soup, error_info, _ = self._handle_response(fallback, url, 0, 1)
+            if soup is not None:
+                return (soup, None)
+
+        circuit = self.breaker.snapshot(host)
+        error_info = {
+            "type": "circuit_open",
+            "status_code": None,
+            "message": f"FBref bloqueando requisições; novas tentativas suspensas por {circuit['retryAfter']:.0f}s",
+            "url": url,
+            "circuit": circuit,
+            "last_error": last_error
         }
+        print(f"[FBrefScraper] Circuito aberto: {error_info}")
+        return (None, error_info)
+
+    def _normalize_header_name(self, header: str) -> str:
+        """
+        Normaliza nomes de cabeçalhos para garantir consistência (memoizado em _table_headers)
+        """
+        return normalize_header_name(header)
 
-        if header_lower in field_mapping:
-            return field_mapping[header_lower]
-
-        # Normalizações específicas para campos compostos
-        if 'pts' in header_lower and 'mp' in header_lower:
-            return 'Pts/MP'
-        if 'xgd' in header_lower and '90' in header_lower:
-            return 'xGD/90'
-        if 'last' in header_lower and '5' in header_lower:
-            return 'Last 5'
-        if 'top' in header_lower and 'scorer' in header_lower:
-            return 'Top Team Scorer'
-
-        # Mantém o header original capitalizado apropriadamente
-        if header.isupper() or header.islower():
-            words = header.split()
-            if len(words) > 1:
-                return ' '.join(word.capitalize() for word in words)
+    def _combine_header_matrix(self, matrix: List[List[str]], table_name: Optional[str] = None) -> List[str]:
+        """Combina os cabeçalhos de múltiplas linhas (última linha como primária) e normaliza os nomes"""
+        max_cols = len(matrix[0]) if matrix else 0
+        headers = []
+        for col_idx in range(max_cols):
+            col_headers = []
+            for row_idx in range(len(matrix)):
+                header_text = matrix[row_idx][col_idx]
+                if header_text:
+                    col_headers.append(header_text)
+
+            # Remove duplicatas mantendo ordem
+            seen = set()
+            unique_headers = []
+            for h in col_headers:
+                if h and h not in seen:
+                    seen.add(h)
+                    unique_headers.append(h)
+
+            # Combina: prioriza última linha (mais específica)
+            if unique_headers:
+                if len(unique_headers) > 1:
+                    last_header = unique_headers[-1]
+                    first_header = unique_headers[0] if unique_headers else ''
+
+                    known_categories = ['Playing Time', 'Performance', 'Expected', 'Progression', 'Per 90 Minutes']
+
+                    if not last_header.strip():
+                        combined_header = first_header.strip() if first_header.strip() else f'col_{col_idx}'
+                    elif first_header.strip() and first_header != last_header and len(unique_headers) == 2:
+                        if table_name == 'standard_for' and first_header.strip() in known_categories and last_header.strip():
+                            combined_header = f"{first_header.strip()}_{last_header.strip()}"
+                        elif '/' in last_header or last_header in ['xG', 'xGA', 'xGD', 'xGD/90', 'Last 5']:
+                            combined_header = last_header.strip()
+                        elif first_header in ['Expected', 'Goals', 'Points'] and first_header not in known_categories:
+                            combined_header = last_header.strip()
+                        else:
+                            combined_header = f"{first_header} {last_header}".strip()
+                    else:
+                        combined_header = last_header.strip()
+                else:
+                    combined_header = unique_headers[0].strip()
+
+                # Normaliza nomes de campos comuns
+                combined_header = self._normalize_header_name(combined_header)
             else:
-                return header.capitalize()
+                combined_header = f'col_{col_idx}'
+
+            headers.append(combined_header)
 
-        return header
+        return headers
 
-    def extract_table_data(self, soup: BeautifulSoup, table_id: Optional[str] = None, table_name: Optional[str] = None) -> List[Dict]:
+    def extract_table_data(self, soup, table_id: Optional[str] = None, table_name: Optional[str] = None,
+                           table=None) -> List[Dict]:
         """
         Extrai dados de uma tabela HTML processando célula-por-célula para garantir todas as colunas
-        """
-        import re
 
-        if table_id:
-            table = soup.find('table', {'id': table_id})
-        else:
-            # Tenta encontrar tabela por múltiplos critérios
-            table = (soup.find('table', {'class': 'stats_table'}) or
-                    soup.find('table', {'id': lambda x: x and 'stats' in str(x).lower()}) or
-                    soup.find('table'))
+        Se `table` (nó já localizado, ex.: por find_table_by_type) for informado,
+        a busca no documento é pulada.
+        """
+        if table is None:
+            # Por id ou, sem id, por múltiplos critérios (stats_table, id com 'stats', primeira tabela)
+            table = self.backend.find_table(soup, table_id)
 
-        if not table:
+        if table is None:
             return []
 
-        # 1. Extrair cabeçalhos do thead
-        headers = []
-        thead = table.find('thead')
-
-        if thead:
-            header_rows = thead.find_all('tr')
-            if header_rows:
-                # Calcula número máximo de colunas
-                max_cols = 0
-                for row in header_rows:
-                    cols = row.find_all(['th', 'td'])
-                    col_count = 0
-                    for col in cols:
-                        colspan = int(col.get('colspan', 1))
-                        col_count += colspan
-                    max_cols = max(max_cols, col_count)
-
-                # Cria matriz de cabeçalhos
-                header_matrix = [[''] * max_cols for _ in range(len(header_rows))]
-
-                # Preenche matriz considerando colspan e rowspan
-                for row_idx, row in enumerate(header_rows):
-                    col_idx = 0
-                    for cell in row.find_all(['th', 'td']):
-                        # Pula células já preenchidas por rowspan de linhas anteriores
-                        while col_idx < max_cols and header_matrix[row_idx][col_idx]:
-                            col_idx += 1
-
-                        if col_idx >= max_cols:
-                            break
-
-                        colspan = int(cell.get('colspan', 1))
-                        rowspan = int(cell.get('rowspan', 1))
-                        cell_text = cell.get_text(strip=True)
-
-                        # Preenche todas as células cobertas por colspan e rowspan
-                        for r in range(row_idx, min(row_idx + rowspan, len(header_rows))):
-                            for c in range(col_idx, min(col_idx + colspan, max_cols)):
-                                if not header_matrix[r][c]:
-                                    header_matrix[r][c] = cell_text
-
-                        col_idx += colspan
-
-                # Combina cabeçalhos de múltiplas linhas (última linha como primária)
-                headers = []
-                for col_idx in range(max_cols):
-                    col_headers = []
-                    for row_idx in range(len(header_rows)):
-                        header_text = header_matrix[row_idx][col_idx]
-                        if header_text:
-                            col_headers.append(header_text)
-
-                    # Remove duplicatas mantendo ordem
-                    seen = set()
-                    unique_headers = []
-                    for h in col_headers:
-                        if h and h not in seen:
-                            seen.add(h)
-                            unique_headers.append(h)
-
-                    # Combina: prioriza última linha (mais específica)
-                    if unique_headers:
-                        if len(unique_headers) > 1:
-                            last_header = unique_headers[-1]
-                            first_header = unique_headers[0] if unique_headers else ''
-
-                            known_categories = ['Playing Time', 'Performance', 'Expected', 'Progression', 'Per 90 Minutes']
-
-                            if not last_header.strip():
-                                combined_header = first_header.strip() if first_header.strip() else f'col_{col_idx}'
-                            elif first_header.strip() and first_header != last_header and len(unique_headers) == 2:
-                                if table_name == 'standard_for' and first_header.strip() in known_categories and last_header.strip():
-                                    combined_header = f"{first_header.strip()}_{last_header.strip()}"
-                                elif '/' in last_header or last_header in ['xG', 'xGA', 'xGD', 'xGD/90', 'Last 5']:
-                                    combined_header = last_header.strip()
-                                elif first_header in ['Expected', 'Goals', 'Points'] and first_header not in known_categories:
-                                    combined_header = last_header.strip()
-                                else:
-                                    combined_header = f"{first_header} {last_header}".strip()
-                            else:
-                                combined_header = last_header.strip()
-                        else:
-                            combined_header = unique_headers[0].strip()
+        return list(self.iter_table_rows(table, table_name=table_name))
 
-                        # Normaliza nomes de campos comuns
-                        combined_header = self._normalize_header_name(combined_header)
-                    else:
-                        combined_header = f'col_{col_idx}'
+    def iter_table_rows(self, table, table_name: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Gera as linhas da tabela (dicts coluna -> texto) à medida que são lidas
 
-                    headers.append(combined_header)
+        Mesmas linhas de extract_table_data, sem montar a lista: usado pelo
+        streaming NDJSON para que a memória não cresça com o tamanho da tabela.
+        `table` é um nó do documento do backend configurado.
+        """
+        backend = self.backend
+
+        # 1. Extrair cabeçalhos do thead
+        headers = []
+        header_rows = backend.header_cells(table)
+        if header_rows:
+            # Layout do thead é estável por tabela: a matriz só é montada na primeira vez
+            headers = get_default_header_cache().resolve(
+                header_rows,
+                lambda: self._combine_header_matrix(header_matrix(header_rows), table_name),
+                variant=f'extract:{table_name or ""}',
+            )
 
         # Se não encontrou headers no thead, tenta na primeira linha
         if not headers:
-            first_row = table.find('tr')
-            if not first_row:
-                first_cell = table.find(['th', 'td'])
-                if first_cell:
-                    first_row = first_cell.find_parent('tr')
-
-            if first_row:
-                for th in first_row.find_all(['th', 'td']):
-                    colspan = int(th.get('colspan', 1))
-                    header_text = th.get_text(strip=True)
-                    if not header_text:
-                        header_text = f'col_{len(headers)}'
-                    for _ in range(colspan):
-                        headers.append(header_text if colspan == 1 else f'{header_text}_{len(headers)}')
+            for header_text, colspan in backend.first_row(table) or []:
+                if not header_text:
+                    header_text = f'col_{len(headers)}'
+                for _ in range(colspan):
+                    headers.append(header_text if colspan == 1 else f'{header_text}_{len(headers)}')
 
             # Se ainda não encontrou headers, cria headers genéricos
             if not headers:
-                first_data_row = table.find('tbody')
-                if first_data_row:
-                    first_data_row = first_data_row.find('tr')
-                if not first_data_row:
-                    first_data_row = table.find('tr')
-
-                if first_data_row:
-                    num_cols = len(first_data_row.find_all(['td', 'th']))
-                    headers = [f'col_{i}' for i in range(num_cols)]
-
-        # 2. Extrair dados do tbody
-        data = []
-        tbody = table.find('tbody')
-        rows = tbody.find_all('tr') if tbody else table.find_all('tr')
-
-        for row in rows:
-            # Ignora linhas de cabeçalho repetidas
-            if row.get('class') and 'thead' in ' '.join(row.get('class', [])):
-                continue
+                headers = [f'col_{i}' for i in range(backend.first_body_row_width(table))]
 
+        # 2. Extrair dados do tbody (linhas "thead" repetidas já vêm filtradas)
+        for cells in backend.body_rows(table):
             row_data = {}
             col_idx = 0
-            cells = row.find_all(['td', 'th'])
 
-            for cell in cells:
+            for text, colspan in cells:
                 if col_idx >= len(headers):
                     while col_idx >= len(headers):
                         headers.append(f'col_{len(headers)}')
 
-                colspan = int(cell.get('colspan', 1))
                 header = headers[col_idx] if col_idx < len(headers) else f'col_{col_idx}'
 
-                # Extrai texto
-                text = cell.get_text(strip=True)
-
                 # Salva o valor na coluna principal
                 row_data[header] = text
 
@@ -479,54 +532,39 @@ class FBrefScraper:
                     row_data[header] = ''
 
             if row_data:
-                data.append(row_data)
+                yield row_data
 
-        return data
+    @staticmethod
+    def _without_links(rows: Iterator[Dict]) -> Iterator[Dict]:
+        """Remove campos que terminam com _link"""
+        for row in rows:
+            keys_to_remove = [key for key in row.keys() if key.endswith('_link')]
+            for key in keys_to_remove:
+                row.pop(key, None)
+            yield row
 
-    def find_table_by_type(self, soup: BeautifulSoup, table_type: str) -> Optional[BeautifulSoup]:
+    def find_table_by_type(self, soup, table_type: str):
         """Encontra uma tabela pelo tipo (geral, standard_for, etc.)"""
-        possible_ids = self.TABLE_MAPPING.get(table_type, [])
-        import re
-
-        for table_id_pattern in possible_ids:
-            if isinstance(table_id_pattern, str) and not table_id_pattern.startswith('r'):
-                # String literal
-                table = soup.find('table', {'id': table_id_pattern})
-                if table:
-                    return table
-            else:
-                # Regex pattern
-                pattern = table_id_pattern if isinstance(table_id_pattern, str) else table_id_pattern.pattern
-                if isinstance(table_id_pattern, str) and table_id_pattern.startswith('r'):
-                    pattern = table_id_pattern[1:]  # Remove 'r' prefix
-                regex = re.compile(pattern, re.IGNORECASE)
-                tables = soup.find_all('table', {'id': regex})
-                if tables:
-                    # Para 'geral', evitar home_away
-                    if table_type == 'geral':
-                        for t in tables:
-                            table_id = t.get('id', '')
-                            if 'home_away' not in table_id.lower():
-                                return t
-                    else:
-                        return tables[0]
-
-        # Fallback: busca por classe stats_table e verifica ID
-        all_tables = soup.find_all('table', {'class': 'stats_table'})
-        for table in all_tables:
-            table_id = table.get('id', '')
-            if table_type == 'geral' and '_overall' in table_id.lower() and 'home_away' not in table_id.lower():
-                return table
+        return self.locator.resolve(self.backend.tables(soup), table_type)
 
-        return None
-
-    def scrape_any_page(self, url: str, extract_all_tables: bool = True) -> Dict:
+    def scrape_any_page(self, url: str, extract_all_tables: bool = True,
+                        on_table: Optional[Callable[[str, Iterator[Dict]], int]] = None) -> Dict:
         """
         Extrai todas as tabelas de qualquer página web (FBref)
+
+        Args:
+            on_table: Callback chamado com (tipo, iterador de linhas) para cada tabela
+                encontrada; consome as linhas à medida que são lidas e devolve quantas
+                recebeu. As tabelas passadas ao callback não ficam no resultado (só a
+                contagem, em "streamed").
         """
         soup, error_info = self.get_page(url)
+        return self._build_scrape_result(url, soup, error_info, on_table=on_table)
 
-        if not soup:
+    def _build_scrape_result(self, url: str, soup: Optional[BeautifulSoup], error_info: Optional[Dict],
+                             on_table: Optional[Callable[[str, Iterator[Dict]], int]] = None) -> Dict:
+        """Monta o resultado de scrape_any_page a partir do retorno de get_page"""
+        if soup is None:
             # Construir mensagem de erro específica baseada no tipo de erro
             if error_info:
                 error_type = error_info.get("type", "unknown")
@@ -545,6 +583,8 @@ class FBrefScraper:
                     error_message = f"Erro de conexão: Não foi possível conectar ao servidor.\nURL: {url}\nDetalhes: {error_info.get('message', 'Erro desconhecido')}"
                 elif error_type == "page_error":
                     error_message = f"Erro na página: {error_info.get('message', 'Página retornou erro')}\nURL: {url}"
+                elif error_type == "circuit_open":
+                    error_message = f"FBref temporariamente indisponível: {error_info.get('message')}\nURL: {url}"
                 else:
                     error_message = f"Erro ao acessar a página: {error_info.get('message', 'Erro desconhecido')}\nURL: {url}"
             else:
@@ -561,25 +601,29 @@ class FBrefScraper:
             "url": url,
             "tables": {}
         }
+        if on_table:
+            results["streamed"] = {}
 
         # Mapear tabelas por tipo
         table_types = ['geral']
 
+        located = self.locator.resolve_all(self.backend.tables(soup), table_types)
         for table_type in table_types:
-            table = self.find_table_by_type(soup, table_type)
-            if table:
-                table_id = table.get('id', f'table_{table_type}')
-                data = self.extract_table_data(soup, table_id=table_id, table_name=table_type)
-
-                if data:
-                    # Remove campos que terminam com _link
-                    for row in data:
-                        keys_to_remove = [key for key in row.keys() if key.endswith('_link')]
-                        for key in keys_to_remove:
-                            row.pop(key, None)
-                    results["tables"][table_type] = data
-
-        if len(results["tables"]) == 0:
+            table = located.get(table_type)
+            if table is not None:
+                rows = self._without_links(self.iter_table_rows(table, table_name=table_type))
+                first_row = next(rows, None)
+                if first_row is None:
+                    continue
+                rows = itertools.chain([first_row], rows)
+
+                if on_table:
+                    # Streaming: as linhas vão para o callback à medida que são lidas
+                    results["streamed"][table_type] = on_table(table_type, rows)
+                else:
+                    results["tables"][table_type] = list(rows)
+
+        if len(results["tables"]) == 0 and not results.get("streamed"):
             return {
                 "error": "Nenhuma tabela encontrada na página. Verifique se a URL está correta e se a página contém tabelas de estatísticas.",
                 "url": url,
@@ -589,6 +633,163 @@ class FBrefScraper:
         return results
 
 
+class AsyncFBrefScraper(FBrefScraper):
+    """
+    Motor assíncrono (asyncio) para extrair várias páginas do FBref em paralelo.
+
+    Mantém o contrato (soup, error_info) e a taxonomia de erros do FBrefScraper,
+    mas as esperas e o backoff usam asyncio.sleep e as chamadas bloqueantes
+    (requests e parse do BeautifulSoup) rodam num pool de threads próprio.
+    Um semáforo global limita quantas páginas são buscadas ao mesmo tempo.
+    """
+
+    def __init__(self, base_url: str = "https://fbref.com", max_concurrency: Optional[int] = None,
+                 cache: Optional[ResponseCache] = None, limiter: Optional[TokenBucketLimiter] = None,
+                 parser: Optional[str] = None, single_flight: Optional[SingleFlight] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        super().__init__(base_url, cache=cache, limiter=limiter, parser=parser, single_flight=single_flight,
+                         breaker=breaker)
+        # O pool de conexões do processo (FBREF_HTTP_POOL_SIZE) deve ser >= max_concurrency
+        self.max_concurrency = max(1, max_concurrency or int(os.environ.get('FBREF_MAX_CONCURRENCY', '4')))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='fbref')
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # O semáforo pertence ao event loop em execução (asyncio.run cria um novo a cada chamada)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _run_blocking(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def get_page(self, url: str, retries: int = 3,
+                       timings: Optional[Dict] = None) -> tuple[Optional[BeautifulSoup], Optional[Dict]]:
+        """
+        Versão assíncrona de FBrefScraper.get_page
+
+        Args:
+            url: URL completa ou relativa
+            retries: Número de tentativas em caso de falha
+            timings: Dict opcional preenchido com os tempos (s) da requisição: queue
+                (espera pelo semáforo), wait (limite de taxa + backoff), fetch (HTTP),
+                parse, além de attempts, cache e coalesced (True quando o resultado
+                veio de uma busca simultânea da mesma URL; a espera por ela conta em wait)
+
+        Returns:
+            Tupla (BeautifulSoup object ou None, dict com informações de erro ou None)
+        """
+        url = self._resolve_url(url)
+        if timings is None:
+            timings = {}
+        for key in ('queue', 'wait', 'fetch', 'parse'):
+            timings.setdefault(key, 0.0)
+
+        started = time.perf_counter()
+        result, shared = await self.single_flight.do_async(
+            self._single_flight_key(url), partial(self._fetch_page_async, url, retries, timings))
+        timings['coalesced'] = shared
+        if shared:
+            timings['wait'] += time.perf_counter() - started
+            print(f"[AsyncFBrefScraper] Resultado compartilhado com requisição simultânea: {url}")
+        return result
+
+    async def _fetch_page_async(self, url: str, retries: int,
+                                timings: Dict) -> tuple[Optional[BeautifulSoup], Optional[Dict]]:
+        """Corpo de get_page: semáforo, limite de taxa, busca e parse com novas tentativas"""
+        host = host_key(url)
+        last_error = None
+        queued_at = time.perf_counter()
+        async with self._get_semaphore():
+            timings['queue'] += time.perf_counter() - queued_at
+            for attempt in range(retries):
+                timings['attempts'] = attempt + 1
+                needs_request = self._needs_request(url)
+                if needs_request and not self.breaker.allow(host):
+                    return await self._run_blocking(self._circuit_open_result, url, host, last_error)
+                started = time.perf_counter()
+                if attempt > 0:
+                    await asyncio.sleep(self.limiter.backoff_delay(host, attempt, throttled=self._is_throttled(last_error)))
+                if needs_request:
+                    await self.limiter.acquire_async(host)
+                timings['wait'] += time.perf_counter() - started
+
+                try:
+                    print(f"[AsyncFBrefScraper] Tentativa {attempt + 1}/{retries} - Acessando: {url}")
+                    started = time.perf_counter()
+                    response = await self._run_blocking(self._http_get, url)
+                    timings['fetch'] += time.perf_counter() - started
+                    timings['cache'] = getattr(response, 'cache_status', None)
+                    print(f"[AsyncFBrefScraper] Status code: {response.status_code}, URL final: {response.url}, cache: {getattr(response, 'cache_status', '-')}")
+                    self._record_outcome(host, response=response)
+                    started = time.perf_counter()
+                    soup, error_info, retry = await self._run_blocking(self._handle_response, response, url, attempt, retries)
+                    timings['parse'] += time.perf_counter() - started
+                except requests.exceptions.RequestException as e:
+                    timings['fetch'] += time.perf_counter() - started
+                    self._record_outcome(host, exception=e)
+                    soup = None
+                    error_info = self._request_error_info(e, url, attempt, retries)
+                    retry = True
+
+                if not error_info:
+                    return (soup, None)
+
+                last_error = error_info
+                if not retry or attempt >= retries - 1:
+                    return (None, error_info)
+
+        return (None, last_error)
+
+    async def scrape_page(self, url: str, timings: Optional[Dict] = None,
+                          on_table: Optional[Callable[[str, Iterator[Dict]], int]] = None) -> Dict:
+        """
+        Versão assíncrona de scrape_any_page
+
+        Args:
+            timings: Dict opcional preenchido como em get_page (o parse inclui a extração das tabelas)
+            on_table: Callback de cada tabela extraída (chamado na thread do executor)
+        """
+        if timings is None:
+            timings = {}
+        soup, error_info = await self.get_page(url, timings=timings)
+        started = time.perf_counter()
+        result = await self._run_blocking(self._build_scrape_result, url, soup, error_info, on_table=on_table)
+        timings['parse'] += time.perf_counter() - started
+        return result
+
+    async def scrape_many(self, urls: List[str]) -> List[Dict]:
+        """
+        Extrai várias páginas em paralelo, respeitando max_concurrency
+
+        Returns:
+            Lista de resultados (mesmo formato de scrape_any_page), na ordem das URLs
+        """
+        return list(await asyncio.gather(*(self.scrape_page(url) for url in urls)))
+
+    def close(self):
+        """Libera o pool de threads (as conexões voltam para o pool do processo)"""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+# Limite de URLs por requisição em lote (championshipUrls)
+DEFAULT_BATCH_MAX_URLS = 20
+# O lote dispara até FBREF_MAX_CONCURRENCY buscas ao mesmo tempo, mas todas passam pelo
+# token bucket do host: com os padrões (10/min, burst 3) só as 3 primeiras URLs sem cache
+# saem na hora e as demais a cada 6 s (20 URLs frias levam ≈ 100 s).
+# Respostas servidas do cache em disco não consomem tokens, então o lote é rápido para
+# URLs já buscadas; para lotes frios grandes, use menos URLs por requisição.
+
+
+def _to_ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
 class handler(BaseHTTPRequestHandler):
     """Handler HTTP para Vercel Serverless Function"""
 
@@ -602,12 +803,43 @@ class handler(BaseHTTPRequestHandler):
 
     def do_POST(self):
         """Handle POST request"""
+        # Streaming NDJSON (opt-in via Accept: application/x-ndjson); iniciado após a validação
+        self._stream = NDJSONStream(self) if wants_ndjson(self.headers) else None
+        self._table_format = 'rows'
+        self._typed = False
+        self._since = []
+        self._record_snapshots = False
         try:
             # Ler body
             content_length = int(self.headers.get('Content-Length', 0))
             body = self.rfile.read(content_length)
             request_data = json.loads(body.decode('utf-8'))
 
+            # format "columnar": cada tabela como {"columns", "rows"} em vez de lista de dicts
+            try:
+                self._table_format = parse_table_format(request_data.get('format'))
+            except ValueError as e:
+                self._send_error(400, str(e))
+                return
+            # typed: colunas numéricas conhecidas (MP, Pts, xG, Attendance...) como int/float
+            self._typed = request_data.get('typed') is True
+            # since: snapshot(s) que o cliente já tem; tabelas com snapshot da mesma liga/temporada/tipo
+            # voltam só com as linhas alteradas em "delta" (ver api/_snapshot_store.py)
+            try:
+                self._since = self._parse_since(request_data.get('since'))
+            except ValueError as e:
+                self._send_error(400, str(e))
+                return
+            # Snapshots só são gravados quando pedidos (since ou "snapshot": true), salvo FBREF_SNAPSHOTS=always
+            mode = snapshots_mode()
+            self._record_snapshots = mode == 'always' or (
+                mode == 'request' and ('since' in request_data or request_data.get('snapshot') is True))
+
+            # Lote: {"championshipUrls": [...]} extrai todas as URLs nesta invocação
+            if 'championshipUrls' in request_data:
+                self._handle_batch(request_data.get('championshipUrls'))
+                return
+
             # Validar request
             championship_url = request_data.get('championshipUrl', '')
             championship_id = request_data.get('championshipId', '')
@@ -620,45 +852,263 @@ class handler(BaseHTTPRequestHandler):
             # Inicializar scraper
             scraper = FBrefScraper()
 
+            if self._stream:
+                # Cada tabela é enviada assim que extraída; a linha "result" fecha a URL
+                self._stream.start()
+                result = scraper.scrape_any_page(
+                    championship_url, extract_all_tables=True,
+                    on_table=lambda table_type, rows: self._write_table_event(
+                        {'type': 'table', 'url': championship_url, 'table': table_type}, rows),
+                )
+                self._stream.write(result_event(self._result_payload(result), url=championship_url,
+                                                circuit=scraper.breaker.snapshot(host_key(championship_url))))
+                self._stream.close()
+                return
+
             # Extrair tabelas
             result = scraper.scrape_any_page(championship_url, extract_all_tables=True)
 
-            if 'error' in result:
-                response_data = {
-                    'success': False,
-                    'error': result['error']
-                }
-                # Incluir detalhes do erro se disponível (para debug)
-                if 'error_details' in result:
-                    response_data['error_details'] = result['error_details']
-                self._send_response(response_data)
-                return
+            # Retornar resposta (com o estado do circuit breaker do FBref)
+            payload = self._result_payload(result)
+            payload['circuit'] = scraper.breaker.snapshot(host_key(championship_url))
+            self._send_response(payload)
+
+        except json.JSONDecodeError:
+            self._send_error(400, 'JSON inválido no body da requisição')
+        except Exception as e:
+            self._send_error(500, f'Erro interno: {str(e)}')
 
-            # Mapear tabelas para formato esperado
-            tables = result.get('tables', {})
-            mapped_tables = {
-                'geral': tables.get('geral', [])
+    @staticmethod
+    def _parse_since(value) -> List[int]:
+        """Ids de snapshot do parâmetro since (um id ou lista de ids)"""
+        if value is None:
+            return []
+        values = value if isinstance(value, list) else [value]
+        if not all(isinstance(item, int) and not isinstance(item, bool) for item in values):
+            raise ValueError('since deve ser um id de snapshot ou uma lista de ids.')
+        return values
+
+    def _output_rows(self, rows: List[Dict]) -> List[Dict]:
+        """Linhas como saem na resposta (tipadas se o cliente pediu typed)"""
+        return apply_column_types(rows) if self._typed else rows
+
+    def _write_table_event(self, event: Dict, rows: Iterator[Dict]) -> int:
+        """
+        Envia o evento "table" no stream e devolve o número de linhas
+
+        No formato 'rows' as linhas são serializadas à medida que são lidas;
+        o colunar precisa de todas as linhas para montar as colunas.
+        """
+        if self._table_format == 'rows':
+            return self._stream.write_rows(event, iter_typed_rows(rows) if self._typed else rows)
+        rows = self._output_rows(list(rows))
+        self._stream.write({**event, **table_fields(rows, self._table_format)})
+        return len(rows)
+
+    def _result_payload(self, result: Dict, record_snapshots: bool = True) -> Dict:
+        """
+        Converte o resultado de scrape_any_page no formato de resposta da API
+
+        Args:
+            record_snapshots: False deixa a gravação dos snapshots para o chamador
+                (_add_snapshots; o lote a roda fora do event loop)
+        """
+        if 'error' in result:
+            response_data = {
+                'success': False,
+                'error': result['error']
             }
+            # Incluir detalhes do erro se disponível (para debug)
+            if 'error_details' in result:
+                response_data['error_details'] = result['error_details']
+            return response_data
+
+        # Mapear tabelas para formato esperado
+        tables = result.get('tables', {})
+        streamed = result.get('streamed', {})
+        mapped_tables = {
+            'geral': tables.get('geral', [])
+        }
+
+        # Identificar tabelas faltantes (as enviadas em streaming já saíram no evento "table")
+        missing_tables = []
+        for table_type in ['geral']:
+            if not mapped_tables[table_type] and not streamed.get(table_type):
+                missing_tables.append(table_type)
 
-            # Identificar tabelas faltantes
-            missing_tables = []
-            for table_type in ['geral']:
-                if not mapped_tables[table_type] or len(mapped_tables[table_type]) == 0:
-                    missing_tables.append(table_type)
-
-            # Retornar resposta
-            self._send_response({
-                'success': True,
-                'data': {
-                    'tables': mapped_tables,
-                    'missingTables': missing_tables
+        data = {
+            'tables': {table_type: format_table(self._output_rows(rows), self._table_format)
+                       for table_type, rows in mapped_tables.items()},
+            'missingTables': missing_tables
+        }
+        if record_snapshots:
+            self._add_snapshots(data, result)
+        if self._table_format != 'rows':
+            data['format'] = self._table_format
+        if self._typed:
+            data['typed'] = True
+        return {
+            'success': True,
+            'data': data
+        }
+
+    def _add_snapshots(self, data: Dict, result: Dict):
+        """
+        Grava as tabelas extraídas no snapshot store e troca por deltas as que o cliente já tem
+
+        Só age quando a requisição pediu snapshots (ver do_POST). data["snapshots"]
+        recebe {tipo: id}; com since apontando para um snapshot da mesma
+        liga/temporada/tipo, a tabela sai de data["tables"] e vai para
+        data["delta"][tipo] só com as linhas novas/alteradas e as chaves removidas.
+        Falhas do SQLite não derrubam a resposta (as tabelas voltam completas).
+        """
+        if not self._record_snapshots or 'tables' not in data:
+            return
+        store = get_default_snapshot_store()
+        if store is None:
+            return
+        url = result.get('url', '')
+        league, season = snapshot_key(url)
+        # Linhas como extraídas (sem typed/format), uma entrada por tabela da resposta
+        tables = {table_type: result.get('tables', {}).get(table_type) for table_type in data['tables']}
+        try:
+            bases = {}
+            for snapshot_id in self._since:
+                base = store.get(snapshot_id)
+                if base is not None:
+                    bases[(base['league'], base['season'], base['tableType'])] = snapshot_id
+
+            snapshots = {}
+            deltas = {}
+            for table_type, rows in tables.items():
+                if not rows:
+                    continue
+                snapshot = store.record(league, season, table_type, rows, url=url)
+                snapshots[table_type] = snapshot['id']
+                base_id = bases.get((league, season, table_type))
+                diff = store.diff(base_id, snapshot['id']) if base_id is not None else None
+                if diff is None:
+                    continue
+                deltas[table_type] = {
+                    'from': diff['from'],
+                    'to': diff['to'],
+                    'changed': format_table(self._output_rows(diff['changed']), self._table_format),
+                    'removed': diff['removed'],
+                    'unchanged': diff['unchanged'],
                 }
-            })
+        except sqlite3.Error as e:
+            print(f"[SnapshotStore] Falha ao gravar snapshots de {url}: {e}")
+            return
+
+        if snapshots:
+            data['snapshots'] = snapshots
+        if deltas:
+            data['delta'] = deltas
+            for table_type in deltas:
+                del data['tables'][table_type]
+
+    def _handle_batch(self, championship_urls):
+        """
+        Extrai várias URLs em paralelo (AsyncFBrefScraper) e responde com o resultado de cada uma
 
-        except json.JSONDecodeError:
-            self._send_error(400, 'JSON inválido no body da requisição')
+        O paralelismo só vale até o orçamento do token bucket (ver DEFAULT_BATCH_MAX_URLS):
+        URLs sem cache além do burst esperam pelo limite de taxa, ainda que em paralelo.
+        """
+        if not isinstance(championship_urls, list) or not championship_urls or \
+                not all(isinstance(url, str) for url in championship_urls):
+            self._send_error(400, 'championshipUrls deve ser uma lista não vazia de URLs.')
+            return
+
+        max_urls = int(os.environ.get('FBREF_BATCH_MAX_URLS', DEFAULT_BATCH_MAX_URLS))
+        if len(championship_urls) > max_urls:
+            self._send_error(400, f'Máximo de {max_urls} URLs por requisição.')
+            return
+
+        started = time.perf_counter()
+        scraper = AsyncFBrefScraper()
+        if self._stream:
+            self._stream.start()
+        try:
+            results = asyncio.run(self._scrape_batch(scraper, championship_urls))
+        finally:
+            scraper.close()
+
+        succeeded = sum(1 for item in results if item['success'])
+        timing = {
+            'totalMs': _to_ms(time.perf_counter() - started),
+            'maxConcurrency': scraper.max_concurrency,
+            # Acumulado do processo: conexões novas vs reaproveitadas desde o início do container
+            'connections': connection_stats(),
+        }
+        circuit = scraper.breaker.snapshot(host_key(scraper.base_url))
+        if self._stream:
+            self._stream.write({'type': 'done', 'succeeded': succeeded, 'failed': len(results) - succeeded,
+                                'timing': timing, 'circuit': circuit})
+            self._stream.close()
+            return
+
+        self._send_response({
+            'success': True,
+            'data': {
+                'results': results,
+                'succeeded': succeeded,
+                'failed': len(results) - succeeded,
+                'timing': timing,
+                'circuit': circuit,
+            }
+        })
+
+    async def _scrape_batch(self, scraper: 'AsyncFBrefScraper', urls: List[str]) -> List[Dict]:
+        return list(await asyncio.gather(*(self._scrape_batch_item(scraper, index, url) for index, url in enumerate(urls))))
+
+    async def _scrape_batch_item(self, scraper: 'AsyncFBrefScraper', index: int, url: str) -> Dict:
+        """
+        Resultado de uma URL do lote: formato da resposta simples + url e timing
+
+        No modo streaming as tabelas e o resultado da URL são enviados assim que
+        ficam prontos (na ordem de conclusão; `index` indica a posição no lote) e
+        o item retornado não guarda as tabelas.
+        """
+        on_table = None
+        if self._stream:
+            def on_table(table_type: str, rows: Iterator[Dict]) -> int:
+                return self._write_table_event({'type': 'table', 'index': index, 'url': url, 'table': table_type}, rows)
+
+        if not url or 'fbref.com' not in url:
+            item = {'url': url, 'success': False, 'error': 'URL inválida. Apenas URLs do fbref.com são permitidas.'}
+            if self._stream:
+                self._stream.write(result_event(item, index=index))
+            return item
+
+        timings = {}
+        started = time.perf_counter()
+        try:
+            result = await scraper.scrape_page(url, timings=timings, on_table=on_table)
+            payload = self._result_payload(result, record_snapshots=False)
+            if payload['success']:
+                # SQLite bloqueante: fora do event loop, no pool de threads do scraper
+                await scraper._run_blocking(self._add_snapshots, payload['data'], result)
         except Exception as e:
-            self._send_error(500, f'Erro interno: {str(e)}')
+            payload = {'success': False, 'error': f'Erro interno: {str(e)}'}
+
+        item = {
+            'url': url,
+            **payload,
+            'timing': {
+                'totalMs': _to_ms(time.perf_counter() - started),
+                'queueMs': _to_ms(timings.get('queue', 0.0)),
+                'waitMs': _to_ms(timings.get('wait', 0.0)),
+                'fetchMs': _to_ms(timings.get('fetch', 0.0)),
+                'parseMs': _to_ms(timings.get('parse', 0.0)),
+                'attempts': timings.get('attempts', 0),
+                'cache': timings.get('cache'),
+                'coalesced': timings.get('coalesced', False),
+            }
+        }
+        if self._stream:
+            self._stream.write(result_event(item, index=index))
+            return {'url': url, 'success': item['success']}
+        return item
 
     def _send_response(self, data: Dict, status_code: int = 200):
         """Envia resposta JSON"""
@@ -670,6 +1120,11 @@ class handler(BaseHTTPRequestHandler):
 
     def _send_error(self, status_code: int, message: str):
         """Envia erro"""
+        if getattr(self, '_stream', None) and self._stream.started:
+            # Status e headers já foram enviados: o erro vira a última linha do stream
+            self._stream.write({'type': 'error', 'success': False, 'error': message})
+            self._stream.close()
+            return
         self._send_response({
             'success': False,
             'error': message
@@ -1,11 +1,18 @@
 """
 Leve proxy que retorna o HTML bruto do FBref para parse client-side (DOMParser).
 Usa headers anti-detecção idênticos ao fbref-extract.py para evitar 403.
+A resposta é comprimida (brotli/gzip) conforme o Accept-Encoding do cliente.
+
+Body: {"url": "...", "mode": "fragments", "tablePatterns": [...], "includeTitle": true}
+- mode "fragments" (opcional) devolve só as <table> cujo id casa com algum dos
+  tablePatterns (regex, sem diferenciar maiúsculas), inclusive as que o FBref
+  envia dentro de comentários HTML, num documento mínimo com o <title>.
 Roda como Vercel Serverless Function.
 """
 import json
-import random
-import time
+import os
+import re
+import sys
 from http.server import BaseHTTPRequestHandler
 
 try:
@@ -13,6 +20,15 @@ try:
 except ImportError:
     pass
 
+# Módulos auxiliares compartilhados (arquivos api/_*.py não viram rotas na Vercel)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _http_compression import iter_compressed, negotiate_encoding
+from _circuit_breaker import get_default_breaker, guarded_request, is_failure_status
+from _fbref_cache import get_default_cache, normalize_url
+from _fbref_http import new_session
+from _fbref_ratelimit import get_default_limiter, host_key
+from _single_flight import get_default_single_flight
+
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
@@ -31,6 +47,144 @@ HEADERS = {
 }
 
 
+# Modo "fragments": só as <table> cujo id casa com os padrões pedidos
+MAX_TABLE_PATTERNS = 20
+MAX_PATTERN_LENGTH = 100
+
+# Varre o HTML bruto, então pega também as tabelas que o FBref envia dentro de comentários.
+# O atributo id precisa vir depois de espaço: \b também casaria data-id= (o '-' é fronteira de palavra)
+TABLE_RE = re.compile(r'<table\b[^>]*?\sid\s*=\s*["\']?([^"\'\s>]+)[^>]*>.*?</table\s*>', re.IGNORECASE | re.DOTALL)
+TITLE_RE = re.compile(r'<title\b[^>]*>.*?</title\s*>', re.IGNORECASE | re.DOTALL)
+
+
+def compile_table_patterns(patterns):
+    """Valida e compila os padrões de id (case-insensitive); ValueError se inválidos"""
+    if patterns is None:
+        return []
+    if not isinstance(patterns, list) or len(patterns) > MAX_TABLE_PATTERNS or \
+            not all(isinstance(p, str) and 0 < len(p) <= MAX_PATTERN_LENGTH for p in patterns):
+        raise ValueError(f'tablePatterns deve ser uma lista de até {MAX_TABLE_PATTERNS} strings '
+                         f'(máx. {MAX_PATTERN_LENGTH} caracteres)')
+    try:
+        return [re.compile(p, re.IGNORECASE) for p in patterns]
+    except re.error as e:
+        raise ValueError(f'Padrão de tabela inválido: {e}')
+
+
+def extract_table_fragments(html, patterns, include_title=True):
+    """
+    Monta um documento mínimo só com as tabelas cujo id casa com algum padrão
+    (sem padrões: todas as tabelas com id), na ordem da página
+
+    Returns:
+        Tupla (html do documento, lista de ids incluídos)
+    """
+    fragments = []
+    table_ids = []
+    seen = set()
+    for match in TABLE_RE.finditer(html):
+        table_id = match.group(1)
+        if table_id in seen:
+            continue
+        if patterns and not any(p.search(table_id) for p in patterns):
+            continue
+        seen.add(table_id)
+        table_ids.append(table_id)
+        fragments.append(match.group(0))
+
+    head = ''
+    if include_title:
+        title = TITLE_RE.search(html)
+        if title:
+            head = title.group(0)
+
+    document = f'<!DOCTYPE html><html><head><meta charset="utf-8">{head}</head><body>\n' + \
+        '\n'.join(fragments) + '\n</body></html>'
+    return document, table_ids
+
+
+def fetch_fbref_html(url, attempts=3):
+    """
+    Busca o HTML da página com novas tentativas, limite de taxa e cache
+
+    Returns:
+        Tupla (html ou None, mensagem do último erro ou None)
+    """
+    # Sessão descartável sobre o pool de conexões do processo (keep-alive entre invocações)
+    session = new_session(HEADERS)
+    cache = get_default_cache()
+    limiter = get_default_limiter()
+    breaker = get_default_breaker()
+    host = host_key(url)
+    last_error = None
+    throttled = False
+
+    for attempt in range(attempts):
+        try:
+            needs_request = not (cache and cache.has_usable_entry(url))
+            if needs_request and not breaker.allow(host):
+                # Circuito aberto: cópia do cache de qualquer idade ou falha imediata, sem backoff
+                fallback = cache.fallback(url) if cache else None
+                if fallback is not None:
+                    print(f"[FBrefHtmlProxy] Circuito aberto; servindo cópia do cache: {url}")
+                    return (fallback.text, None)
+                return (None, f'Circuito aberto: FBref bloqueando requisições (último erro: {last_error})')
+            if attempt > 0:
+                limiter.backoff(host, attempt, throttled=throttled)
+            if needs_request:
+                # Só espera quando o orçamento de requisições ao FBref está esgotado
+                limiter.acquire(host)
+            throttled = False
+
+            if cache:
+                resp = cache.fetch(session, url, timeout=45, allow_redirects=True,
+                                   guard=guarded_request(breaker, limiter, host))
+            else:
+                resp = session.get(url, timeout=45, allow_redirects=True)
+            if getattr(resp, 'cache_status', None) not in ('hit', 'stale'):
+                breaker.record(host, not is_failure_status(resp.status_code))
+
+            if resp.status_code == 403:
+                last_error = '403: Acesso negado pelo FBref'
+                session.headers['Referer'] = 'https://fbref.com/'
+                throttled = True
+                continue
+
+            if resp.status_code >= 400:
+                last_error = f'HTTP {resp.status_code}: {resp.reason}'
+                continue
+
+            if resp.encoding is None or resp.encoding == 'ISO-8859-1':
+                resp.encoding = 'utf-8'
+
+            html = resp.text
+
+            if len(html) < 10000:
+                last_error = f'Resposta curta ({len(html)} bytes)'
+                if cache:
+                    cache.invalidate(url)
+                continue
+
+            if 'stats_table' not in html and 'id="results' not in html:
+                last_error = 'HTML sem tabelas de estatísticas'
+                if cache:
+                    cache.invalidate(url)
+                continue
+
+            return (html, None)
+
+        except requests.exceptions.Timeout:
+            breaker.record_failure(host)
+            last_error = 'Timeout (45s)'
+        except requests.exceptions.ConnectionError:
+            breaker.record_failure(host)
+            last_error = 'Erro de conexão'
+        except requests.exceptions.RequestException as e:
+            last_error = str(e)
+
+    return (None, last_error)
+
+
 class handler(BaseHTTPRequestHandler):
 
     def do_OPTIONS(self):
@@ -51,68 +205,75 @@ class handler(BaseHTTPRequestHandler):
                 self._send_error(400, 'URL inválida. Apenas URLs do fbref.com são permitidas.')
                 return
 
-            session = requests.Session()
-            session.headers.update(HEADERS)
-            last_error = None
-
-            for attempt in range(3):
-                try:
-                    if attempt > 0:
-                        delay = (2 ** attempt) + random.uniform(0.5, 1.5)
-                        time.sleep(delay)
-                    else:
-                        time.sleep(random.uniform(1.0, 2.0))
-
-                    resp = session.get(url, timeout=45, allow_redirects=True)
-
-                    if resp.status_code == 403:
-                        last_error = '403: Acesso negado pelo FBref'
-                        session.headers['Referer'] = 'https://fbref.com/'
-                        continue
-
-                    if resp.status_code >= 400:
-                        last_error = f'HTTP {resp.status_code}: {resp.reason}'
-                        continue
-
-                    if resp.encoding is None or resp.encoding == 'ISO-8859-1':
-                        resp.encoding = 'utf-8'
-
-                    html = resp.text
+            # mode "fragments": devolve só as tabelas pedidas em vez da página inteira
+            fragments_mode = data.get('mode') == 'fragments'
+            try:
+                table_patterns = compile_table_patterns(data.get('tablePatterns')) if fragments_mode else []
+            except ValueError as e:
+                self._send_error(400, str(e))
+                return
 
-                    if len(html) < 10000:
-                        last_error = f'Resposta curta ({len(html)} bytes)'
-                        continue
+            # Requisições simultâneas para a mesma URL compartilham uma única busca
+            (html, last_error), shared = get_default_single_flight().do(
+                normalize_url(url), lambda: fetch_fbref_html(url))
+            if shared:
+                print(f"[FBrefHtmlProxy] Resultado compartilhado com requisição simultânea: {url}")
+            # Estado do circuit breaker do FBref (com o circuito aberto o HTML pode vir do cache)
+            circuit = get_default_breaker().snapshot(host_key(url))
 
-                    if 'stats_table' not in html and 'id="results' not in html:
-                        last_error = 'HTML sem tabelas de estatísticas'
-                        continue
+            if html is None:
+                if circuit['state'] != 'closed':
+                    self._send_error(503, last_error, circuit=circuit)
+                else:
+                    self._send_error(502, f'Falha ao acessar FBref após 3 tentativas: {last_error}', circuit=circuit)
+                return
 
-                    self._send_response({'html': html})
+            if fragments_mode:
+                fragment_html, table_ids = extract_table_fragments(
+                    html, table_patterns, include_title=data.get('includeTitle', True))
+                if not table_ids:
+                    self._send_error(404, 'Nenhuma tabela da página corresponde aos padrões pedidos')
                     return
+                self._send_response({'html': fragment_html, 'mode': 'fragments', 'tables': table_ids,
+                                     'circuit': circuit})
+                return
 
-                except requests.exceptions.Timeout:
-                    last_error = 'Timeout (45s)'
-                except requests.exceptions.ConnectionError:
-                    last_error = 'Erro de conexão'
-                except requests.exceptions.RequestException as e:
-                    last_error = str(e)
-
-            self._send_error(502, f'Falha ao acessar FBref após 3 tentativas: {last_error}')
+            self._send_response({'html': html, 'circuit': circuit})
 
         except json.JSONDecodeError:
             self._send_error(400, 'JSON inválido')
         except Exception as e:
             self._send_error(500, f'Erro interno: {str(e)}')
 
-    def _send_response(self, data, status_code=200):
+    def _send_response(self, data, status_code=200, compress=True):
+        encoding = negotiate_encoding(self.headers.get('Accept-Encoding')) if compress else None
+        if not encoding:
+            self.send_response(status_code)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            self.wfile.write(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+            return
+
+        # Corpo comprimido em streaming: chunked exige HTTP/1.1 na linha de status
+        self.protocol_version = 'HTTP/1.1'
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json; charset=utf-8')
         self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Connection', 'close')
         self.end_headers()
-        self.wfile.write(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+        pieces = (piece.encode('utf-8') for piece in json.JSONEncoder(ensure_ascii=False).iterencode(data))
+        for chunk in iter_compressed(pieces, encoding):
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        self.wfile.write(b'0\r\n\r\n')
 
-    def _send_error(self, status_code, message):
-        self._send_response({'error': message}, status_code)
+    def _send_error(self, status_code, message, **extra):
+        # Corpo pequeno: não compensa comprimir
+        self._send_response({'error': message, **extra}, status_code, compress=False)
 
     def log_message(self, format, *args):
         pass
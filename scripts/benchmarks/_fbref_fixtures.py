@@ -0,0 +1,321 @@
+"""
+Fixtures compartilhadas pelos benchmarks dos scrapers Python do FBref.
+
+Gera páginas HTML no formato do FBref a partir dos JSONs salvos em `Jsons/` e
+`Tabela teste/`, sobe um servidor HTTP local que as serve (simulando latência
+de rede) e carrega os módulos de `api/` (cujos nomes têm hífen) via importlib.
+"""
+import hashlib
+import html
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+API_DIR = os.path.join(REPO_ROOT, 'api')
+STANDALONE_SCRAPER_DIR = os.path.join(REPO_ROOT, 'Cur Sor', 'Cursor', 'QA', 'App Scraper')
+
+OVERALL_FIXTURE = os.path.join(REPO_ROOT, 'Jsons', 'results2025-2026111_overall (1).json')
+SQUAD_FIXTURE = os.path.join(REPO_ROOT, 'Tabela teste', 'resultado_Operação 1 (3).json')
+
+OVERALL_TABLE_ID = 'results2025-2026111_overall'
+
+# Blocos de estatísticas de squad que o FBref envia dentro de comentários HTML
+SQUAD_TABLE_KINDS = [
+    'standard', 'keeper', 'keeper_adv', 'shooting', 'passing', 'passing_types',
+    'gca', 'defense', 'possession', 'playing_time', 'misc',
+]
+
+SQUAD_CATEGORIES = ['Playing Time', 'Performance', 'Per 90 Minutes']
+
+
+def load_api_module(name: str):
+    """Carrega `api/<name>.py` como módulo (os arquivos usam hífen no nome)"""
+    if API_DIR not in sys.path:
+        sys.path.insert(0, API_DIR)
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(API_DIR, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_standalone_scraper():
+    """Carrega `Cur Sor/.../scraper.py` (scraper standalone)"""
+    if STANDALONE_SCRAPER_DIR not in sys.path:
+        sys.path.insert(0, STANDALONE_SCRAPER_DIR)
+    import scraper
+    return scraper
+
+
+def load_overall_rows() -> List[Dict]:
+    """Linhas da tabela geral salva (inclui as colunas *_link)"""
+    with open(OVERALL_FIXTURE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def expected_overall_rows() -> List[Dict]:
+    """Saída esperada do scraper para a tabela geral (sem colunas *_link)"""
+    return [
+        {key: value for key, value in row.items() if not key.endswith('_link')}
+        for row in load_overall_rows()
+    ]
+
+
+def load_squad_rows() -> List[Dict]:
+    with open(SQUAD_FIXTURE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _cell(tag: str, text: str, stat: str, link: Optional[str] = None, **attrs) -> str:
+    extra = ''.join(f' {key}="{value}"' for key, value in attrs.items())
+    content = html.escape(text)
+    if link:
+        # FBref coloca o link no nome e o número de gols fora do <a> (ex.: "Nome-10")
+        name, sep, rest = text.rpartition('-') if stat == 'top_team_scorers' else (text, '', '')
+        if not sep or name != name.strip() or rest != rest.strip():
+            # get_text(strip=True) removeria espaços nas bordas de cada nó de texto
+            name, sep, rest = text, '', ''
+        content = f'<a href="{html.escape(link)}">{html.escape(name)}</a>{sep}{html.escape(rest)}'
+    return f'<{tag} class="right " data-stat="{stat}"{extra}>{content}</{tag}>'
+
+
+def render_overall_table(rows: List[Dict], table_id: str = OVERALL_TABLE_ID) -> str:
+    """Renderiza a tabela de classificação no layout do FBref (thead de uma linha)"""
+    headers = [key for key in rows[0].keys() if not key.endswith('_link')]
+    parts = [
+        f'<table class="stats_table sortable min_width force_mobilize" id="{table_id}" '
+        'data-cols-to-freeze=",2">',
+        '<caption>Regular season Table</caption>',
+        '<colgroup>' + '<col>' * len(headers) + '</colgroup>',
+        '<thead><tr>',
+    ]
+    for header in headers:
+        stat = header.lower().replace(' ', '_').replace('/', '_per_')
+        parts.append(
+            f'<th aria-label="{html.escape(header)}" data-stat="{stat}" scope="col" '
+            f'class=" poptip center">{html.escape(header)}</th>'
+        )
+    parts.append('</tr></thead><tbody>')
+    for row in rows:
+        parts.append('<tr >')
+        for idx, header in enumerate(headers):
+            stat = 'top_team_scorers' if header == 'Top Team Scorer' else header.lower().replace(' ', '_')
+            link = row.get(f'{header}_link')
+            if idx == 0:
+                parts.append(_cell('th', row[header], 'rank', scope='row'))
+            elif header == 'Squad':
+                parts.append(
+                    f'<td class="left " data-stat="team"><img src="/logo.png" alt="" /> '
+                    f'<a href="/en/squads/{idx:08x}/">{html.escape(row[header])}</a></td>'
+                )
+            else:
+                parts.append(_cell('td', row[header], stat, link=link))
+        parts.append('</tr>\n')
+    parts.append('</tbody></table>')
+    return ''.join(parts)
+
+
+def render_squad_table(rows: List[Dict], table_id: str) -> str:
+    """
+    Renderiza uma tabela de squad com thead de duas linhas (categorias com
+    colspan + cabeçalhos específicos), como as tabelas stats_squads_* do FBref
+    """
+    lookup_keys = [key for key in rows[0].keys() if key.startswith('Lookup_')]
+    groups: List[tuple] = []
+    for key in lookup_keys:
+        label = key[len('Lookup_'):]
+        category = next((c for c in SQUAD_CATEGORIES if label.startswith(c + ' ')), '')
+        stat = label[len(category) + 1:] if category else label
+        if groups and groups[-1][0] == category:
+            groups[-1][1].append(stat)
+        else:
+            groups.append((category, [stat]))
+
+    top = ['<tr class="over_header"><th></th>']
+    bottom = ['<tr><th aria-label="Squad" data-stat="team" scope="col">Squad</th>']
+    for category, stats in groups:
+        top.append(f'<th colspan="{len(stats)}" class=" over_header center">{html.escape(category)}</th>')
+        for stat in stats:
+            bottom.append(f'<th scope="col" class=" poptip center">{html.escape(stat)}</th>')
+    top.append('</tr>')
+    bottom.append('</tr>')
+
+    parts = [
+        f'<table class="stats_table sortable min_width" id="{table_id}" data-cols-to-freeze=",1">',
+        '<thead>', ''.join(top), ''.join(bottom), '</thead><tbody>',
+    ]
+    for row in rows:
+        parts.append(f'<tr ><th scope="row" class="left " data-stat="team"><a href="/en/squads/x/">'
+                     f'{html.escape(row["Squad"])}</a></th>')
+        for key in lookup_keys:
+            parts.append(_cell('td', row[key], key.lower()))
+        parts.append('</tr>\n')
+    parts.append('</tbody></table>')
+    return ''.join(parts)
+
+
+def build_fbref_page(
+    overall_rows: Optional[List[Dict]] = None,
+    squad_rows: Optional[List[Dict]] = None,
+    squad_tables: int = len(SQUAD_TABLE_KINDS),
+    commented_squad_tables: bool = True,
+    filler_kb: int = 300,
+    overall_table_id: str = OVERALL_TABLE_ID,
+) -> str:
+    """
+    Monta uma página de campeonato no formato do FBref: <head> com scripts,
+    navegação, a tabela geral no DOM e as tabelas de squad (for/against)
+    embutidas em comentários HTML, como o FBref faz.
+    """
+    overall_rows = overall_rows if overall_rows is not None else load_overall_rows()
+    squad_rows = squad_rows if squad_rows is not None else load_squad_rows()
+
+    filler_script = '<script>var _ads = "' + ('x' * 1000) + '";</script>\n'
+    nav = '<div id="nav"><ul>' + ''.join(
+        f'<li><a href="/en/comps/{i}/">Competition {i}</a></li>' for i in range(200)
+    ) + '</ul></div>'
+
+    parts = [
+        '<!DOCTYPE html><html data-version="klecko-" lang="en"><head>',
+        '<meta charset="utf-8" />',
+        '<title>2025-2026 Serie A Stats | FBref.com</title>',
+        filler_script * (filler_kb // 2),
+        '</head><body class="comps"><div id="wrap">',
+        nav,
+        '<div id="content" role="main">',
+        '<h1>2025-2026 Serie A Stats</h1>',
+        f'<div class="table_container" id="div_{overall_table_id}">',
+        render_overall_table(overall_rows, overall_table_id),
+        '</div>',
+    ]
+
+    kinds = (SQUAD_TABLE_KINDS * ((squad_tables // len(SQUAD_TABLE_KINDS)) + 1))[:squad_tables]
+    for idx, kind in enumerate(kinds):
+        suffix = '' if idx < len(SQUAD_TABLE_KINDS) else f'_{idx}'
+        for side in ('for', 'against'):
+            table_id = f'stats_squads_{kind}{suffix}_{side}'
+            table_html = render_squad_table(squad_rows, table_id)
+            parts.append(f'<div id="all_{table_id}" class="table_wrapper">')
+            parts.append('<div class="placeholder"></div>')
+            if commented_squad_tables:
+                parts.append(f'\n<!--\n   <div class="table_container" id="div_{table_id}">'
+                             f'{table_html}</div>\n-->\n')
+            else:
+                parts.append(f'<div class="table_container" id="div_{table_id}">{table_html}</div>')
+            parts.append('</div>')
+
+    parts.append('</div>')
+    parts.append(filler_script * (filler_kb // 2))
+    parts.append('</div></body></html>')
+    return ''.join(parts)
+
+
+class FixtureServer:
+    """
+    Servidor HTTP local que serve páginas de fixture do FBref.
+
+    Qualquer caminho `/en/comps/<n>/...` devolve a página registrada (ou a
+    página padrão), após `latency` segundos, para simular a rede até o FBref.
+    """
+
+    def __init__(self, pages: Optional[Dict[str, str]] = None, default_page: Optional[str] = None,
+                 latency: float = 0.0, chunk_delay: float = 0.0, chunk_size: int = 64 * 1024):
+        self.pages = pages or {}
+        self.default_page = default_page if default_page is not None else build_fbref_page()
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self.request_count = 0
+        self.not_modified_count = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, path: str) -> str:
+        return f'{self.base_url}{path}'
+
+    def _make_handler(self):
+        fixture = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with fixture._lock:
+                    fixture.request_count += 1
+                if fixture.latency:
+                    time.sleep(fixture.latency)
+                page = fixture.pages.get(self.path.split('?')[0], fixture.default_page)
+                body = page.encode('utf-8')
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    with fixture._lock:
+                        fixture.not_modified_count += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', 'Sat, 01 Nov 2025 12:00:00 GMT')
+                self.end_headers()
+                for start in range(0, len(body), fixture.chunk_size):
+                    try:
+                        self.wfile.write(body[start:start + fixture.chunk_size])
+                    except (BrokenPipeError, ConnectionResetError):
+                        return
+                    with fixture._lock:
+                        fixture.bytes_sent += min(fixture.chunk_size, len(body) - start)
+                    if fixture.chunk_delay:
+                        time.sleep(fixture.chunk_delay)
+
+            def handle(self):
+                try:
+                    super().handle()
+                except ConnectionResetError:
+                    # Cliente fechou a conexão antes do fim da página (parser 'stream')
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return _Handler
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
@@ -0,0 +1,63 @@
+"""
+Benchmark: FBrefScraper (serial) vs AsyncFBrefScraper.scrape_many (concorrente).
+
+Sobe um servidor local servindo a página de fixture do FBref com latência
+simulada e extrai N "campeonatos" das duas formas.
+
+Uso:
+    python scripts/benchmarks/bench_async_fetch.py --urls 20 --concurrency 8 --latency 0.5
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+
+from _fbref_fixtures import FixtureServer, expected_overall_rows, load_api_module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--urls', type=int, default=20, help='Número de campeonatos')
+    parser.add_argument('--concurrency', type=int, default=8, help='Limite global de concorrência')
+    parser.add_argument('--latency', type=float, default=0.5, help='Latência simulada do servidor (s)')
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help='Limite do token bucket em requisições/minuto (0 = sem limite; produção usa 10)')
+    args = parser.parse_args()
+
+    # Mede a rede/parse, não o cache de respostas em disco
+    os.environ['FBREF_CACHE_DISABLED'] = '1'
+    os.environ['FBREF_RATE_PER_MINUTE'] = str(args.rate)
+    os.environ['FBREF_RATE_LIMIT_DB'] = ''
+
+    extract = load_api_module('fbref-extract')
+    expected = expected_overall_rows()
+
+    with FixtureServer(latency=args.latency) as server:
+        urls = [server.url(f'/en/comps/{i}/Stats') for i in range(args.urls)]
+
+        sync_scraper = extract.FBrefScraper()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            sync_results = [sync_scraper.scrape_any_page(url) for url in urls]
+        sync_elapsed = time.perf_counter() - start
+
+        async_scraper = extract.AsyncFBrefScraper(max_concurrency=args.concurrency)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            async_results = asyncio.run(async_scraper.scrape_many(urls))
+        async_elapsed = time.perf_counter() - start
+        async_scraper.close()
+
+    for results in (sync_results, async_results):
+        assert all(r.get('tables', {}).get('geral') == expected for r in results), 'saída divergente da fixture'
+
+    print(f'URLs: {args.urls} | latência: {args.latency}s | limite: {args.rate or "-"}/min | concorrência: {args.concurrency}')
+    print(f'  serial (FBrefScraper):           {sync_elapsed:7.2f}s  ({sync_elapsed / args.urls * 1000:7.1f} ms/URL)')
+    print(f'  async  (AsyncFBrefScraper):      {async_elapsed:7.2f}s  ({async_elapsed / args.urls * 1000:7.1f} ms/URL)')
+    print(f'  speedup: {sync_elapsed / async_elapsed:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
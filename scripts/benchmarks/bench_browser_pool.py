@@ -0,0 +1,89 @@
+"""
+Benchmark: latência por requisição do FBrefSeleniumScraper com Chrome "frio"
+(um navegador novo por requisição, como o handler fazia) vs pool aquecido
+(BrowserPool reaproveitando o navegador).
+
+Requer selenium + Chrome/ChromeDriver instalados. As páginas vêm do servidor
+local de fixtures, então o tempo medido é basicamente inicialização do
+navegador + carregamento/parse da página.
+
+Uso:
+    python scripts/benchmarks/bench_browser_pool.py --requests 20 --pool-size 1
+"""
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+from _fbref_fixtures import FixtureServer, expected_overall_rows, load_api_module, percentile
+
+
+def timed_requests(urls, scrape):
+    """Executa scrape(url) para cada URL e retorna (resultados, latências em s)"""
+    results, latencies = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for url in urls:
+            start = time.perf_counter()
+            results.append(scrape(url))
+            latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=20, help='Requisições por modo')
+    parser.add_argument('--pool-size', type=int, default=1, help='Tamanho do pool (FBREF_BROWSER_POOL_SIZE)')
+    parser.add_argument('--max-pages', type=int, default=50, help='Páginas por navegador antes de reciclar')
+    parser.add_argument('--latency', type=float, default=0.05, help='Latência simulada do servidor (s)')
+    args = parser.parse_args()
+
+    try:
+        import selenium  # noqa: F401
+    except ImportError:
+        sys.exit('selenium não instalado: pip install selenium webdriver-manager')
+
+    selenium_api = load_api_module('fbref-extract-selenium')
+    from _browser_pool import BrowserPool
+    expected = expected_overall_rows()
+
+    with FixtureServer(latency=args.latency) as server:
+        urls = [server.url(f'/en/comps/{i}/Stats') for i in range(args.requests)]
+
+        def scrape_cold(url):
+            scraper = selenium_api.FBrefSeleniumScraper(headless=True)
+            try:
+                return scraper.scrape_any_page(url)
+            finally:
+                scraper.close()
+
+        def scrape_warm(url):
+            with pool.driver() as driver:
+                return selenium_api.FBrefSeleniumScraper(driver=driver).scrape_any_page(url)
+
+        cold_results, cold = timed_requests(urls, scrape_cold)
+
+        pool = BrowserPool(lambda: selenium_api.FBrefSeleniumScraper.create_driver(headless=True),
+                           size=args.pool_size, max_pages=args.max_pages)
+        try:
+            start = time.perf_counter()
+            pool.warm()
+            warm_up = time.perf_counter() - start
+            warm_results, warm = timed_requests(urls, scrape_warm)
+            stats = pool.stats()
+        finally:
+            pool.close()
+
+    for results in (cold_results, warm_results):
+        assert all(r.get('tables', {}).get('geral') == expected for r in results), 'saída divergente da fixture'
+
+    print(f'Requisições: {args.requests} | pool: {args.pool_size} | reciclagem: {args.max_pages} páginas')
+    for label, values in (('frio (Chrome por requisição)', cold), ('pool aquecido', warm)):
+        print(f'  {label:30s} p50 {percentile(values, 50) * 1000:8.1f} ms | '
+              f'p95 {percentile(values, 95) * 1000:8.1f} ms')
+    print(f'  aquecimento do pool: {warm_up * 1000:.1f} ms (uma vez por processo)')
+    print(f'  pool: {stats}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: requests.Session novo por invocação vs pool de conexões do processo
+(api/_fbref_http.py).
+
+Cada "invocação" cria um FBrefScraper e faz um GET, como uma requisição à
+função serverless com o container quente. O servidor local simula o custo do
+handshake TCP/TLS (--handshake-ms) atrasando a primeira resposta de cada
+conexão nova, já que a fixture é servida em HTTP puro.
+
+Uso:
+    python scripts/benchmarks/bench_connection_reuse.py --invocations 30 --handshake-ms 150
+"""
+import argparse
+import contextlib
+import io
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from _fbref_fixtures import build_fbref_page, load_api_module, percentile
+
+
+def make_server(page: bytes, handshake: float):
+    counters = {'connections': 0}
+    lock = threading.Lock()
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            with lock:
+                counters['connections'] += 1
+            self._handshake_pending = True
+
+        def do_GET(self):
+            if self._handshake_pending:
+                self._handshake_pending = False
+                time.sleep(handshake)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counters
+
+
+def run(extract, url: str, invocations: int, pooled: bool):
+    timings = []
+    for _ in range(invocations):
+        start = time.perf_counter()
+        scraper = extract.FBrefScraper()
+        if not pooled:
+            # Comportamento anterior: sessão (e conexões) descartadas a cada invocação
+            headers = dict(scraper.session.headers)
+            scraper.session = requests.Session()
+            scraper.session.headers.update(headers)
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = scraper._http_get(url)
+        assert response.status_code == 200
+        timings.append(time.perf_counter() - start)
+        if not pooled:
+            scraper.session.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--invocations', type=int, default=30, help='Invocações por modo')
+    parser.add_argument('--handshake-ms', type=float, default=150.0, help='Custo simulado de uma conexão nova (ms)')
+    args = parser.parse_args()
+
+    os.environ['FBREF_CACHE_DISABLED'] = '1'
+    os.environ['FBREF_RATE_PER_MINUTE'] = '0'
+    os.environ['FBREF_RATE_LIMIT_DB'] = ''
+
+    extract = load_api_module('fbref-extract')
+    page = build_fbref_page().encode('utf-8')
+    server, counters = make_server(page, args.handshake_ms / 1000)
+    url = f'http://127.0.0.1:{server.server_port}/en/comps/24/Serie-A-Stats'
+
+    print(f'Página: {len(page) / 1024:.0f} KB | {args.invocations} invocações | handshake simulado {args.handshake_ms:g}ms')
+    print(f'  {"modo":20s} {"p50":>9s} {"p95":>9s} {"conexões":>9s}')
+    for label, pooled in (('sessão nova', False), ('pool do processo', True)):
+        before = counters['connections']
+        timings = run(extract, url, args.invocations, pooled)
+        print(f'  {label:20s} {percentile(timings, 50) * 1000:7.1f}ms {percentile(timings, 95) * 1000:7.1f}ms '
+              f'{counters["connections"] - before:9d}')
+
+    print(f'  connection_stats(): {extract.connection_stats()}')
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: cabeçalhos das tabelas em api/fbref-extract.py.
+
+Mede, nas tabelas de uma página de fixture:
+
+- normalização dos nomes: mapeamento reconstruído a cada chamada (como antes)
+  contra normalize_header_name memoizado
+- resolução do thead: matriz colspan/rowspan + combinação das linhas para
+  cada tabela contra o layout servido pelo HeaderLayoutCache (assinatura +
+  consulta)
+
+Verifica que cabeçalhos e linhas de extract_table_data são os mesmos com o
+cache vazio e aquecido.
+
+Uso:
+    python scripts/benchmarks/bench_header_layout.py --squad-tables 10 --iterations 20
+"""
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from _fbref_fixtures import build_fbref_page, load_api_module, percentile
+
+
+def measure(func, iterations, before=None):
+    timings = []
+    for _ in range(iterations):
+        if before:
+            before()
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--squad-tables', type=int, default=10, help='Tipos de tabela de squad (cada um gera for/against)')
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    module = load_api_module('fbref-extract')
+    headers_module = load_api_module('_table_headers')
+    cache = headers_module.get_default_header_cache()
+    normalize = headers_module.normalize_header_name
+    scraper = module.FBrefScraper()
+
+    soup = BeautifulSoup(build_fbref_page(squad_tables=args.squad_tables, commented_squad_tables=False), 'lxml')
+    tables = [table for table in soup.find_all('table') if table.find('thead')]
+    theads = [headers_module.thead_cells(table.find('thead')) for table in tables]
+    raw_names = [text for rows in theads for row in rows for text, _, _ in row] * 10
+
+    def legacy_normalize(name):
+        # Antes: o dict do mapeamento era montado a cada chamada, sem memoização
+        dict(headers_module.HEADER_FIELD_MAPPING)
+        return normalize.__wrapped__(name)
+
+    legacy_names, legacy_norm_times = measure(lambda: [legacy_normalize(name) for name in raw_names], args.iterations)
+    memo_names, memo_norm_times = measure(lambda: [normalize(name) for name in raw_names], args.iterations)
+    assert legacy_names == memo_names, 'Normalização divergente'
+
+    def build(rows):
+        return scraper._combine_header_matrix(headers_module.header_matrix(rows))
+
+    built_headers, build_times = measure(lambda: [build(rows) for rows in theads], args.iterations)
+    cached_headers, cached_times = measure(
+        lambda: [cache.resolve(rows, lambda rows=rows: build(rows)) for rows in theads], args.iterations)
+    assert built_headers == cached_headers, 'Layout do cache divergente'
+
+    def extract_all():
+        return [scraper.extract_table_data(None, table=table) for table in tables]
+
+    cache.clear()
+    cold_rows = extract_all()
+    assert cold_rows == extract_all(), 'Linhas divergentes com o cache aquecido'
+
+    print(f'{len(tables)} tabelas com thead, {len(raw_names)} nomes de coluna | {args.iterations} iterações (p50)')
+    print(f'  {"etapa":36s} {"sem cache":>10s} {"com cache":>10s}')
+    for label, before, after in (
+        ('normalizar nomes', legacy_norm_times, memo_norm_times),
+        ('resolver thead (matriz + combinação)', build_times, cached_times),
+    ):
+        print(f'  {label:36s} {percentile(before, 50) * 1000:8.2f}ms {percentile(after, 50) * 1000:8.2f}ms')
+    print(f'  cache de layouts: {cache.stats()}')
+
+
+if __name__ == '__main__':
+    main()
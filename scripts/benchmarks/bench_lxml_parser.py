@@ -0,0 +1,97 @@
+"""
+Benchmark: backends de parse (api/_html_backend.py): BeautifulSoup vs lxml.html
+(e selectolax, se instalado).
+
+Mede, na página de fixture do FBref, o tempo de parse + localização + extração
+da tabela "geral" e o pico de memória (heap Python via tracemalloc e RSS do
+processo), verificando que as linhas extraídas são idênticas.
+
+Cada parser roda num subprocesso próprio para que o pico de RSS de um não
+contamine o outro.
+
+Uso:
+    python scripts/benchmarks/bench_lxml_parser.py --iterations 20
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from _fbref_fixtures import build_fbref_page, expected_overall_rows, load_api_module
+
+
+def run_worker(parser_name: str, iterations: int, squad_tables: int):
+    os.environ['FBREF_CACHE_DISABLED'] = '1'
+    extract = load_api_module('fbref-extract')
+    content = build_fbref_page(squad_tables=squad_tables, commented_squad_tables=False).encode('utf-8')
+    scraper = extract.FBrefScraper(parser=parser_name)
+
+    def parse_and_extract():
+        soup = scraper._parse_html(content)
+        table = scraper.find_table_by_type(soup, 'geral')
+        return scraper.extract_table_data(soup, table_name='geral', table=table)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = parse_and_extract()
+        tracemalloc.start()
+        parse_and_extract()
+        _, heap_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            parse_and_extract()
+            timings.append(time.perf_counter() - start)
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(json.dumps({
+        'parser': parser_name,
+        'page_kb': len(content) // 1024,
+        'mean_ms': sum(timings) / len(timings) * 1000,
+        'min_ms': min(timings) * 1000,
+        'heap_peak_mb': heap_peak / 1024 / 1024,
+        'rss_growth_mb': (rss_after - rss_before) / 1024,
+        'identical': rows == expected_overall_rows(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--squad-tables', type=int, default=11,
+                        help='Blocos de tabelas de squad (for/against) na página, fora de comentários')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.iterations, args.squad_tables)
+        return
+
+    results = []
+    for parser_name in load_api_module('_html_backend').available_backends():
+        output = subprocess.run(
+            [sys.executable, __file__, '--worker', parser_name,
+             '--iterations', str(args.iterations), '--squad-tables', str(args.squad_tables)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"Página de fixture: {results[0]['page_kb']} KB | {args.iterations} iterações")
+    print(f"{'parser':<11}{'média (ms)':>12}{'mín (ms)':>10}{'heap pico (MB)':>16}{'RSS +(MB)':>11}  idêntico")
+    for r in results:
+        print(f"{r['parser']:<11}{r['mean_ms']:>12.1f}{r['min_ms']:>10.1f}{r['heap_peak_mb']:>16.1f}"
+              f"{r['rss_growth_mb']:>11.1f}  {r['identical']}")
+    for r in results[1:]:
+        print(f"speedup {r['parser']}: {results[0]['mean_ms'] / r['mean_ms']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: extração das tabelas em série vs em processos no scraper standalone
+(Cur Sor/.../scraper.py, scrape_any_page(extract_all_tables=True)).
+
+Sobe um servidor local servindo uma página de estatísticas de squad do FBref
+com muitas tabelas (no DOM e em comentários HTML) e extrai todas elas com
+table_workers=0 e com pools de processos de tamanhos diferentes. O pool é
+aquecido antes das medições (o custo de criá-lo aparece à parte). Verifica
+que as tabelas extraídas são idênticas.
+
+O ganho depende dos núcleos disponíveis: table_workers é limitado a
+os.cpu_count(), então com um único núcleo as duas versões rodam em série.
+
+Uso:
+    python scripts/benchmarks/bench_parallel_tables.py --squad-tables 30 --workers 2 4 --iterations 5
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from _fbref_fixtures import FixtureServer, build_fbref_page, load_standalone_scraper, percentile
+
+
+def measure(scraper, url, iterations):
+    timings = []
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = scraper.scrape_any_page(url)
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--squad-tables', type=int, default=30, help='Tipos de tabela de squad (cada um gera for/against)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4], help='Tamanhos de pool a medir')
+    parser.add_argument('--iterations', type=int, default=5)
+    args = parser.parse_args()
+
+    # Mede a extração, não o cache de respostas em disco nem o limite de taxa
+    os.environ['FBREF_CACHE_DISABLED'] = '1'
+    os.environ['FBREF_RATE_PER_MINUTE'] = '0'
+    os.environ['FBREF_RATE_LIMIT_DB'] = ''
+
+    standalone = load_standalone_scraper()
+    page = build_fbref_page(squad_tables=args.squad_tables)
+
+    rows = []
+    with FixtureServer(default_page=page) as server:
+        url = server.url('/en/comps/24/stats/Serie-A-Stats')
+        serial = standalone.FBrefScraper()
+        expected, serial_times = measure(serial, url, args.iterations)
+        rows.append(('série', None, serial_times))
+
+        for workers in args.workers:
+            scraper = standalone.FBrefScraper(table_workers=workers)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                scraper.scrape_any_page(url)
+            cold = time.perf_counter() - start
+            result, timings = measure(scraper, url, args.iterations)
+            scraper.close()
+            assert result == expected, f'tabelas divergentes com {workers} processos'
+            rows.append((f'{workers} processos', cold, timings))
+
+    print(f'Página de fixture: {len(page.encode("utf-8")) // 1024} KB, {len(expected["tables"])} tabelas | '
+          f'{os.cpu_count()} CPUs | {args.iterations} iterações')
+    print(f'  {"modo":<14}{"p50 (ms)":>10}{"1ª chamada (ms)":>17}{"speedup":>9}')
+    serial_p50 = percentile(serial_times, 50)
+    for label, cold, timings in rows:
+        p50 = percentile(timings, 50)
+        cold_text = f'{cold * 1000:.1f}' if cold is not None else '-'
+        print(f'  {label:<14}{p50 * 1000:>10.1f}{cold_text:>17}{serial_p50 / p50:>8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: tamanho da resposta e tempo ponta a ponta do api/fbref-html-proxy.py
+sem compressão vs gzip/brotli em vários níveis.
+
+O proxy roda num servidor local e busca a página de fixture do FBref em outro
+servidor local. Para cada configuração mede os bytes trafegados (corpo
+comprimido), o tempo até o JSON estar decodificado no cliente e uma estimativa
+do tempo num link móvel (--bandwidth-mbps).
+
+Uso:
+    python scripts/benchmarks/bench_proxy_compression.py --requests 5 --bandwidth-mbps 10
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+import zlib
+from http.server import ThreadingHTTPServer
+
+import requests
+
+from _fbref_fixtures import FixtureServer, build_fbref_page, load_api_module, percentile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CONFIGS = [
+    ('identity', None),
+    ('gzip', 1),
+    ('gzip', 6),
+    ('gzip', 9),
+    ('br', 1),
+    ('br', 5),
+    ('br', 9),
+]
+
+
+def decode(body: bytes, encoding: str) -> bytes:
+    if encoding == 'gzip':
+        return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    if encoding == 'br':
+        return brotli.decompress(body)
+    return body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5, help='Requisições por configuração')
+    parser.add_argument('--bandwidth-mbps', type=float, default=10.0, help='Banda do cliente para a estimativa (Mbit/s)')
+    args = parser.parse_args()
+
+    os.environ['FBREF_CACHE_DISABLED'] = '1'
+    os.environ['FBREF_RATE_PER_MINUTE'] = '0'
+    os.environ['FBREF_RATE_LIMIT_DB'] = ''
+
+    proxy = load_api_module('fbref-html-proxy')
+    page = build_fbref_page()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), proxy.handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    proxy_url = f'http://127.0.0.1:{server.server_port}/'
+
+    rows = []
+    with FixtureServer(default_page=page, latency=0.0) as fixtures:
+        # O proxy só aceita URLs do fbref.com
+        target = fixtures.url('/en/comps/24/Serie-A-Stats?source=fbref.com')
+        for encoding, level in CONFIGS:
+            if encoding == 'br' and brotli is None:
+                continue
+            if encoding == 'gzip':
+                os.environ['FBREF_PROXY_GZIP_LEVEL'] = str(level)
+            elif encoding == 'br':
+                os.environ['FBREF_PROXY_BROTLI_QUALITY'] = str(level)
+
+            sizes, timings = [], []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    response = requests.post(proxy_url, json={'url': target}, stream=True,
+                                             headers={'Accept-Encoding': encoding})
+                    body = response.raw.read(decode_content=False)
+                assert response.headers.get('Content-Encoding', 'identity') == encoding, response.headers
+                html = json.loads(decode(body, encoding))['html']
+                timings.append(time.perf_counter() - start)
+                sizes.append(len(body))
+                assert html == page, 'HTML divergente da fixture'
+
+            size = sizes[0]
+            transfer = size * 8 / (args.bandwidth_mbps * 1_000_000)
+            rows.append((f'{encoding}' + (f' ({level})' if level is not None else ''), size,
+                         percentile(timings, 50), transfer))
+
+    server.shutdown()
+
+    raw_size = rows[0][1]
+    print(f'Página: {len(page.encode("utf-8")) / 1024:.0f} KB | {args.requests} requisições por configuração | '
+          f'estimativa com {args.bandwidth_mbps:g} Mbit/s')
+    print(f'  {"codificação":14s} {"bytes":>10s} {"razão":>7s} {"local p50":>10s} {"estimado":>10s}')
+    for label, size, local, transfer in rows:
+        print(f'  {label:14s} {size:10d} {raw_size / size:6.1f}x {local * 1000:8.1f}ms {(local + transfer) * 1000:8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: download completo + parse vs parse incremental (parser='stream').
+
+Sobe um servidor local que envia a página de fixture do FBref em blocos, com
+um atraso entre eles (simula a banda da conexão), e extrai a tabela "geral"
+com os parsers 'bs4', 'lxml' e 'stream'. Mede o tempo ponta a ponta e os bytes
+enviados pelo servidor por página, verificando que as linhas extraídas são
+idênticas.
+
+No modo 'stream' a leitura para quando a tabela geral fecha; o servidor ainda
+escreve o que cabe nos buffers do socket antes de perceber a conexão fechada,
+então os bytes medidos ficam um pouco acima do que o cliente leu.
+
+Uso:
+    python scripts/benchmarks/bench_stream_parse.py --iterations 10 --chunk-delay 0.005
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from _fbref_fixtures import FixtureServer, build_fbref_page, expected_overall_rows, load_api_module, percentile
+
+PARSERS = ('bs4', 'lxml', 'stream')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--chunk-size', type=int, default=16 * 1024, help='Bytes por bloco enviado pelo servidor')
+    parser.add_argument('--chunk-delay', type=float, default=0.005, help='Atraso entre blocos (s)')
+    parser.add_argument('--filler-kb', type=int, default=300,
+                        help='Scripts de preenchimento da página (metade antes, metade depois das tabelas)')
+    args = parser.parse_args()
+
+    # Mede a rede/parse, não o cache de respostas em disco nem o limite de taxa
+    os.environ['FBREF_CACHE_DISABLED'] = '1'
+    os.environ['FBREF_RATE_PER_MINUTE'] = '0'
+    os.environ['FBREF_RATE_LIMIT_DB'] = ''
+
+    extract = load_api_module('fbref-extract')
+    expected = expected_overall_rows()
+    page = build_fbref_page(filler_kb=args.filler_kb)
+
+    results = {}
+    with FixtureServer(default_page=page, chunk_size=args.chunk_size, chunk_delay=args.chunk_delay) as server:
+        url = server.url('/en/comps/24/Serie-A-Stats')
+        for parser_name in PARSERS:
+            scraper = extract.FBrefScraper(parser=parser_name)
+            timings = []
+            sent_before = server.bytes_sent
+            for _ in range(args.iterations):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = scraper.scrape_any_page(url)
+                timings.append(time.perf_counter() - start)
+                assert result.get('tables', {}).get('geral') == expected, f'saída divergente da fixture ({parser_name})'
+            # O servidor pode terminar de escrever o último bloco depois da resposta
+            time.sleep(args.chunk_delay * 2)
+            results[parser_name] = (timings, (server.bytes_sent - sent_before) / args.iterations)
+
+    print(f'Página de fixture: {len(page.encode("utf-8")) // 1024} KB | blocos de {args.chunk_size // 1024} KB '
+          f'a cada {args.chunk_delay * 1000:.0f} ms | {args.iterations} iterações')
+    print(f'  {"parser":<8}{"p50 (ms)":>10}{"p95 (ms)":>10}{"KB enviados":>13}')
+    for parser_name in PARSERS:
+        timings, sent = results[parser_name]
+        print(f'  {parser_name:<8}{percentile(timings, 50) * 1000:>10.1f}{percentile(timings, 95) * 1000:>10.1f}'
+              f'{sent / 1024:>13.0f}')
+    bs4_p50 = percentile(results['bs4'][0], 50)
+    stream_p50 = percentile(results['stream'][0], 50)
+    print(f'  speedup stream vs bs4: {bs4_p50 / stream_p50:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: localização das tabelas no scraper standalone (Cur Sor/.../scraper.py).
+
+Compara, numa página com muitas tabelas no DOM, as quatro buscas que
+scrape_any_page fazia (classe stats_table, id com 'stats', classe genérica,
+todas as tabelas) e os soup.find por id de cada entrada do TABLE_MAPPING com
+o TableIndex, montado numa única varredura. Verifica que a ordem das tabelas
+encontradas é a mesma.
+
+Uso:
+    python scripts/benchmarks/bench_table_index.py --squad-tables 40 --iterations 10
+"""
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from _fbref_fixtures import build_fbref_page, load_standalone_scraper, percentile
+
+
+def legacy_locate(soup):
+    """Busca de tabelas de scrape_any_page antes do TableIndex"""
+    all_tables = []
+    seen_tables = set()
+    searches = (
+        lambda: soup.find_all('table', {'class': 'stats_table'}),
+        lambda: soup.find_all('table', {'id': lambda x: x and 'stats' in str(x).lower()}),
+        lambda: soup.find_all('table', class_=lambda x: x and ('table' in str(x).lower() or 'stats' in str(x).lower())),
+        lambda: soup.find_all('table'),
+    )
+    for search in searches:
+        for table in search():
+            if id(table) not in seen_tables:
+                all_tables.append(table)
+                seen_tables.add(id(table))
+    return all_tables
+
+
+def legacy_mapping_lookups(soup, table_mapping):
+    return [soup.find('table', {'id': table_id}) for ids in table_mapping.values() for table_id in ids]
+
+
+def index_mapping_lookups(index, table_mapping):
+    return [index.by_id.get(table_id) for ids in table_mapping.values() for table_id in ids]
+
+
+def measure(func, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--squad-tables', type=int, default=40, help='Tipos de tabela de squad (cada um gera for/against)')
+    parser.add_argument('--iterations', type=int, default=10)
+    args = parser.parse_args()
+
+    scraper_module = load_standalone_scraper()
+    mapping = scraper_module.FBrefScraper.TABLE_MAPPING
+    page = build_fbref_page(squad_tables=args.squad_tables, commented_squad_tables=False)
+    soup = BeautifulSoup(page, 'lxml')
+
+    legacy_tables, legacy_times = measure(lambda: legacy_locate(soup), args.iterations)
+    index, index_times = measure(lambda: scraper_module.TableIndex(soup), args.iterations)
+    assert [id(t) for t in legacy_tables] == [id(t) for t in index.ordered], 'Ordem das tabelas divergente'
+
+    legacy_found, legacy_lookup_times = measure(lambda: legacy_mapping_lookups(soup, mapping), args.iterations)
+    index_found, index_lookup_times = measure(lambda: index_mapping_lookups(index, mapping), args.iterations)
+    assert [id(t) for t in legacy_found] == [id(t) for t in index_found], 'Busca por id divergente'
+
+    lookups = sum(len(ids) for ids in mapping.values())
+    print(f'Página: {len(page) / 1024:.0f} KB, {len(index.ordered)} tabelas no DOM | {args.iterations} iterações (p50)')
+    print(f'  {"etapa":38s} {"antes":>10s} {"TableIndex":>11s}')
+    print(f'  {"localizar todas as tabelas":38s} {percentile(legacy_times, 50) * 1000:8.2f}ms '
+          f'{percentile(index_times, 50) * 1000:9.2f}ms')
+    print(f'  {f"{lookups} buscas por id do TABLE_MAPPING":38s} {percentile(legacy_lookup_times, 50) * 1000:8.2f}ms '
+          f'{percentile(index_lookup_times, 50) * 1000:9.3f}ms (índice já montado)')
+
+
+if __name__ == '__main__':
+    main()
@@ -199,11 +199,24 @@ function findTable(doc: Document, type: string): HTMLTableElement | null {
 
 const FBREF_HTML_PROXY_URL = '/api/fbref-html-proxy';
 
+// Ids das tabelas usadas em parseFbrefHtml/findTable: o proxy devolve só elas (modo "fragments"),
+// inclusive as que o FBref envia dentro de comentários HTML
+const PROXY_TABLE_PATTERNS = [
+  'results.*_overall',
+  'stats.*_overall',
+  'home_away',
+  'standard_for',
+  'keeper',
+  'shooting',
+  'playing_time',
+  'misc',
+];
+
 async function fetchViaProxy(url: string): Promise<string> {
   const response = await fetch(FBREF_HTML_PROXY_URL, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ url }),
+    body: JSON.stringify({ url, mode: 'fragments', tablePatterns: PROXY_TABLE_PATTERNS }),
     signal: AbortSignal.timeout(45000),
   });
 
@@ -216,7 +229,9 @@ async function fetchViaProxy(url: string): Promise<string> {
   const json = await response.json();
   const html = json.html;
 
-  if (typeof html !== 'string' || html.length < 10000) {
+  // No modo fragments o documento tem só as tabelas, então o tamanho mínimo só vale para a página inteira
+  const isFragments = json.mode === 'fragments' && Array.isArray(json.tables) && json.tables.length > 0;
+  if (typeof html !== 'string' || html.length < (isFragments ? 200 : 10000)) {
     throw new Error('Resposta do proxy não contém HTML válido do FBref');
   }
 
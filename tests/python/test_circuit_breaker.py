@@ -0,0 +1,227 @@
+"""
+Circuit breaker por host (api/_circuit_breaker.py): transições
+closed → open → half_open, tempo aberto dobrando até o teto, probe único, a
+guarda das requisições em background (guarded_request) e o breaker
+injetado no AsyncFBrefScraper.
+
+O relógio do módulo é trocado por um relógio manual.
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import load_api_module  # noqa: E402
+
+breakers = load_api_module('_circuit_breaker')
+ratelimit = load_api_module('_fbref_ratelimit')
+
+HOST = 'fbref.com'
+
+
+class ManualClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = ManualClock()
+    monkeypatch.setattr(breakers, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def breaker(request, tmp_path, clock):
+    state_path = '' if request.param == 'memory' else str(tmp_path / 'breaker.sqlite3')
+    return breakers.CircuitBreaker(failure_rate=0.5, min_requests=4, window=60, open_seconds=60,
+                                   state_path=state_path, enabled=True)
+
+
+def trip(breaker):
+    for _ in range(breaker.min_requests):
+        breaker.record_failure(HOST)
+
+
+def state(breaker):
+    return breaker.snapshot(HOST)['state']
+
+
+@pytest.mark.parametrize('status_code, failure', [
+    (200, False), (304, False), (404, False), (403, True), (429, True), (500, True), (503, True), (None, False),
+])
+def test_failure_statuses(status_code, failure):
+    assert breakers.is_failure_status(status_code) is failure
+
+
+def test_stays_closed_below_min_requests(breaker):
+    for _ in range(breaker.min_requests - 1):
+        breaker.record_failure(HOST)
+    assert state(breaker) == breakers.CLOSED
+    assert breaker.allow(HOST)
+
+
+def test_stays_closed_below_failure_rate(breaker):
+    for success in (True, True, True, False, True, False):
+        breaker.record(HOST, success)
+    assert state(breaker) == breakers.CLOSED
+
+
+def test_window_resets_the_counts(breaker, clock):
+    for _ in range(breaker.min_requests - 1):
+        breaker.record_failure(HOST)
+    clock.advance(breaker.window)
+    breaker.record_failure(HOST)
+    assert breaker.snapshot(HOST)['requests'] == 1
+    assert state(breaker) == breakers.CLOSED
+
+
+def test_opens_then_allows_a_single_probe(breaker, clock):
+    trip(breaker)
+    snapshot = breaker.snapshot(HOST)
+    assert snapshot['state'] == breakers.OPEN
+    assert snapshot['retryAfter'] == 60
+    assert not breaker.allow(HOST)
+
+    clock.advance(59)
+    assert not breaker.allow(HOST)
+    clock.advance(1)
+    assert breaker.allow(HOST)
+    assert state(breaker) == breakers.HALF_OPEN
+    # Só um probe por vez
+    assert not breaker.allow(HOST)
+
+
+def test_successful_probe_closes_the_circuit(breaker, clock):
+    trip(breaker)
+    clock.advance(60)
+    assert breaker.allow(HOST)
+    breaker.record_success(HOST)
+    snapshot = breaker.snapshot(HOST)
+    assert snapshot == {'state': breakers.CLOSED, 'requests': 0, 'failures': 0, 'retryAfter': 0.0}
+    assert breaker.allow(HOST)
+
+
+def test_failed_probes_double_the_open_time_up_to_the_cap(breaker, clock):
+    trip(breaker)
+    open_times = []
+    for _ in range(6):
+        open_times.append(breaker.snapshot(HOST)['retryAfter'])
+        clock.advance(open_times[-1])
+        assert breaker.allow(HOST)
+        breaker.record_failure(HOST)
+        assert state(breaker) == breakers.OPEN
+    assert open_times == [60, 120, 240, 480, 900, 900]
+    assert breakers.MAX_OPEN_SECONDS == 900
+
+
+def test_stale_probe_releases_another_one(breaker, clock):
+    trip(breaker)
+    clock.advance(60)
+    assert breaker.allow(HOST)
+    assert not breaker.allow(HOST)
+    clock.advance(breakers.PROBE_TIMEOUT)
+    assert breaker.allow(HOST)
+
+
+def test_late_results_do_not_change_an_open_circuit(breaker):
+    trip(breaker)
+    retry_after = breaker.snapshot(HOST)['retryAfter']
+    breaker.record_success(HOST)
+    assert breaker.snapshot(HOST)['retryAfter'] == retry_after
+    assert state(breaker) == breakers.OPEN
+
+
+def test_hosts_are_independent(breaker):
+    trip(breaker)
+    assert not breaker.allow(HOST)
+    assert breaker.allow('example.com')
+
+
+def test_disabled_breaker_always_allows(clock):
+    breaker = breakers.CircuitBreaker(min_requests=1, state_path='', enabled=False)
+    breaker.record_failure(HOST)
+    assert breaker.allow(HOST)
+    assert state(breaker) == breakers.CLOSED
+
+
+class Response:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+def guarded(breaker, limiter=None):
+    sent = []
+
+    def send(status_code=200):
+        sent.append(status_code)
+        return Response(status_code)
+
+    return breakers.guarded_request(breaker, limiter, HOST), send, sent
+
+
+def test_guard_skips_while_not_closed(breaker, clock):
+    guard, send, sent = guarded(breaker)
+    trip(breaker)
+    assert guard(send) is None
+    clock.advance(60)
+    # Nem o probe do half_open sai pela guarda
+    assert guard(send) is None
+    assert sent == []
+    assert breaker.allow(HOST)
+
+
+def test_guard_skips_without_a_token(breaker):
+    limiter = ratelimit.TokenBucketLimiter(rate_per_minute=1, burst=1, state_path='')
+    guard, send, sent = guarded(breaker, limiter)
+    assert guard(send).status_code == 200
+    assert guard(send) is None
+    assert sent == [200]
+
+
+def test_guard_records_outcomes(breaker):
+    guard, _, _ = guarded(breaker)
+    for _ in range(breaker.min_requests):
+        guard(lambda: Response(403))
+    assert state(breaker) == breakers.OPEN
+
+
+@pytest.mark.skipif(not breakers.FAILURE_EXCEPTIONS, reason='requests não instalado')
+def test_guard_records_timeouts_and_reraises(breaker):
+    guard, _, _ = guarded(breaker)
+
+    def timeout():
+        raise breakers.FAILURE_EXCEPTIONS[0]('timeout')
+
+    for _ in range(breaker.min_requests):
+        with pytest.raises(breakers.FAILURE_EXCEPTIONS[0]):
+            guard(timeout)
+    assert state(breaker) == breakers.OPEN
+
+
+def test_async_scraper_uses_the_given_breaker(breaker, tmp_path):
+    extract = load_api_module('fbref-extract')
+    cache_module = load_api_module('_fbref_cache')
+    scraper = extract.AsyncFBrefScraper(cache=cache_module.ResponseCache(str(tmp_path / 'cache')),
+                                        limiter=ratelimit.TokenBucketLimiter(rate_per_minute=0, state_path=''),
+                                        breaker=breaker)
+    assert scraper.breaker is breaker
+    trip(breaker)
+    # Circuito aberto no breaker isolado: falha rápido, sem tocar a rede
+    soup, error_info = asyncio.run(scraper.get_page(f'https://{HOST}/en/comps/24/Serie-A-Stats', retries=1))
+    assert soup is None
+    assert error_info['type'] == 'circuit_open'
+    assert error_info['circuit']['state'] == breakers.OPEN
@@ -0,0 +1,202 @@
+"""
+Cache HTTP em disco (api/_fbref_cache.py): hit dentro do TTL, revalidação
+condicional (304), stale-while-revalidate com a busca em background,
+fallback, invalidate e limpeza dos blobs por conteúdo.
+
+A sessão HTTP é um stub e o relógio do módulo é trocado por um relógio manual.
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import load_api_module  # noqa: E402
+
+fbref_cache = load_api_module('_fbref_cache')
+
+URL = 'https://fbref.com/en/comps/24/Serie-A-Stats'
+TTL = 60
+SWR = 600
+TIMEOUT = 5.0
+
+
+class ManualClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class StubResponse:
+    def __init__(self, status_code: int = 200, content: bytes = b'', headers=None, url: str = URL):
+        self.status_code = status_code
+        self.reason = 'OK' if status_code == 200 else 'Not Modified'
+        self.content = content
+        self.headers = dict(headers or {})
+        self.url = url
+        self.encoding = 'utf-8'
+
+
+class StubSession:
+    """session.get que devolve as respostas enfileiradas e registra os headers enviados"""
+
+    def __init__(self, *responses: StubResponse):
+        self.responses = list(responses)
+        self.requests = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append(dict(headers or {}))
+        assert self.release.wait(TIMEOUT), 'requisição presa no stub'
+        return self.responses.pop(0)
+
+
+def page(body: bytes = b'<html>v1</html>', etag: str = '"v1"') -> StubResponse:
+    return StubResponse(200, body, {'ETag': etag, 'Last-Modified': 'Sat, 11 Oct 2026 10:00:00 GMT',
+                                    'Content-Type': 'text/html'})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = ManualClock()
+    monkeypatch.setattr(fbref_cache, 'time', clock)
+    # Sem limpeza aleatória durante os testes
+    monkeypatch.setattr(fbref_cache, 'PRUNE_PROBABILITY', 0.0)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return fbref_cache.ResponseCache(str(tmp_path / 'cache'), ttl=TTL, stale_while_revalidate=SWR)
+
+
+def wait_for_revalidation(cache):
+    deadline = time.monotonic() + TIMEOUT
+    while cache._revalidating:
+        assert time.monotonic() < deadline, 'revalidação em background não terminou'
+        time.sleep(0.005)
+
+
+def test_normalize_url():
+    assert fbref_cache.normalize_url('HTTPS://www.FBref.com:443/en/comps/24/?b=2&a=1#top') == \
+        'https://fbref.com/en/comps/24/?a=1&b=2'
+
+
+def test_miss_then_fresh_hit(cache, clock):
+    session = StubSession(page())
+    first = cache.fetch(session, URL)
+    assert first.cache_status == 'miss' and not first.from_cache
+
+    clock.advance(TTL - 1)
+    hit = cache.fetch(session, 'https://www.fbref.com/en/comps/24/Serie-A-Stats#stats')
+    assert hit.cache_status == 'hit' and hit.from_cache
+    assert hit.content == b'<html>v1</html>'
+    assert hit.headers['etag'] == '"v1"'
+    assert len(session.requests) == 1
+    assert cache.has_usable_entry(URL)
+
+
+def test_non_200_responses_are_not_stored(cache):
+    session = StubSession(StubResponse(403, b'Forbidden'), page())
+    assert cache.fetch(session, URL).status_code == 403
+    assert cache.get_entry(URL) is None
+    assert cache.fetch(session, URL).cache_status == 'miss'
+
+
+def test_304_refreshes_validated_at(cache, clock):
+    session = StubSession(page(), StubResponse(304, headers={'ETag': '"v1"', 'Date': 'Sun, 12 Oct 2026 10:00:00 GMT'}))
+    cache.fetch(session, URL)
+    fetched_at = cache.get_entry(URL)['fetched_at']
+
+    # Fora do TTL e da janela SWR: GET condicional síncrono
+    clock.advance(TTL + SWR)
+    revalidated = cache.fetch(session, URL)
+    assert revalidated.cache_status == 'revalidated'
+    assert revalidated.content == b'<html>v1</html>'
+    assert session.requests[1] == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Sat, 11 Oct 2026 10:00:00 GMT'}
+
+    entry = cache.get_entry(URL)
+    assert entry['validated_at'] == clock.now
+    assert entry['fetched_at'] == fetched_at
+    assert entry['headers']['Date'] == 'Sun, 12 Oct 2026 10:00:00 GMT'
+    # Voltou a ser fresh
+    assert cache.fetch(session, URL).cache_status == 'hit'
+
+
+def test_stale_is_served_while_background_refresh_runs(cache, clock):
+    session = StubSession(page(), page(b'<html>v2</html>', etag='"v2"'))
+    cache.fetch(session, URL)
+    clock.advance(TTL + 1)
+
+    session.release.clear()
+    stale = cache.fetch(session, URL)
+    # Devolvido na hora, com a revalidação ainda presa no stub
+    assert stale.cache_status == 'stale'
+    assert stale.content == b'<html>v1</html>'
+    assert len(cache._revalidating) == 1
+    # Uma segunda leitura não dispara outra revalidação
+    assert cache.fetch(session, URL).cache_status == 'stale'
+
+    session.release.set()
+    wait_for_revalidation(cache)
+    assert len(session.requests) == 2
+    assert session.requests[1]['If-None-Match'] == '"v1"'
+    refreshed = cache.fetch(session, URL)
+    assert refreshed.cache_status == 'hit'
+    assert refreshed.content == b'<html>v2</html>'
+
+
+def test_background_refresh_skipped_by_guard(cache, clock):
+    session = StubSession(page())
+    cache.fetch(session, URL)
+    clock.advance(TTL + 1)
+    assert cache.fetch(session, URL, guard=lambda send: None).cache_status == 'stale'
+    wait_for_revalidation(cache)
+    assert len(session.requests) == 1
+
+
+def test_fallback_serves_any_age_and_invalidate_removes_it(cache, clock):
+    session = StubSession(page())
+    assert cache.fallback(URL) is None
+    cache.fetch(session, URL)
+
+    clock.advance(TTL + SWR + 1)
+    assert not cache.has_usable_entry(URL)
+    fallback = cache.fallback(URL)
+    assert fallback.cache_status == 'fallback'
+    assert fallback.content == b'<html>v1</html>'
+
+    cache.invalidate(URL)
+    assert cache.fallback(URL) is None
+    assert cache.get_entry(URL) is None
+    cache.invalidate(URL)  # Sem entrada: não falha
+
+
+def test_blobs_are_shared_and_pruned(cache, clock, tmp_path):
+    other_url = 'https://fbref.com/en/comps/9/Premier-League-Stats'
+    session = StubSession(page(), page(), page(b'<html>pl</html>'))
+    cache.fetch(session, URL)
+    cache.fetch(session, URL + '?x=1')
+    blobs_dir = tmp_path / 'cache' / 'blobs'
+    # Mesmo corpo em duas URLs: um blob só
+    assert len(os.listdir(blobs_dir)) == 1
+
+    clock.advance(TTL + SWR + 1)
+    cache.fetch(session, other_url)
+    cache.prune()
+    assert cache.get_entry(URL) is None
+    assert cache.get_entry(other_url) is not None
+    assert os.listdir(blobs_dir) == [cache.get_entry(other_url)['body_sha256']]
@@ -0,0 +1,101 @@
+"""
+Conformidade dos backends de parse (api/_html_backend.py).
+
+Cada backend disponível ('bs4', 'lxml' e 'selectolax', se instalado) precisa
+devolver as mesmas linhas do BeautifulSoup em extract_table_data e localizar
+as mesmas tabelas em find_table_by_type, sobre páginas montadas a partir das
+fixtures de Jsons/ e Tabela teste/.
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import csv
+import glob
+import html
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import (  # noqa: E402
+    build_fbref_page, expected_overall_rows, load_api_module, load_squad_rows, render_squad_table,
+)
+
+extract = load_api_module('fbref-extract')
+backends = load_api_module('_html_backend')
+
+BACKENDS = backends.available_backends()
+OTHER_BACKENDS = [name for name in BACKENDS if name != 'bs4']
+
+CSV_FIXTURES = sorted(glob.glob(os.path.join(REPO_ROOT, 'Tabela teste', '*.csv')))
+
+
+def render_csv_table(path: str, table_id: str) -> str:
+    """Tabela HTML simples (thead de uma linha) com o conteúdo do CSV exportado"""
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        header, *rows = list(csv.reader(f, delimiter=';'))
+    parts = [f'<table class="stats_table" id="{table_id}"><thead><tr>']
+    parts.extend(f'<th>{html.escape(name)}</th>' for name in header)
+    parts.append('</tr></thead><tbody>')
+    for row in rows:
+        parts.append('<tr>' + ''.join(f'<td>{html.escape(value)}</td>' for value in row) + '</tr>\n')
+    parts.append('</tbody></table>')
+    return ''.join(parts)
+
+
+def fixture_pages():
+    pages = {
+        'Jsons + Tabela teste (página FBref)': build_fbref_page(squad_tables=4, commented_squad_tables=False),
+        'Tabela teste/resultado_Operação 1 (3).json': (
+            '<html><head><title>Squad</title></head><body>'
+            + render_squad_table(load_squad_rows(), 'stats_squads_standard_for') + '</body></html>'
+        ),
+    }
+    for index, path in enumerate(CSV_FIXTURES):
+        pages[f'Tabela teste/{os.path.basename(path)}'] = (
+            '<html><head><title>CSV</title></head><body>'
+            + render_csv_table(path, f'stats_csv_{index}') + '</body></html>'
+        )
+    return pages
+
+
+PAGES = fixture_pages()
+
+
+def extract_all(backend_name: str, page: str):
+    """Título e linhas de cada tabela (por id e pela busca sem id) com o backend"""
+    scraper = extract.FBrefScraper(parser=backend_name)
+    assert scraper.backend.name == backend_name
+    doc = scraper._parse_html(page.encode('utf-8'))
+    tables = {
+        table_id: scraper.extract_table_data(doc, table_id=table_id, table_name=table_id)
+        for table_id, _, _ in scraper.backend.tables(doc)
+    }
+    return scraper.backend.title(doc), tables, scraper.extract_table_data(doc)
+
+
+@pytest.mark.parametrize('page_name', sorted(PAGES))
+@pytest.mark.parametrize('backend_name', OTHER_BACKENDS)
+def test_backend_matches_beautifulsoup(backend_name, page_name):
+    page = PAGES[page_name]
+    expected = extract_all('bs4', page)
+    assert any(expected[1].values()), 'fixture sem linhas'
+    assert extract_all(backend_name, page) == expected
+
+
+@pytest.mark.parametrize('backend_name', BACKENDS)
+def test_overall_table_matches_saved_json(backend_name):
+    scraper = extract.FBrefScraper(parser=backend_name)
+    doc = scraper._parse_html(PAGES['Jsons + Tabela teste (página FBref)'].encode('utf-8'))
+    table = scraper.find_table_by_type(doc, 'geral')
+    assert table is not None
+    rows = list(scraper._without_links(scraper.iter_table_rows(table, table_name='geral')))
+    assert rows == expected_overall_rows()
+
+
+def test_unknown_backend_falls_back_to_beautifulsoup():
+    assert backends.get_backend('html5lib').name == 'bs4'
+    assert extract.FBrefScraper(parser='html5lib').parser == 'bs4'
@@ -0,0 +1,49 @@
+"""
+Modo "fragments" do api/fbref-html-proxy.py: extract_table_fragments devolve
+só as <table> cujo id casa com os padrões pedidos, inclusive as que vêm dentro
+de comentários HTML.
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import os
+import re
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import OVERALL_TABLE_ID, build_fbref_page, load_api_module  # noqa: E402
+
+proxy = load_api_module('fbref-html-proxy')
+
+OVERALL = [re.compile('_overall$', re.IGNORECASE)]
+
+
+def fragments(html, patterns=OVERALL):
+    return proxy.extract_table_fragments(html, patterns)[1]
+
+
+@pytest.mark.parametrize('attributes', [
+    'data-id="x" id="results2025-2026111_overall"',
+    "data-id='x' class=\"stats_table\" id='results2025-2026111_overall'",
+    'data-stat-id=x\n\tID=results2025-2026111_overall',
+])
+def test_id_is_not_taken_from_data_attributes(attributes):
+    html = f'<html><body><table {attributes}><tr><td>1</td></tr></table></body></html>'
+    assert fragments(html) == ['results2025-2026111_overall']
+
+
+def test_table_with_only_data_id_is_skipped():
+    html = '<table data-id="stats_overall"><tr><td>1</td></tr></table>'
+    assert fragments(html, []) == []
+
+
+def test_fbref_page_keeps_overall_and_commented_tables():
+    html = build_fbref_page(squad_tables=2, filler_kb=0)
+    table_ids = fragments(html, [])
+    assert table_ids[0] == OVERALL_TABLE_ID
+    assert 'stats_squads_standard_for' in table_ids
+    assert fragments(html) == [OVERALL_TABLE_ID]
@@ -0,0 +1,266 @@
+"""
+Respostas NDJSON em chunks (api/_ndjson.py) e o modo streaming do handler de
+api/fbref-extract.py: framing do Transfer-Encoding chunked, um objeto JSON
+por linha e o evento "result" (ou "done", no lote) por último.
+
+A saída vai para um BytesIO; a página do FBref é a fixture montada por
+build_fbref_page, sem rede.
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import io
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import build_fbref_page, expected_overall_rows, load_api_module  # noqa: E402
+
+ndjson = load_api_module('_ndjson')
+extract = load_api_module('fbref-extract')
+breakers = load_api_module('_circuit_breaker')
+fbref_cache = load_api_module('_fbref_cache')
+ratelimit = load_api_module('_fbref_ratelimit')
+
+URL = 'https://fbref.com/en/comps/24/Serie-A-Stats'
+PAGE = build_fbref_page().encode('utf-8')
+
+
+def decode_chunked(body: bytes):
+    """Chunks de um corpo Transfer-Encoding: chunked; falha se o framing estiver errado"""
+    chunks = []
+    position = 0
+    while True:
+        line_end = body.index(b'\r\n', position)
+        size = int(body[position:line_end], 16)
+        start = line_end + 2
+        if size == 0:
+            assert body[start:] == b'\r\n', 'dados após o chunk final'
+            return chunks
+        chunk = body[start:start + size]
+        assert len(chunk) == size
+        assert body[start + size:start + size + 2] == b'\r\n', 'chunk sem CRLF no fim'
+        chunks.append(chunk)
+        position = start + size + 2
+
+
+def ndjson_lines(chunks):
+    """Uma linha por objeto JSON; o texto termina em quebra de linha"""
+    text = b''.join(chunks).decode('utf-8')
+    assert text.endswith('\n')
+    return [json.loads(line) for line in text[:-1].split('\n')]
+
+
+class FakeHandler:
+    """O que o NDJSONStream usa de BaseHTTPRequestHandler"""
+
+    def __init__(self):
+        self.wfile = io.BytesIO()
+        self.status = None
+        self.sent_headers = {}
+
+    def send_response(self, status_code):
+        self.status = status_code
+
+    def send_header(self, name, value):
+        self.sent_headers[name] = value
+
+    def end_headers(self):
+        pass
+
+
+@pytest.fixture
+def stream():
+    handler = FakeHandler()
+    stream = ndjson.NDJSONStream(handler)
+    stream.start()
+    return stream
+
+
+def test_start_sends_chunked_headers(stream):
+    handler = stream.handler
+    assert handler.status == 200
+    assert handler.protocol_version == 'HTTP/1.1'
+    assert handler.sent_headers['Transfer-Encoding'] == 'chunked'
+    assert handler.sent_headers['Content-Type'].startswith(ndjson.NDJSON_CONTENT_TYPE)
+
+
+def test_one_event_per_line_and_one_chunk_per_write(stream):
+    stream.write({'type': 'table', 'table': 'geral', 'rows': [{'Squad': 'Inter ✓'}]})
+    stream.write({'type': 'result', 'success': True})
+    stream.close()
+    chunks = decode_chunked(stream.handler.wfile.getvalue())
+    assert len(chunks) == 2
+    assert ndjson_lines(chunks) == [
+        {'type': 'table', 'table': 'geral', 'rows': [{'Squad': 'Inter ✓'}]},
+        {'type': 'result', 'success': True},
+    ]
+
+
+@pytest.mark.parametrize('row_count', [0, 1, 5, 6])
+def test_write_rows_spreads_one_line_over_chunks(stream, row_count):
+    rows = [{'Rk': str(index), 'Squad': f'Time {index}'} for index in range(row_count)]
+    event = {'type': 'table', 'table': 'geral'}
+    assert stream.write_rows(event, iter(rows), chunk_rows=2) == row_count
+    stream.close()
+    chunks = decode_chunked(stream.handler.wfile.getvalue())
+    assert len(chunks) == row_count // 2 + 1
+    assert ndjson_lines(chunks) == [{**event, 'rows': rows}]
+
+
+def test_write_rows_marks_a_failed_iterator_as_truncated(stream):
+    def rows():
+        yield {'Squad': 'Inter'}
+        raise RuntimeError('parse falhou')
+
+    with pytest.raises(RuntimeError):
+        stream.write_rows({'type': 'table'}, rows())
+    stream.close()
+    assert ndjson_lines(decode_chunked(stream.handler.wfile.getvalue())) == [
+        {'type': 'table', 'rows': [{'Squad': 'Inter'}], 'truncated': True},
+    ]
+
+
+def test_close_is_final_and_idempotent(stream):
+    stream.close()
+    stream.close()
+    stream.write({'type': 'result'})
+    assert stream.handler.wfile.getvalue() == b'0\r\n\r\n'
+
+
+def test_close_before_start_writes_nothing():
+    stream = ndjson.NDJSONStream(FakeHandler())
+    stream.close()
+    assert stream.handler.wfile.getvalue() == b''
+
+
+def test_concurrent_writers_do_not_interleave_lines(stream):
+    rows = [{'Rk': str(index)} for index in range(50)]
+
+    def writer(name):
+        stream.write_rows({'type': 'table', 'table': name}, iter(rows), chunk_rows=3)
+
+    threads = [threading.Thread(target=writer, args=(f't{index}',)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5.0)
+    stream.close()
+    lines = ndjson_lines(decode_chunked(stream.handler.wfile.getvalue()))
+    assert sorted(line['table'] for line in lines) == [f't{index}' for index in range(8)]
+    assert all(line['rows'] == rows for line in lines)
+
+
+def test_result_event_drops_the_tables():
+    payload = {'success': True, 'data': {'tables': {'geral': [{'Squad': 'Inter'}]}, 'missingTables': ['x']}}
+    assert ndjson.result_event(payload, url=URL) == {
+        'type': 'result', 'url': URL, 'success': True, 'missingTables': ['x'],
+    }
+
+
+# ----------------------------------------------------------------------
+# Handler (api/fbref-extract.py)
+# ----------------------------------------------------------------------
+
+def isolated(tmp_path):
+    return {
+        'cache': fbref_cache.ResponseCache(str(tmp_path / 'cache')),
+        'limiter': ratelimit.TokenBucketLimiter(rate_per_minute=0, state_path=''),
+        'breaker': breakers.CircuitBreaker(state_path='', enabled=False),
+    }
+
+
+@pytest.fixture
+def fixture_scrapers(monkeypatch, tmp_path):
+    """FBrefScraper/AsyncFBrefScraper do handler servindo a página de fixture"""
+
+    def cached_page(url):
+        # Resposta do cache em disco: passa pelo get_page real sem tocar a rede nem o breaker
+        return fbref_cache.CachedResponse({'url': url, 'headers': {'Content-Type': 'text/html'}}, PAGE, 'hit')
+
+    class FixtureScraper(extract.FBrefScraper):
+        def __init__(self):
+            super().__init__(parser='bs4', **isolated(tmp_path))
+            self._http_get = cached_page
+
+    class FixtureAsyncScraper(extract.AsyncFBrefScraper):
+        def __init__(self):
+            super().__init__(parser='bs4', max_concurrency=2, **isolated(tmp_path))
+            self._http_get = cached_page
+
+    monkeypatch.setattr(extract, 'FBrefScraper', FixtureScraper)
+    monkeypatch.setattr(extract, 'AsyncFBrefScraper', FixtureAsyncScraper)
+    monkeypatch.setenv('FBREF_SNAPSHOTS', 'off')
+
+
+def post(request: dict, accept: str = ndjson.NDJSON_CONTENT_TYPE):
+    """Executa do_POST e devolve (linha de status + headers, corpo)"""
+    body = json.dumps(request).encode('utf-8')
+    handler = extract.handler.__new__(extract.handler)
+    handler.headers = {'Accept': accept, 'Content-Length': str(len(body))}
+    handler.rfile = io.BytesIO(body)
+    handler.wfile = io.BytesIO()
+    handler.request_version = 'HTTP/1.1'
+    handler.requestline = 'POST /api/fbref-extract HTTP/1.1'
+    handler.command = 'POST'
+    handler.client_address = ('127.0.0.1', 0)
+    handler.do_POST()
+    head, _, body = handler.wfile.getvalue().partition(b'\r\n\r\n')
+    return head.decode('latin-1'), body
+
+
+def test_handler_streams_tables_then_result(fixture_scrapers):
+    head, body = post({'championshipUrl': URL})
+    assert head.startswith('HTTP/1.1 200')
+    assert 'Transfer-Encoding: chunked' in head
+    lines = ndjson_lines(decode_chunked(body))
+
+    assert [line['type'] for line in lines] == ['table', 'result']
+    table, result = lines
+    assert table == {'type': 'table', 'url': URL, 'table': 'geral', 'rows': expected_overall_rows()}
+    assert result['success'] is True
+    assert result['url'] == URL
+    assert result['missingTables'] == []
+    assert result['circuit']['state'] == breakers.CLOSED
+    # Metadados só: as linhas já saíram no evento "table"
+    assert 'tables' not in json.dumps(result)
+
+
+def test_handler_stream_matches_the_json_response(fixture_scrapers):
+    _, body = post({'championshipUrl': URL, 'format': 'columnar', 'typed': True})
+    table = ndjson_lines(decode_chunked(body))[0]
+    _, plain = post({'championshipUrl': URL, 'format': 'columnar', 'typed': True}, accept='application/json')
+    expected = json.loads(plain)['data']['tables']['geral']
+    assert {key: table[key] for key in expected} == expected
+
+
+def test_handler_batch_streams_done_last(fixture_scrapers):
+    urls = [URL, 'https://example.com/x', URL.replace('24', '9')]
+    _, body = post({'championshipUrls': urls})
+    lines = ndjson_lines(decode_chunked(body))
+
+    assert lines[-1]['type'] == 'done'
+    assert lines[-1]['succeeded'] == 2 and lines[-1]['failed'] == 1
+    results = {line['index']: line for line in lines if line['type'] == 'result'}
+    assert sorted(results) == [0, 1, 2]
+    assert results[1]['success'] is False
+    for index in (0, 2):
+        table_at = next(n for n, line in enumerate(lines) if line['type'] == 'table' and line['index'] == index)
+        result_at = next(n for n, line in enumerate(lines) if line['type'] == 'result' and line['index'] == index)
+        # A tabela da URL sai antes do resultado dela
+        assert table_at < result_at
+        assert lines[table_at]['rows'] == expected_overall_rows()
+
+
+def test_handler_invalid_url_is_a_plain_json_error(fixture_scrapers):
+    head, body = post({'championshipUrl': 'https://example.com'})
+    # Validação antes do stream começar: resposta JSON comum, sem chunked
+    assert head.split()[1] == '400'
+    assert 'Transfer-Encoding' not in head
+    assert json.loads(body)['success'] is False
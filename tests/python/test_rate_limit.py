@@ -0,0 +1,152 @@
+"""
+Token bucket por host (api/_fbref_ratelimit.py): burst, reabastecimento,
+backoff com drenagem após 403/429 e estado compartilhado via SQLite.
+
+O relógio do módulo é trocado por um relógio manual, então nada aqui dorme.
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import load_api_module  # noqa: E402
+
+ratelimit = load_api_module('_fbref_ratelimit')
+
+HOST = 'fbref.com'
+
+
+class ManualClock:
+    """time.time/time.sleep controlados pelo teste"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.slept = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = ManualClock()
+    monkeypatch.setattr(ratelimit, 'time', clock)
+    # Jitter fixo do backoff: uniform(0.5, 1.5) -> 1.0
+    monkeypatch.setattr(ratelimit.random, 'uniform', lambda low, high: 1.0)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def state_path(request, tmp_path):
+    return '' if request.param == 'memory' else str(tmp_path / 'ratelimit.sqlite3')
+
+
+def make_limiter(state_path, rate_per_minute=60.0, burst=3.0):
+    return ratelimit.TokenBucketLimiter(rate_per_minute=rate_per_minute, burst=burst, state_path=state_path)
+
+
+def test_host_key_ignores_www_and_path():
+    assert ratelimit.host_key('https://www.FBref.com/en/comps/24/x') == HOST
+
+
+def test_burst_then_waits_one_interval_per_request(clock, state_path):
+    limiter = make_limiter(state_path)
+    assert [limiter.reserve(HOST) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.reserve(HOST) == pytest.approx(1.0)
+    assert limiter.reserve(HOST) == pytest.approx(2.0)
+
+
+def test_refill_over_time_is_capped_at_burst(clock, state_path):
+    limiter = make_limiter(state_path)
+    for _ in range(3):
+        limiter.reserve(HOST)
+    clock.advance(2.0)
+    assert limiter.reserve(HOST) == 0.0
+    assert limiter.reserve(HOST) == 0.0
+    assert limiter.reserve(HOST) == pytest.approx(1.0)
+
+    clock.advance(3600)
+    assert [limiter.reserve(HOST) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.reserve(HOST) > 0
+
+
+def test_acquire_sleeps_only_when_exhausted(clock, state_path):
+    limiter = make_limiter(state_path, burst=1.0)
+    assert limiter.acquire(HOST) == 0.0
+    assert limiter.acquire(HOST) == pytest.approx(1.0)
+    assert clock.slept == [pytest.approx(1.0)]
+
+
+def test_hosts_have_independent_buckets(clock, state_path):
+    limiter = make_limiter(state_path, burst=1.0)
+    assert limiter.reserve(HOST) == 0.0
+    assert limiter.reserve('example.com') == 0.0
+    assert limiter.reserve(HOST) > 0
+
+
+def test_try_acquire_never_reserves(clock, state_path):
+    limiter = make_limiter(state_path, burst=1.0)
+    assert limiter.try_acquire(HOST)
+    assert not limiter.try_acquire(HOST)
+    assert not limiter.try_acquire(HOST)
+    # As recusas não deixaram saldo negativo: um intervalo basta para o próximo token
+    clock.advance(1.0)
+    assert limiter.try_acquire(HOST)
+
+
+def test_backoff_grows_exponentially_up_to_the_cap(clock, state_path):
+    limiter = make_limiter(state_path)
+    assert limiter.backoff_delay(HOST, 1) == pytest.approx(2.0 + 1.0)
+    assert limiter.backoff_delay(HOST, 3) == pytest.approx(8.0 + 1.0)
+    assert limiter.backoff_delay(HOST, 10) == pytest.approx(ratelimit.MAX_BACKOFF + 1.0)
+
+
+def test_throttled_backoff_drains_the_bucket(clock, state_path):
+    limiter = make_limiter(state_path)
+    delay = limiter.backoff_delay(HOST, 1, throttled=True)
+    assert delay == pytest.approx(3.0)
+    # Bucket cheio (3 tokens) zerado e empurrado 3 s para baixo: a próxima requisição espera 3 s + 1 intervalo
+    assert limiter.reserve(HOST) == pytest.approx(delay + 1.0)
+
+
+def test_throttled_backoff_reaches_other_processes(clock, tmp_path):
+    path = str(tmp_path / 'drain.sqlite3')
+    worker = make_limiter(path)
+    other_worker = make_limiter(path)
+    delay = worker.backoff_delay(HOST, 2, throttled=True)
+    assert other_worker.reserve(HOST) == pytest.approx(delay + 1.0)
+
+
+def test_unthrottled_backoff_keeps_the_bucket(clock, state_path):
+    limiter = make_limiter(state_path)
+    limiter.backoff_delay(HOST, 1, throttled=False)
+    assert limiter.reserve(HOST) == 0.0
+
+
+def test_sqlite_state_is_shared_between_instances(clock, tmp_path):
+    path = str(tmp_path / 'shared.sqlite3')
+    first = make_limiter(path, burst=2.0)
+    second = make_limiter(path, burst=2.0)
+    assert first.reserve(HOST) == 0.0
+    assert second.reserve(HOST) == 0.0
+    assert first.reserve(HOST) == pytest.approx(1.0)
+
+
+def test_zero_rate_disables_the_limit(clock):
+    limiter = make_limiter('', rate_per_minute=0)
+    assert not limiter.enabled
+    assert [limiter.reserve(HOST) for _ in range(10)] == [0.0] * 10
+    assert limiter.try_acquire(HOST)
@@ -0,0 +1,112 @@
+"""
+Detecção de bloqueio no Selenium (api/_selenium_extract.py e
+api/fbref-extract-selenium.py): só páginas de bloqueio reais (título ou
+marcador do Cloudflare) viram 403 e contam como falha no circuit breaker
+compartilhado com as rotas HTTP; um "403" no conteúdo não.
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import OVERALL_TABLE_ID, load_api_module  # noqa: E402
+
+selenium_extract = load_api_module('_selenium_extract')
+selenium_wait = load_api_module('_selenium_wait')
+breakers = load_api_module('_circuit_breaker')
+extract_selenium = load_api_module('fbref-extract-selenium')
+
+URL = 'https://fbref.com/en/comps/24/Serie-A-Stats'
+HOST = 'fbref.com'
+
+STANDINGS = (
+    f'<table class="stats_table" id="{OVERALL_TABLE_ID}"><thead><tr><th>Squad</th><th>Attendance</th></tr></thead>'
+    '<tbody><tr><td>Inter</td><td>24,403</td></tr><tr><td>Milan</td><td>71,403</td></tr></tbody></table>'
+)
+NORMAL_PAGE = (
+    '<html><head><title>2025-2026 Serie A Stats | FBref.com</title></head><body>'
+    f'<p>Forbidden Fruit FC, 403 gols na história</p>{STANDINGS}</body></html>'
+)
+FORBIDDEN_PAGE = '<html><head><title>403 Forbidden</title></head><body><h1>Forbidden</h1></body></html>'
+CLOUDFLARE_PAGE = (
+    '<html><head><title>fbref.com</title></head><body>'
+    '<div id="cf-error-details"><h1>Sorry, you have been blocked</h1></div></body></html>'
+)
+
+
+@pytest.mark.parametrize('title, html, blocked', [
+    ('2025-2026 Serie A Stats | FBref.com', NORMAL_PAGE, False),
+    ('403 Forbidden', FORBIDDEN_PAGE, True),
+    ('Access Denied', '<html></html>', True),
+    ('Just a moment...', '<html></html>', True),
+    ('Attention Required! | Cloudflare', '<html></html>', True),
+    ('fbref.com', CLOUDFLARE_PAGE, True),
+    ('Player 403 Stats | FBref.com', '<html></html>', False),
+    (None, '<html></html>', False),
+])
+def test_is_blocked_page(title, html, blocked):
+    assert selenium_extract.is_blocked_page(title, html) is blocked
+
+
+class FakeDriver:
+    """WebDriver mínimo: serve um HTML fixo e responde aos scripts de espera e de page_info"""
+
+    def __init__(self, html: str, title: str):
+        self.page_source = html
+        self.title = title
+        self.current_url = URL
+
+    def get(self, url):
+        pass
+
+    def find_elements(self, *args):
+        return []
+
+    def execute_script(self, script, *args):
+        if script == selenium_wait._PAGE_READY_JS:
+            return 'settled'
+        if script == selenium_extract._PAGE_INFO_JS:
+            markers = args[0]
+            return {'title': self.title, 'marker': any(m in self.page_source for m in markers), 'tables': []}
+        raise AssertionError('script inesperado')
+
+
+@pytest.fixture
+def breaker():
+    return breakers.CircuitBreaker(failure_rate=0.5, min_requests=2, state_path='', enabled=True)
+
+
+def make_scraper(html, title, breaker, extract_mode='html'):
+    return extract_selenium.FBrefSeleniumScraper(driver=FakeDriver(html, title), breaker=breaker,
+                                                 extract_mode=extract_mode, parser='bs4')
+
+
+@pytest.mark.parametrize('load', ['html', 'browser'])
+def test_403_in_content_is_not_a_block(breaker, load):
+    scraper = make_scraper(NORMAL_PAGE, '2025-2026 Serie A Stats | FBref.com', breaker)
+    for _ in range(3):
+        if load == 'html':
+            result, error_info = scraper.get_page(URL)
+        else:
+            result, error_info = scraper.get_tables_in_browser(URL, [])
+        assert error_info is None and result is not None
+    assert breaker.snapshot(HOST) == {'state': breakers.CLOSED, 'requests': 3, 'failures': 0, 'retryAfter': 0.0}
+
+
+@pytest.mark.parametrize('html, title', [(FORBIDDEN_PAGE, '403 Forbidden'), (CLOUDFLARE_PAGE, 'fbref.com')])
+@pytest.mark.parametrize('load', ['html', 'browser'])
+def test_block_pages_count_as_breaker_failures(breaker, html, title, load):
+    scraper = make_scraper(html, title, breaker)
+    for _ in range(breaker.min_requests):
+        if load == 'html':
+            result, error_info = scraper.get_page(URL)
+        else:
+            result, error_info = scraper.get_tables_in_browser(URL, [])
+        assert result is None and error_info['type'] == '403'
+    assert breaker.snapshot(HOST)['state'] == breakers.OPEN
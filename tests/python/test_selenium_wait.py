@@ -0,0 +1,87 @@
+"""
+Espera por tabelas no Selenium (api/_selenium_wait.py): os padrões enviados ao
+navegador levam as flags do re.Pattern, para que o RegExp do JavaScript case os
+mesmos ids que o TableLocator em Python.
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import os
+import re
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import load_api_module  # noqa: E402
+
+selenium_wait = load_api_module('_selenium_wait')
+locators = load_api_module('_table_locator')
+selenium_extract = load_api_module('fbref-extract-selenium')
+
+PY_FLAGS = {'i': re.IGNORECASE, 'm': re.MULTILINE, 's': re.DOTALL}
+
+
+def js_test(pattern, table_id):
+    """RegExp(source, flags).test(id), emulado com re (a sintaxe usada aqui é comum às duas)"""
+    flags = 0
+    for flag in pattern['flags']:
+        flags |= PY_FLAGS[flag]
+    return re.search(pattern['source'], table_id, flags) is not None
+
+
+def type_ready(alternatives, ids):
+    return any(js_test(pattern, table_id) for pattern in alternatives for table_id in ids)
+
+
+def test_flags_follow_each_pattern():
+    mapping = {'geral': [
+        'stats_results_2025-2026_111_overall',
+        re.compile(r'results.*_overall', re.IGNORECASE),
+        re.compile(r'^stats_.*_overall$'),
+        re.compile(r'^squads$', re.IGNORECASE | re.MULTILINE),
+    ]}
+    assert selenium_wait.table_id_patterns(mapping, ['geral']) == [[
+        {'source': r'(?:^stats_results_2025\-2026_111_overall$)|(?:^stats_.*_overall$)', 'flags': ''},
+        {'source': '(?:results.*_overall)', 'flags': 'i'},
+        {'source': '(?:^squads$)', 'flags': 'im'},
+    ]]
+
+
+def test_types_without_patterns_are_skipped():
+    assert selenium_wait.table_id_patterns({'geral': []}, ['geral', 'desconhecido']) == []
+
+
+def test_ignorecase_pattern_matches_uppercase_ids_in_the_browser():
+    mapping = {'geral': [locators.SEASON_OVERALL_RE]}
+    (alternatives,) = selenium_wait.table_id_patterns(mapping, ['geral'])
+    assert alternatives[0]['flags'] == 'i'
+    assert type_ready(alternatives, ['Results2025-2026111_Overall'])
+
+
+def test_selenium_wait_agrees_with_the_locator():
+    locator = locators.get_locator(selenium_extract.FBrefSeleniumScraper.TABLE_MAPPING)
+    patterns = selenium_wait.table_id_patterns(locator.mapping, ['geral'])
+    for table_id in ('results2025-2026111_overall', 'STATS_RESULTS_2024_9_OVERALL', 'Results_Extra_Overall',
+                     'results2025-2026111_home_away', 'stats_squads_standard_for'):
+        found = locator.select_id([{'id': table_id}], 'geral') is not None
+        # home_away é excluído só no locator (a espera apenas aguarda o id aparecer)
+        if 'home_away' not in table_id:
+            assert type_ready(patterns[0], [table_id]) == found, table_id
+
+
+class FakeDriver:
+    def __init__(self):
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append(args)
+        return 'tables'
+
+
+def test_wait_sends_source_and_flags_to_the_browser():
+    driver = FakeDriver()
+    patterns = selenium_wait.table_id_patterns({'geral': [locators.SEASON_OVERALL_RE]}, ['geral'])
+    assert selenium_wait.wait_for_page_ready(driver, 1, patterns) == 'tables'
+    assert driver.calls == [(patterns, selenium_wait.DEFAULT_SETTLE_MS)]
+    assert 'new RegExp(pattern.source, pattern.flags)' in selenium_wait._PAGE_READY_JS
@@ -0,0 +1,146 @@
+"""
+Single-flight (api/_single_flight.py): chamadas simultâneas com a mesma chave
+executam a função uma vez e recebem o mesmo resultado (ou a mesma exceção).
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import load_api_module  # noqa: E402
+
+single_flight = load_api_module('_single_flight')
+
+CALLERS = 5
+TIMEOUT = 5.0
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline, 'timeout esperando as chamadas simultâneas'
+        time.sleep(0.005)
+
+
+def run_concurrently(flight, keys, func):
+    """Chama flight.do(chave, func) em threads; devolve [(resultado, compartilhado) ou exceção]"""
+    results = [None] * len(keys)
+
+    def call(index, key):
+        try:
+            results[index] = flight.do(key, func)
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=call, args=(index, key)) for index, key in enumerate(keys)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+@pytest.fixture(params=['process', 'file'])
+def flight(request, tmp_path):
+    return single_flight.SingleFlight(mode=request.param, lock_dir=str(tmp_path / 'locks'))
+
+
+def test_concurrent_calls_share_one_execution(flight):
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(TIMEOUT)
+        return {'tables': len(calls)}
+
+    threads, results = run_concurrently(flight, ['url'] * CALLERS, fetch)
+    wait_until(lambda: flight.stats()['shared'] == CALLERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join(TIMEOUT)
+
+    assert len(calls) == 1
+    assert [result for result, _ in results] == [{'tables': 1}] * CALLERS
+    assert sorted(shared for _, shared in results) == [False] + [True] * (CALLERS - 1)
+    # Todos recebem o mesmo objeto
+    assert len({id(result) for result, _ in results}) == 1
+    assert flight.stats() == {'leaders': 1, 'shared': CALLERS - 1, 'in_flight': 0}
+
+
+def test_different_keys_run_separately(flight):
+    calls = []
+    threads, results = run_concurrently(flight, ['a', 'b'], lambda: calls.append(1) or len(calls))
+    for thread in threads:
+        thread.join(TIMEOUT)
+    assert len(calls) == 2
+    assert all(not shared for _, shared in results)
+
+
+def test_exception_reaches_every_waiter(flight):
+    release = threading.Event()
+
+    def fail():
+        release.wait(TIMEOUT)
+        raise RuntimeError('403')
+
+    threads, results = run_concurrently(flight, ['url'] * CALLERS, fail)
+    wait_until(lambda: flight.stats()['shared'] == CALLERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join(TIMEOUT)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_sequential_calls_are_not_cached(flight):
+    calls = []
+    assert flight.do('url', lambda: calls.append(1) or 'first') == ('first', False)
+    assert flight.do('url', lambda: calls.append(1) or 'second') == ('second', False)
+    assert len(calls) == 2
+
+
+def test_off_mode_runs_every_call():
+    flight = single_flight.SingleFlight(mode='off')
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(0.05)
+        return 'ok'
+
+    threads, results = run_concurrently(flight, ['url'] * 3, fetch)
+    for thread in threads:
+        thread.join(TIMEOUT)
+    assert len(calls) == 3
+    assert all(shared is False for _, shared in results)
+
+
+def test_unknown_mode_falls_back_to_process():
+    assert single_flight.SingleFlight(mode='redis').mode == 'process'
+
+
+def test_async_calls_share_one_execution():
+    flight = single_flight.SingleFlight(mode='process')
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'page'
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async('url', fetch) for _ in range(CALLERS)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert [result for result, _ in results] == ['page'] * CALLERS
+    assert sum(shared for _, shared in results) == CALLERS - 1
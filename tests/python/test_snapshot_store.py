@@ -0,0 +1,160 @@
+"""
+Snapshots e diff de linhas (api/_snapshot_store.py) e o opt-in de snapshots
+no handler de api/fbref-extract.py.
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import copy
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import expected_overall_rows, load_api_module  # noqa: E402
+
+snapshots = load_api_module('_snapshot_store')
+extract = load_api_module('fbref-extract')
+
+KEY = ('24', 'current', 'geral')
+
+
+@pytest.fixture
+def store(tmp_path):
+    return snapshots.SnapshotStore(str(tmp_path / 'snapshots.sqlite3'), keep=10)
+
+
+@pytest.fixture
+def rows():
+    return expected_overall_rows()
+
+
+def test_snapshot_key_from_url():
+    assert snapshots.snapshot_key('https://fbref.com/en/comps/24/Serie-A-Stats') == ('24', 'current')
+    assert snapshots.snapshot_key('https://fbref.com/en/comps/9/2024-2025/2024-2025-Premier-League-Stats') == \
+        ('9', '2024-2025')
+    assert snapshots.snapshot_key('https://fbref.com/en/squads/abc') == ('unknown', 'current')
+
+
+def test_identical_table_reuses_latest_snapshot(store, rows):
+    first = store.record(*KEY, rows)
+    again = store.record(*KEY, copy.deepcopy(rows))
+    assert first['created'] and not again['created']
+    assert again['id'] == first['id']
+    assert store.rows(first['id']) == rows
+
+
+def test_diff_added_changed_and_removed_rows(store, rows):
+    base = store.record(*KEY, rows)
+    current = copy.deepcopy(rows)
+    current[0]['Pts'] = str(int(current[0]['Pts']) + 3)
+    removed = current.pop()
+    added = dict(current[1], Squad='Time Novo', Rk='21')
+    current.append(added)
+    target = store.record(*KEY, current)
+
+    diff = store.diff(base['id'], target['id'])
+    assert diff['from'] == base['id'] and diff['to'] == target['id']
+    assert diff['changed'] == [current[0], added]
+    assert diff['removed'] == [removed['Squad']]
+    assert diff['unchanged'] == len(rows) - 2
+
+
+def test_diff_defaults_to_latest_snapshot(store, rows):
+    base = store.record(*KEY, rows)
+    current = copy.deepcopy(rows)
+    current[5]['GF'] = '99'
+    latest = store.record(*KEY, current)
+    diff = store.diff(base['id'])
+    assert diff['to'] == latest['id']
+    assert diff['changed'] == [current[5]]
+
+
+def test_diff_from_empty_snapshot_returns_every_row(store, rows):
+    empty = store.record(*KEY, [])
+    target = store.record(*KEY, rows)
+    diff = store.diff(empty['id'], target['id'])
+    assert diff['changed'] == rows
+    assert diff['removed'] == []
+    assert diff['unchanged'] == 0
+
+
+def test_diff_to_empty_snapshot_removes_every_row(store, rows):
+    base = store.record(*KEY, rows)
+    empty = store.record(*KEY, [])
+    diff = store.diff(base['id'], empty['id'])
+    assert diff['changed'] == []
+    assert diff['removed'] == [row['Squad'] for row in rows]
+
+
+def test_duplicate_keys_fall_back_to_suffix_and_position(store):
+    base = store.record(*KEY, [{'Squad': 'A', 'Pts': '1'}, {'Squad': 'A', 'Pts': '2'}, {'Pts': '3'}])
+    target = store.record(*KEY, [{'Squad': 'A', 'Pts': '1'}, {'Squad': 'A', 'Pts': '5'}, {'Pts': '3'}])
+    diff = store.diff(base['id'], target['id'])
+    assert diff['changed'] == [{'Squad': 'A', 'Pts': '5'}]
+    assert diff['unchanged'] == 2
+
+
+def test_diff_rejects_unknown_or_unrelated_snapshots(store, rows):
+    base = store.record(*KEY, rows)
+    other = store.record('9', 'current', 'geral', rows)
+    assert store.diff(12345) is None
+    assert store.diff(base['id'], 12345) is None
+    assert store.diff(base['id'], other['id']) is None
+
+
+def test_keep_prunes_old_snapshots(tmp_path, rows):
+    store = snapshots.SnapshotStore(str(tmp_path / 'keep.sqlite3'), keep=2)
+    ids = []
+    for points in range(3):
+        current = copy.deepcopy(rows)
+        current[0]['Pts'] = str(points)
+        ids.append(store.record(*KEY, current)['id'])
+    assert [snapshot['id'] for snapshot in store.history(*KEY)] == ids[:0:-1]
+    assert store.get(ids[0]) is None
+    assert store.rows(ids[0]) == []
+
+
+def make_handler(record_snapshots, since=()):
+    handler = extract.handler.__new__(extract.handler)
+    handler._table_format = 'rows'
+    handler._typed = False
+    handler._since = list(since)
+    handler._record_snapshots = record_snapshots
+    return handler
+
+
+def scrape_result(rows):
+    return {'url': 'https://fbref.com/en/comps/24/Serie-A-Stats', 'tables': {'geral': rows}}
+
+
+def test_handler_records_snapshots_only_when_requested(store, rows, monkeypatch):
+    monkeypatch.setattr(extract, 'get_default_snapshot_store', lambda: store)
+
+    payload = make_handler(record_snapshots=False)._result_payload(scrape_result(rows))
+    assert 'snapshots' not in payload['data']
+    assert store.history(*KEY) == []
+
+    payload = make_handler(record_snapshots=True)._result_payload(scrape_result(rows))
+    assert payload['data']['tables']['geral'] == rows
+    snapshot_id = payload['data']['snapshots']['geral']
+
+    current = copy.deepcopy(rows)
+    current[2]['W'] = '30'
+    payload = make_handler(record_snapshots=True, since=[snapshot_id])._result_payload(scrape_result(current))
+    assert 'geral' not in payload['data']['tables']
+    delta = payload['data']['delta']['geral']
+    assert delta['from'] == snapshot_id
+    assert delta['changed'] == [current[2]]
+    assert delta['unchanged'] == len(rows) - 1
+
+
+def test_snapshots_mode_from_env(monkeypatch):
+    monkeypatch.delenv('FBREF_SNAPSHOTS', raising=False)
+    assert snapshots.snapshots_mode() == 'request'
+    monkeypatch.setenv('FBREF_SNAPSHOTS', 'off')
+    assert snapshots.snapshots_mode() == 'off'
+    assert snapshots.get_default_snapshot_store() is None
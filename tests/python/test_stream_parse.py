@@ -0,0 +1,135 @@
+"""
+Parse incremental do modo 'stream' (FBrefScraper._parse_stream em
+api/fbref-extract.py): a página chega em blocos, a leitura para quando a
+tabela de maior prioridade fecha (locator.is_final) e a tabela lida é a mesma
+do parse do documento inteiro. Um corpo cortado antes de a tabela geral fechar
+vira erro de requisição e nova tentativa, nunca uma tabela parcial.
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import os
+import sys
+
+import pytest
+import requests
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import OVERALL_TABLE_ID, build_fbref_page, expected_overall_rows, load_api_module  # noqa: E402
+
+extract = load_api_module('fbref-extract')
+breakers = load_api_module('_circuit_breaker')
+fbref_cache = load_api_module('_fbref_cache')
+ratelimit = load_api_module('_fbref_ratelimit')
+
+pytestmark = pytest.mark.skipif(extract.lxml_etree is None, reason='lxml não instalado')
+
+URL = 'https://fbref.com/en/comps/24/Serie-A-Stats'
+PAGE = build_fbref_page().encode('utf-8')
+
+
+class StreamResponse:
+    """Resposta com stream=True: entrega o corpo em blocos e conta quanto foi lido"""
+
+    def __init__(self, content: bytes, chunk_size: int = 16 * 1024, cut_at: int = None):
+        self.content_bytes = content
+        self.chunk_size = chunk_size
+        self.cut_at = cut_at
+        self.read = 0
+        self.status_code = 200
+        self.reason = 'OK'
+        self.url = URL
+        self.headers = {'Content-Type': 'text/html; charset=utf-8'}
+        self.encoding = 'utf-8'
+        self._content_consumed = False
+        self.closed = False
+
+    def iter_content(self, chunk_size=None):
+        end = len(self.content_bytes) if self.cut_at is None else self.cut_at
+        while self.read < end:
+            chunk = self.content_bytes[self.read:min(self.read + self.chunk_size, end)]
+            self.read += len(chunk)
+            yield chunk
+        if self.cut_at is not None:
+            raise requests.exceptions.ChunkedEncodingError('Connection broken: IncompleteRead')
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def make_scraper(parser, tmp_path):
+    return extract.FBrefScraper(parser=parser, cache=fbref_cache.ResponseCache(str(tmp_path / 'cache')),
+                                limiter=ratelimit.TokenBucketLimiter(rate_per_minute=0, state_path=''),
+                                breaker=breakers.CircuitBreaker(state_path='', enabled=False))
+
+
+def overall_rows(scraper, doc):
+    table = scraper.find_table_by_type(doc, 'geral')
+    assert table is not None
+    return list(scraper._without_links(scraper.iter_table_rows(table, table_name='geral')))
+
+
+@pytest.fixture
+def full_rows(tmp_path):
+    scraper = make_scraper('lxml', tmp_path)
+    return overall_rows(scraper, scraper._parse_html(PAGE))
+
+
+@pytest.mark.parametrize('chunk_size', [512, 4096, 16 * 1024, 256 * 1024])
+def test_stream_stops_once_the_overall_table_closes(tmp_path, full_rows, chunk_size):
+    scraper = make_scraper('stream', tmp_path)
+    response = StreamResponse(PAGE, chunk_size=chunk_size)
+    doc = scraper._parse_response(response)
+
+    assert overall_rows(scraper, doc) == full_rows == expected_overall_rows()
+    # Parou no bloco em que a tabela geral fechou, sem baixar as tabelas de squad e o rodapé
+    table_end = PAGE.index(b'</table>', PAGE.index(OVERALL_TABLE_ID.encode())) + len(b'</table>')
+    assert table_end <= response.read < min(len(PAGE), table_end + chunk_size)
+
+
+def test_stream_reads_to_the_end_without_a_final_table(tmp_path):
+    # Só o padrão genérico casa: outra tabela mais adiante ainda poderia vencer
+    page = build_fbref_page(overall_table_id='results_custom_overall').encode('utf-8')
+    scraper = make_scraper('stream', tmp_path)
+    response = StreamResponse(page, chunk_size=4096)
+    doc = scraper._parse_response(response)
+    assert response.read == len(page)
+
+    full = make_scraper('lxml', tmp_path)
+    assert overall_rows(scraper, doc) == overall_rows(full, full._parse_html(page))
+
+
+def test_cached_or_consumed_responses_skip_the_stream_parser(tmp_path, full_rows):
+    scraper = make_scraper('stream', tmp_path)
+    response = StreamResponse(PAGE)
+    response._content_consumed = True
+    response.content = PAGE
+    assert overall_rows(scraper, scraper._parse_response(response)) == full_rows
+    assert response.read == 0
+
+
+def test_stream_cut_before_the_overall_table_closes_raises(tmp_path):
+    scraper = make_scraper('stream', tmp_path)
+    cut_at = PAGE.index(b'</table>', PAGE.index(OVERALL_TABLE_ID.encode())) - 200
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        scraper._parse_response(StreamResponse(PAGE, chunk_size=4096, cut_at=cut_at))
+
+
+def test_get_page_retries_a_cut_stream(tmp_path, full_rows, monkeypatch):
+    scraper = make_scraper('stream', tmp_path)
+    cut_at = PAGE.index(b'</table>', PAGE.index(OVERALL_TABLE_ID.encode())) - 200
+    responses = [StreamResponse(PAGE, chunk_size=4096, cut_at=cut_at), StreamResponse(PAGE, chunk_size=4096)]
+    sent = list(responses)
+    monkeypatch.setattr(scraper, '_http_get', lambda url: responses.pop(0))
+    monkeypatch.setattr(scraper.limiter, 'backoff', lambda *args, **kwargs: 0.0)
+
+    doc, error_info = scraper.get_page(URL)
+    assert error_info is None
+    assert overall_rows(scraper, doc) == full_rows
+    assert responses == []
+    assert all(response.closed for response in sent)
@@ -0,0 +1,77 @@
+"""
+Índice de tabelas do scraper standalone (TableIndex em
+`Cur Sor/Cursor/QA/App Scraper/scraper.py`) e a extração de tabelas sem id em
+scrape_any_page.
+
+Regressão: antes do nó localizado ser repassado (table=), uma tabela sem id
+era extraída com extract_table_data(soup, table_id=None), que cai na primeira
+stats_table da página; table_N saía com as linhas da tabela errada.
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import os
+import sys
+
+from bs4 import BeautifulSoup
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import load_standalone_scraper  # noqa: E402
+
+scraper = load_standalone_scraper()
+
+URL = 'https://www.soccerstats.com/latest.asp?league=italy'
+
+
+def render_table(rows, attributes=''):
+    header, *body = rows
+    return (
+        f'<table{attributes}><thead><tr>' + ''.join(f'<th>{name}</th>' for name in header)
+        + '</tr></thead><tbody>'
+        + ''.join('<tr>' + ''.join(f'<td>{value}</td>' for value in row) + '</tr>' for row in body)
+        + '</tbody></table>'
+    )
+
+
+PAGE = (
+    '<html><body>'
+    + render_table([['Squad', 'Pts'], ['Inter', '82'], ['Napoli', '79']],
+                   ' class="stats_table" id="results_overall"')
+    + render_table([['Clube', 'Over 1.5'], ['Como', '88%'], ['Lecce', '61%']])
+    + render_table([['Jogo', 'Placar'], ['Roma x Lazio', '2-1']], ' class="sortable"')
+    + '</body></html>'
+)
+
+
+def make_scraper(page=PAGE):
+    instance = scraper.FBrefScraper()
+    instance.get_page = lambda url: BeautifulSoup(page, 'html.parser')
+    return instance
+
+
+def test_index_orders_tables_by_the_old_search_criteria():
+    soup = BeautifulSoup(PAGE, 'html.parser')
+    index = scraper.TableIndex(soup)
+    tables = soup.find_all('table')
+    # stats_table, classe genérica ('sortable' contém 'table') e só então as demais
+    assert index.ordered == [tables[0], tables[2], tables[1]]
+    assert index.by_id == {'results_overall': tables[0]}
+    assert index.by_class['stats_table'] == [tables[0]]
+
+
+def test_tables_without_id_extract_their_own_rows():
+    result = make_scraper().scrape_any_page(URL)
+    tables = result['tables']
+    assert list(tables) == ['results_overall', 'table_1', 'table_2']
+    assert tables['results_overall'] == [{'Squad': 'Inter', 'Pts': '82'}, {'Squad': 'Napoli', 'Pts': '79'}]
+    # Não são mais cópias da primeira stats_table
+    assert tables['table_1'] == [{'Jogo': 'Roma x Lazio', 'Placar': '2-1'}]
+    assert tables['table_2'] == [{'Clube': 'Como', 'Over 1.5': '88%'}, {'Clube': 'Lecce', 'Over 1.5': '61%'}]
+
+
+def test_fallback_without_table_still_uses_the_first_stats_table():
+    instance = make_scraper()
+    soup = instance.get_page(URL)
+    assert instance.extract_table_data(soup) == [{'Squad': 'Inter', 'Pts': '82'}, {'Squad': 'Napoli', 'Pts': '79'}]
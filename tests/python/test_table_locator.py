@@ -0,0 +1,131 @@
+"""
+Localização da tabela "geral" (api/_table_locator.py): SEASON_OVERALL_RE,
+prioridade do mapeamento, exclusão de home_away, fallback por stats_table e
+as regras de parada do parse incremental (is_final/is_candidate).
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import os
+import re
+import sys
+
+import pytest
+from bs4 import BeautifulSoup
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import load_api_module  # noqa: E402
+
+locators = load_api_module('_table_locator')
+extract = load_api_module('fbref-extract')
+
+locator = locators.get_locator(extract.FBrefScraper.TABLE_MAPPING)
+
+
+def select(*tables):
+    """select_id de 'geral' sobre [(id, classes)] em ordem de documento"""
+    return locator.select_id([{'id': table_id, 'classes': list(classes)} for table_id, classes in tables], 'geral')
+
+
+@pytest.mark.parametrize('table_id', [
+    'results2025-2026111_overall',
+    'results2024-2025_9_overall',
+    'results2025221_overall',
+    'stats_results_2025-2026_111_overall',
+    'stats_results2024-2025_9_overall',
+    'RESULTS2024-2025_9_OVERALL',
+])
+def test_season_overall_re_matches(table_id):
+    assert locators.SEASON_OVERALL_RE.search(table_id)
+
+
+@pytest.mark.parametrize('table_id', [
+    'results2025-2026111_home_away',
+    'results2025-2026111_overall_extra',
+    'results_overall',
+    'results2025-2026_overall',
+    'xresults2025-2026111_overall',
+    'stats_squads_standard_for',
+])
+def test_season_overall_re_rejects(table_id):
+    assert not locators.SEASON_OVERALL_RE.search(table_id)
+
+
+def test_mapping_priority_beats_document_order():
+    # O padrão genérico casa a primeira tabela, mas o de temporada vem antes no mapeamento
+    assert select(('results_old_overall', ['stats_table']),
+                  ('results2024-2025_9_overall', ['stats_table'])) == 'results2024-2025_9_overall'
+
+
+def test_document_order_between_tables_of_the_same_rule():
+    assert select(('results2024-2025_9_overall', []), ('results2025-2026111_overall', [])) == \
+        'results2024-2025_9_overall'
+
+
+def test_home_away_is_excluded():
+    assert select(('stats_results_2025-2026_111_home_away_overall', ['stats_table']),
+                  ('results2025-2026111_overall', ['stats_table'])) == 'results2025-2026111_overall'
+    assert select(('stats_results_2025-2026_111_home_away_overall', ['stats_table'])) is None
+
+
+def test_stats_table_fallback():
+    # Nenhum padrão casa 'standings_overall'; o fallback pega stats_table com _overall no id
+    assert select(('standings_home_away_overall', ['stats_table']), ('standings', ['stats_table']),
+                  ('standings_overall', ['stats_table', 'sortable'])) == 'standings_overall'
+    assert select(('standings_overall', ['sortable'])) is None
+    # O fallback vale só para 'geral'
+    assert locator.select_id([{'id': 'standings_overall', 'classes': ['stats_table']}], 'outro') is None
+
+
+def test_locate_over_beautifulsoup():
+    soup = BeautifulSoup(
+        '<table id="stats_squads_standard_for"></table>'
+        '<table class="stats_table" id="results2025-2026111_home_away"></table>'
+        '<table class="stats_table" id="results2025-2026111_overall"></table>'
+        '<table class="stats_table"></table>',
+        'html.parser')
+    assert [entry[0] for entry in locator.index(soup)] == [
+        'stats_squads_standard_for', 'results2025-2026111_home_away', 'results2025-2026111_overall']
+    assert locator.locate(soup, 'geral')['id'] == 'results2025-2026111_overall'
+    assert locator.locate_all(soup, ['geral', 'outro']).keys() == {'geral'}
+
+
+@pytest.mark.parametrize('table_id, final', [
+    ('results2025-2026111_overall', True),
+    ('stats_results_2024-2025_9_overall', True),
+    # Casam só padrões de menor prioridade: uma tabela posterior ainda pode vencer
+    ('results_old_overall', False),
+    ('stats_results_x_overall', False),
+    ('results2025-2026111_home_away', False),
+    ('', False),
+    (None, False),
+])
+def test_is_final(table_id, final):
+    assert locator.is_final('geral', table_id) is final
+
+
+def test_is_final_with_literal_first_rule():
+    literal = locators.TableLocator({'geral': ['results_fixo_overall', locators.SEASON_OVERALL_RE]})
+    assert literal.is_final('geral', 'results_fixo_overall')
+    assert not literal.is_final('geral', 'results2025-2026111_overall')
+    assert not literal.is_final('desconhecido', 'results_fixo_overall')
+
+
+@pytest.mark.parametrize('table_id, candidate', [
+    ('results2025-2026111_overall', True),
+    ('standings_overall', True),
+    ('results2025-2026111_home_away', False),
+    ('stats_squads_standard_for', False),
+    (None, False),
+])
+def test_is_candidate(table_id, candidate):
+    assert locator.is_candidate(table_id) is candidate
+
+
+def test_is_candidate_with_literals_and_patterns():
+    custom = locators.TableLocator({'squad': ['stats_squads_standard_for', re.compile('^keeper_')]})
+    assert custom.is_candidate('stats_squads_standard_for')
+    assert custom.is_candidate('KEEPER_adv')
+    assert not custom.is_candidate('stats_squads_passing_for')
@@ -0,0 +1,70 @@
+"""
+Conversão tipada das colunas (api/_table_types.py).
+
+O caminho vetorizado (NumPy) e o célula a célula precisam devolver os mesmos
+valores e os mesmos tipos (int/float por célula, None para vazios, textos e
+não finitos).
+
+Uso:
+    python -m pytest -q tests/python
+"""
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scripts', 'benchmarks'))
+
+from _fbref_fixtures import expected_overall_rows, load_api_module  # noqa: E402
+
+table_types = load_api_module('_table_types')
+
+EDGE_VALUES = [
+    '1', '+2', '3.5', '2.0', '-0', '1,234', '  7 ', '1e20', '', '-', '—', 'abc',
+    'inf', '-inf', 'nan', 'NaN', 'Infinity', '1e400', None,
+]
+
+
+def typed(values):
+    """Valores com o tipo, para que 1 e 1.0 não passem como iguais"""
+    return [(type(value).__name__, value) for value in values]
+
+
+def per_value(values, kind):
+    return [table_types.convert_value(value, kind) for value in values]
+
+
+@pytest.mark.skipif(table_types.np is None, reason='NumPy não instalado')
+@pytest.mark.parametrize('kind', [table_types.INT, table_types.FLOAT])
+@pytest.mark.parametrize('values', [
+    EDGE_VALUES,
+    [value for value in EDGE_VALUES if value != 'abc'],  # coluna toda numérica: sem o fallback célula a célula
+    ['10', '11.5', '12'],  # coluna INT com um único valor não inteiro
+], ids=['com texto', 'numerica', 'int com decimal'])
+def test_numpy_path_matches_per_value_path(values, kind):
+    assert typed(table_types._convert_column_numpy(values, kind)) == typed(per_value(values, kind))
+
+
+def test_int_column_keeps_integers_per_cell():
+    assert typed(per_value(['10', '11.5', '12'], table_types.INT)) == \
+        [('int', 10), ('float', 11.5), ('int', 12)]
+
+
+@pytest.mark.parametrize('value', ['inf', '-inf', 'nan', '1e400'])
+@pytest.mark.parametrize('kind', [table_types.INT, table_types.FLOAT])
+def test_non_finite_values_become_none(value, kind):
+    assert table_types.convert_value(value, kind) is None
+
+
+def test_apply_column_types_same_with_and_without_numpy(monkeypatch):
+    rows = expected_overall_rows()
+    rows[0] = dict(rows[0], Pts='inf', Attendance='45,123', xG='+18.7')
+    with_numpy = table_types.apply_column_types(rows)
+    monkeypatch.setattr(table_types, 'np', None)
+    without_numpy = table_types.apply_column_types(rows)
+    assert [typed(row.values()) for row in with_numpy] == [typed(row.values()) for row in without_numpy]
+    assert with_numpy[0]['Pts'] is None
+    assert with_numpy[0]['Attendance'] == 45123
+    assert with_numpy[0]['xG'] == 18.7
+    assert rows[0]['Pts'] == 'inf'